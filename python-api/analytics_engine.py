@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Analytics row engine
+One declarative spec per generated CSV plus a single engine that turns pages of
+Library Analytics API records into rows: compiled row builders, week filtering
+with precomputed ISO bounds and batched writes
+"""
+
+import csv
+import os
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Callable, Optional
+
+import metrics
+import progress
+from compact_records import ComponentUsageStats, FileUsageStats
+from output_files import atomic_write
+
+# Column sources resolved from component metadata instead of the record itself
+RESOLVED_NAME = '@component_name'
+RESOLVED_SET = '@component_set_name'
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# How many filtered/unparseable weeks to show before only reporting totals
+DEBUG_PRINT_LIMIT = 3
+
+
+def compile_row_builder(columns: List[tuple]) -> Callable:
+    """Turn (header, source, default) column specs into a row-building function.
+
+    Sources and defaults are collected once per spec, so a row is the resolved
+    component names followed by one dict lookup per record field, with no
+    per-column branching. Resolved columns must come before record fields.
+    """
+    resolved = {RESOLVED_NAME: 0, RESOLVED_SET: 1}
+    name_indexes = []
+    sources, defaults = [], []
+    for header, source, default in columns:
+        if source in resolved:
+            if sources:
+                raise ValueError(f"Resolved column '{header}' must come before the record fields")
+            name_indexes.append(resolved[source])
+        else:
+            sources.append(source)
+            defaults.append(default)
+    name_indexes, sources, defaults = tuple(name_indexes), tuple(sources), tuple(defaults)
+
+    if not name_indexes:
+        def build_row(item: Dict[str, Any], names: tuple = None) -> list:
+            return list(map(item.get, sources, defaults))
+    else:
+        def build_row(item: Dict[str, Any], names: tuple = None) -> list:
+            return [names[index] for index in name_indexes] + list(map(item.get, sources, defaults))
+    return build_row
+
+
+def aggregate_component_usage(stats: ComponentUsageStats, item: Dict[str, Any], row: list):
+    """Accumulate instances and distinct files/teams per resolved component name"""
+    stats.add(row[0], row[1], item.get('file_name', 'Unknown File'), item.get('team_name', 'Unknown Team'),
+              item.get('instances', 0))
+
+
+def aggregate_file_usage(stats: FileUsageStats, item: Dict[str, Any], row: list):
+    """Accumulate instances and distinct component keys per file"""
+    stats.add(item.get('file_name', 'Unknown File'), item.get('component_key', ''), item.get('team_name', ''),
+              item.get('workspace_name', ''), item.get('instances', 0))
+
+
+def file_usage_rows(stats: FileUsageStats) -> Iterable[list]:
+    return stats.rows()
+
+
+# Declarative description of every CSV generated from the Library Analytics API.
+#   columns:       (CSV header, record field or resolved source, default)
+#   week_filter:   drop rows whose week falls outside the requested date range
+#   report_unmatched: print component keys that metadata could not resolve
+#   aggregate:     (stats factory, per-row accumulator) run alongside row output
+#   write_rows:    False when the CSV is written from the aggregate instead
+#   final_rows:    builds the CSV rows from the aggregate when write_rows is False
+ENDPOINT_SPECS: Dict[str, Dict[str, Any]] = {
+    'actions_by_component.csv': {
+        'endpoint': 'component/actions', 'group_by': 'component',
+        'columns': [
+            ('component_name', RESOLVED_NAME, ''), ('component_set_name', RESOLVED_SET, ''),
+            ('week', 'week', ''), ('insertions', 'insertions', 0), ('detachments', 'detachments', 0),
+        ],
+        'week_filter': True,
+        'report_unmatched': True,
+    },
+    'actions_by_team.csv': {
+        'endpoint': 'component/actions', 'group_by': 'team',
+        'columns': [
+            ('team_name', 'team_name', 'Unknown Team'), ('week', 'week', ''),
+            ('insertions', 'insertions', 0), ('detachments', 'detachments', 0),
+        ],
+        'week_filter': True,
+    },
+    'usages_by_component.csv': {
+        'endpoint': 'component/usages', 'group_by': 'component',
+        'columns': [
+            ('component_name', RESOLVED_NAME, ''), ('component_set_name', RESOLVED_SET, ''),
+            ('file_name', 'file_name', 'Unknown File'), ('instances', 'instances', 0),
+        ],
+        'aggregate': (ComponentUsageStats, aggregate_component_usage),
+    },
+    'usages_by_file.csv': {
+        'endpoint': 'component/usages', 'group_by': 'file',
+        'columns': [
+            ('file_name', 'file_name', 'Unknown File'), ('component_count', None, 0), ('total_instances', None, 0),
+        ],
+        'aggregate': (FileUsageStats, aggregate_file_usage),
+        'write_rows': False,
+        'final_rows': file_usage_rows,
+    },
+    'variable_actions_by_team.csv': {
+        'endpoint': 'variable/actions', 'group_by': 'team',
+        'columns': [
+            ('team_name', 'team_name', 'Unknown Team'), ('variable_name', 'variable_name', 'Unknown Variable'),
+            ('actions', 'actions', 0),
+        ],
+    },
+    'variable_actions_by_variable.csv': {
+        'endpoint': 'variable/actions', 'group_by': 'variable',
+        'columns': [
+            ('variable_key', 'variable_key', ''), ('week', 'week', ''), ('detachments', 'detachments', 0),
+            ('insertions', 'insertions', 0), ('variable_name', 'variable_name', ''),
+            ('variable_type', 'variable_type', ''), ('collection_key', 'collection_key', ''),
+            ('collection_name', 'collection_name', ''),
+        ],
+        'week_filter': True,
+    },
+    'styles_actions_by_style.csv': {
+        'endpoint': 'style/actions', 'group_by': 'style',
+        'columns': [
+            ('style_key', 'style_key', ''), ('week', 'week', ''), ('detachments', 'detachments', 0),
+            ('insertions', 'insertions', 0), ('style_name', 'style_name', ''), ('style_type', 'style_type', ''),
+        ],
+        'week_filter': True,
+    },
+    'styles_usages_by_style.csv': {
+        'endpoint': 'style/usages', 'group_by': 'style',
+        'columns': [
+            ('style_name', 'style_name', ''), ('style_type', 'style_type', ''),
+            ('file_name', 'file_name', 'Unknown File'), ('instances', 'instances', 0),
+        ],
+    },
+}
+
+for _spec in ENDPOINT_SPECS.values():
+    _spec['header'] = [column[0] for column in _spec['columns']]
+    _spec['resolve_components'] = any(column[1] in (RESOLVED_NAME, RESOLVED_SET) for column in _spec['columns'])
+    if _spec.get('write_rows', True):
+        _spec['build_row'] = compile_row_builder(_spec['columns'])
+
+
+class WeekFilter:
+    """Inclusive week range check using ISO string comparison.
+
+    Bounds are normalised once; zero-padded YYYY-MM-DD weeks compare as plain
+    strings and anything else falls back to strptime, keeping rows that can't be parsed.
+    """
+
+    def __init__(self, start_date: str, end_date: str):
+        self.start_date = start_date
+        self.end_date = end_date
+        self.start = datetime.strptime(start_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        self.end = datetime.strptime(end_date, "%Y-%m-%d").strftime("%Y-%m-%d")
+        self.filtered_count = 0
+        self.unparsed_count = 0
+
+    def _normalise(self, week) -> Optional[str]:
+        try:
+            return datetime.strptime(week, "%Y-%m-%d").strftime("%Y-%m-%d")
+        except (ValueError, TypeError) as e:
+            # If date parsing fails, include the row (don't filter)
+            self.unparsed_count += 1
+            if self.unparsed_count <= DEBUG_PRINT_LIMIT:
+                print(f"   ⚠️  Could not parse date '{week}': {e}")
+            return None
+
+    def keep(self, week) -> bool:
+        # Fast path: an in-range ISO week is a single pair of string comparisons
+        if not week or (week.__class__ is str and len(week) == 10 and self.start <= week <= self.end):
+            return True
+        normalised = week if isinstance(week, str) and _ISO_DATE.fullmatch(week) else self._normalise(week)
+        if normalised is None or self.start <= normalised <= self.end:
+            return True
+        self.filtered_count += 1
+        if self.filtered_count <= DEBUG_PRINT_LIMIT:  # Debug: show first few filtered dates
+            side = f"before {self.start_date}" if normalised < self.start else f"after {self.end_date}"
+            print(f"   ⚠️  Filtering out {week} ({side})")
+        return False
+
+
+class ComponentNameResolver:
+    """Memoised component name/set lookup with unmatched-key tracking"""
+
+    def __init__(self, resolve: Callable, component_metadata: Dict[str, Dict[str, str]], name_to_key: Dict[str, str]):
+        self._resolve = resolve
+        self._metadata = component_metadata
+        self._name_to_key = name_to_key
+        self._cache: Dict[tuple, tuple] = {}
+        self.unmatched_keys = set()
+
+    def __call__(self, item: Dict[str, Any]) -> tuple:
+        component_key = item.get('component_key', '')
+        cache_key = (component_key, item.get('component_name', ''))
+        names = self._cache.get(cache_key)
+        if names is None:
+            names = self._resolve(component_key, self._metadata, self._name_to_key, item)
+            self._cache[cache_key] = names
+            # Track unmatched keys for debugging
+            if names[0] == component_key and component_key not in self._metadata:
+                self.unmatched_keys.add(component_key)
+        return names
+
+
+@contextmanager
+def _csv_sink(filepath: str, header: List[str], on_rows: Optional[Callable] = None):
+    """Yield a callable writing batches of rows to `filepath`, replaced atomically on success.
+
+    `on_rows`, if given, is passed each batch as it is written.
+    """
+    with atomic_write(filepath, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        if on_rows is None:
+            yield writer.writerows
+            return
+
+        def write_batch(rows: List[list]):
+            on_rows(rows)
+            writer.writerows(rows)
+
+        yield write_batch
+
+
+def run_endpoint_spec(filename: str, pages: Iterable[List[Dict[str, Any]]], output_dir: str,
+                      start_date: str = None, end_date: str = None,
+                      resolver: Optional[ComponentNameResolver] = None, store=None,
+                      on_rows: Optional[Callable] = None) -> Dict[str, Any]:
+    """Write `filename` from pages of API records according to its spec.
+
+    Rows are built per page and written with one writerows call per page. With an
+    AnalyticsStore, rows are upserted into the store instead (replacing stored weeks
+    from `start_date` onward) and the CSV is exported from it. `on_rows` is passed
+    every batch of rows written to the CSV, e.g. to build summaries without re-reading it.
+    Returns {'rows': CSV rows, 'fetched': rows taken from this fetch, 'filtered': int, 'aggregate': stats or None}.
+    """
+    spec = ENDPOINT_SPECS[filename]
+    filepath = os.path.join(output_dir, filename)
+    week_filter = WeekFilter(start_date, end_date) if spec.get('week_filter') and start_date and end_date else None
+    write_rows = spec.get('write_rows', True)
+    if store is not None:
+        build_row = store.row_builder(filename)
+        sink = store.ingest(filename, replace_from_week=start_date)
+    else:
+        build_row = spec.get('build_row') if write_rows else None
+        sink = _csv_sink(filepath, spec['header'], on_rows)
+    resolve = resolver if spec['resolve_components'] else None
+    stats_factory, accumulate = spec.get('aggregate', (None, None))
+    stats = stats_factory() if stats_factory else None
+
+    fetched_count = 0
+    with sink as write_batch:
+        for page_records in pages:
+            batch = []
+            for item in page_records:
+                if not isinstance(item, dict):
+                    continue
+                if week_filter is not None and not week_filter.keep(item.get('week', '')):
+                    continue
+                row = build_row(item, resolve(item) if resolve else None) if build_row else None
+                if accumulate is not None:
+                    accumulate(stats, item, row)
+                if build_row:
+                    batch.append(row)
+            # Called for empty pages too: the store tells "the API returned nothing" from "no page arrived"
+            write_batch(batch)
+            fetched_count += len(batch)
+
+        if store is None and not write_rows:
+            final_rows = list(spec['final_rows'](stats))
+            write_batch(final_rows)
+            fetched_count = len(final_rows)
+
+    row_count = store.export_csv(filename, output_dir, on_rows) if store is not None else fetched_count
+
+    if resolver is not None and spec.get('report_unmatched'):
+        unmatched_keys = resolver.unmatched_keys
+        if unmatched_keys and len(unmatched_keys) <= 10:
+            print(f"   ⚠️  {len(unmatched_keys)} component keys not found in metadata (showing first few): {list(unmatched_keys)[:5]}")
+        elif unmatched_keys:
+            print(f"   ⚠️  {len(unmatched_keys)} component keys not found in metadata")
+
+    filtered_count = week_filter.filtered_count if week_filter else 0
+    if filtered_count > 0:
+        print(f"   📅 Filtered out {filtered_count} rows outside date range ({start_date} to {end_date})")
+
+    if row_count == 0:
+        print(f"⚠️  Generated: {filename} (empty - no data available)")
+    else:
+        print(f"✅ Generated: {filename} ({row_count} rows)")
+    progress.emit('file', name=filename, rows=row_count, filtered=filtered_count)
+    metrics.record_rows(row_count)
+
+    return {'rows': row_count, 'fetched': fetched_count, 'filtered': filtered_count, 'aggregate': stats}
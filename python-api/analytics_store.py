@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Analytics store
+Embedded SQLite database holding every analytics endpoint and the version
+history in indexed tables. Fetches are ingested as idempotent upserts keyed on
+(entity key, week), and the CSVs / version_history.json are exported from it.
+"""
+
+import csv
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional, Callable
+
+from analytics_engine import ENDPOINT_SPECS, compile_row_builder
+from output_files import atomic_write
+
+STORE_FILE = '.analytics.db'
+SCHEMA_VERSION = 1
+
+# Rows fetched from SQLite per round trip when exporting
+EXPORT_BATCH_SIZE = 10000
+
+# Table layout per generated CSV.
+#   table:   SQLite table holding the endpoint's rows
+#   extra:   stored after the CSV columns, typically the entity key
+#   columns: stored columns when they differ from the CSV's (export builds the CSV)
+#   key:     entity columns; weekly tables upsert on (key..., week) and replace the
+#            fetched week window, others are snapshots replaced on every fetch
+#   index:   extra lookup indexes for snapshot tables
+#   export:  SQL producing the CSV rows when they aren't the stored CSV columns
+STORE_TABLES: Dict[str, Dict[str, Any]] = {
+    'actions_by_component.csv': {
+        'table': 'component_actions', 'extra': [('component_key', 'component_key', '')], 'key': ['component_key'],
+    },
+    'actions_by_team.csv': {
+        'table': 'team_actions', 'key': ['team_name'],
+    },
+    'usages_by_component.csv': {
+        'table': 'component_usages', 'extra': [('component_key', 'component_key', '')], 'index': ['component_key'],
+    },
+    'usages_by_file.csv': {
+        'table': 'file_usages',
+        'columns': [('file_name', 'file_name', 'Unknown File'), ('component_key', 'component_key', ''),
+                    ('instances', 'instances', 0)],
+        'index': ['file_name'],
+        'export': "SELECT file_name, COUNT(DISTINCT component_key), SUM(instances) FROM file_usages "
+                  "GROUP BY file_name ORDER BY MIN(run) DESC, MIN(position)",
+    },
+    'variable_actions_by_team.csv': {
+        'table': 'variable_team_actions', 'index': ['team_name'],
+    },
+    'variable_actions_by_variable.csv': {
+        'table': 'variable_actions', 'key': ['variable_key'],
+    },
+    'styles_actions_by_style.csv': {
+        'table': 'style_actions', 'key': ['style_key'],
+    },
+    'styles_usages_by_style.csv': {
+        'table': 'style_usages', 'extra': [('style_key', 'style_key', '')], 'index': ['style_key'],
+    },
+}
+
+for _filename, _table in STORE_TABLES.items():
+    _endpoint = ENDPOINT_SPECS[_filename]
+    _table.setdefault('columns', _endpoint['columns'] + _table.get('extra', []))
+    _table['weekly'] = bool(_endpoint.get('week_filter'))
+    _table['names'] = [column[0] for column in _table['columns']]
+    _table['build_row'] = compile_row_builder(_table['columns'])
+
+
+def _table_ddl(spec: Dict[str, Any]) -> List[str]:
+    """CREATE statements for one endpoint table and its indexes"""
+    table = spec['table']
+    # Numeric defaults mark count columns; everything else is text
+    columns = [f"{name} {'INTEGER' if isinstance(default, int) else 'TEXT'}" for name, _, default in spec['columns']]
+    columns += ['run INTEGER NOT NULL', 'position INTEGER NOT NULL']
+    if spec['weekly']:
+        columns.append(f"PRIMARY KEY ({', '.join(spec['key'] + ['week'])})")
+    statements = [f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(columns)})"]
+    if spec['weekly']:
+        statements.append(f"CREATE INDEX IF NOT EXISTS {table}_week ON {table} (week)")
+    for column in spec.get('index', []):
+        statements.append(f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})")
+    statements.append(f"CREATE INDEX IF NOT EXISTS {table}_order ON {table} (run DESC, position)")
+    return statements
+
+
+class StoreIngest:
+    """Stages one fetch in a temporary table; merged into the store only if the fetch completes"""
+
+    def __init__(self, conn: sqlite3.Connection, spec: Dict[str, Any]):
+        self._conn = conn
+        self._spec = spec
+        self._insert = (f"INSERT INTO temp.stage VALUES "
+                        f"({', '.join('?' * (len(spec['names']) + 2))})")
+        self.rows = 0
+        # API pages received; an empty 200 is a page, a fetch that never got one is not
+        self.pages = 0
+        conn.execute(f"CREATE TEMP TABLE stage AS SELECT * FROM main.{spec['table']} WHERE 0")
+
+    def __call__(self, rows: List[list]):
+        """Stage the rows of one API page, built with the table's row builder (possibly none)"""
+        self.pages += 1
+        if not rows:
+            return
+        start = self.rows
+        # Staging only touches the connection's temp database, so other fetches can keep merging
+        with self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(self._insert, (row + [0, start + i] for i, row in enumerate(rows)))
+        self.rows += len(rows)
+
+    def merge(self, replace_from_week: Optional[str]):
+        """Replace the fetched window (or the whole snapshot) and upsert the staged rows.
+
+        Without a single API page there is nothing to replace the stored rows with,
+        so they are kept as they are.
+        """
+        spec = self._spec
+        if not self.pages:
+            print(f"   🗃️  No pages fetched for {spec['table']}, keeping its stored rows")
+            return
+        table = spec['table']
+        names = spec['names']
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        run = conn.execute(f"SELECT COALESCE(MAX(run), 0) + 1 FROM {table}").fetchone()[0]
+        if not spec['weekly']:
+            conn.execute(f"DELETE FROM {table}")
+            conflict = ""
+        else:
+            if replace_from_week:
+                conn.execute(f"DELETE FROM {table} WHERE week >= ?", (replace_from_week,))
+            keys = spec['key'] + ['week']
+            updates = ', '.join(f"{name} = excluded.{name}" for name in names + ['run', 'position'] if name not in keys)
+            conflict = f" ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}"
+        conn.execute(f"INSERT INTO {table} SELECT {', '.join(names)}, ?, position FROM temp.stage WHERE true{conflict}",
+                     (run,))
+        conn.execute("COMMIT")
+
+
+class AnalyticsStore:
+    """SQLite store for one library; safe to use from several threads (one connection per operation)"""
+
+    def __init__(self, path: str, file_key: str):
+        self.path = path
+        self.file_key = file_key
+        self._schema_lock = threading.Lock()
+        conn = self._connect()
+        try:
+            self._init_schema(conn)
+        finally:
+            conn.close()
+
+    @classmethod
+    def for_output_dir(cls, output_dir: str, file_key: str) -> 'AnalyticsStore':
+        return cls(os.path.join(output_dir, STORE_FILE), file_key)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _init_schema(self, conn: sqlite3.Connection):
+        with self._schema_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            for spec in STORE_TABLES.values():
+                for statement in _table_ddl(spec):
+                    conn.execute(statement)
+            conn.execute("CREATE TABLE IF NOT EXISTS versions (id TEXT PRIMARY KEY, created_at TEXT, "
+                         "user_handle TEXT, label TEXT, data TEXT NOT NULL, run INTEGER NOT NULL, position INTEGER NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS versions_created_at ON versions (created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS versions_order ON versions (run DESC, position)")
+
+            stored_key = conn.execute("SELECT value FROM meta WHERE key = 'file_key'").fetchone()
+            if stored_key and stored_key[0] != self.file_key:
+                print(f"   Analytics store belongs to another file key, clearing it")
+                for spec in STORE_TABLES.values():
+                    conn.execute(f"DELETE FROM {spec['table']}")
+                conn.execute("DELETE FROM versions")
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('file_key', ?)", (self.file_key,))
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),))
+            conn.execute("COMMIT")
+
+    def row_builder(self, filename: str):
+        """Compiled builder turning (record, resolved names) into a stored row for `filename`"""
+        return STORE_TABLES[filename]['build_row']
+
+    @contextmanager
+    def ingest(self, filename: str, replace_from_week: Optional[str] = None):
+        """Yield a callable accepting batches of stored rows; commit them when the block completes.
+
+        Weekly tables drop stored weeks from `replace_from_week` onward before upserting,
+        so refetching a window is idempotent. Nothing is written if the block raises.
+        """
+        spec = STORE_TABLES[filename]
+        conn = self._connect()
+        try:
+            staged = StoreIngest(conn, spec)
+            yield staged
+            staged.merge(replace_from_week if spec['weekly'] else None)
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def export_csv(self, filename: str, output_dir: str, on_rows: Optional[Callable] = None) -> int:
+        """Write `filename` from the store, newest fetch first in API order; returns the row count.
+
+        `on_rows`, if given, is passed each batch of exported rows.
+        """
+        spec = STORE_TABLES[filename]
+        header = ENDPOINT_SPECS[filename]['header']
+        query = spec.get('export') or (f"SELECT {', '.join(header)} FROM {spec['table']} ORDER BY run DESC, position")
+        row_count = 0
+        conn = self._connect()
+        try:
+            cursor = conn.execute(query)
+            with atomic_write(os.path.join(output_dir, filename), artifact=True) as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                while True:
+                    rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+                    if not rows:
+                        break
+                    if on_rows is not None:
+                        on_rows(rows)
+                    writer.writerows(rows)
+                    row_count += len(rows)
+        finally:
+            conn.close()
+        return row_count
+
+    def upsert_versions(self, versions: List[Dict[str, Any]]):
+        """Upsert version history entries by version id"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            run = conn.execute("SELECT COALESCE(MAX(run), 0) + 1 FROM versions").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO versions VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                "created_at = excluded.created_at, user_handle = excluded.user_handle, label = excluded.label, "
+                "data = excluded.data, run = excluded.run, position = excluded.position",
+                (
+                    (str(v.get('id', '')), v.get('created_at'), (v.get('user') or {}).get('handle'), v.get('label'),
+                     json.dumps(v, ensure_ascii=False), run, position)
+                    for position, v in enumerate(versions)
+                )
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """All stored versions, newest fetch first in API order"""
+        conn = self._connect()
+        try:
+            return [json.loads(data) for (data,) in conn.execute("SELECT data FROM versions ORDER BY run DESC, position")]
+        finally:
+            conn.close()
+
+    def query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        """Run a read-only query against the store"""
+        conn = self._connect()
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
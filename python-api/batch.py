@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Batch generation
+Refreshes every library in the dashboard's config.json in one process. All
+libraries' endpoint fetches share one bounded worker pool, so the whole
+organisation refreshes in about the time of the slowest library.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+import metrics
+import progress
+from figma_client import get_response_cache, get_rate_limiter
+from columnar_output import require_pyarrow
+from run_manifest import fresh_run_result, manifest_options
+from main import (client_options_parser, configure_client, generate_csv_files, load_component_index,
+                  finish_run_metrics, output_options_parser)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same locations server/index.js reads and writes
+DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config.json')
+DEFAULT_OUTPUT_ROOT = os.path.join(PROJECT_ROOT, 'public', 'csv')
+
+# Endpoint fetches in flight across all libraries
+DEFAULT_BATCH_WORKERS = 8
+
+# Matches /file/<key> and /design/<key> library URLs, as in server/index.js
+FILE_KEY_PATTERN = re.compile(r'/(?:file|design)/([A-Za-z0-9]+)')
+
+
+def library_file_key(url: str) -> Optional[str]:
+    """Extract the file key from a Figma library URL"""
+    cleaned = str(url or '').strip().split('?')[0].split('#')[0]
+    match = FILE_KEY_PATTERN.search(cleaned)
+    return match.group(1) if match else None
+
+
+def library_folder_name(name: str) -> str:
+    """Filesystem-safe folder name, matching sanitizeLibraryName in server/index.js"""
+    if not name or not isinstance(name, str):
+        return 'default'
+    return re.sub(r'[^a-zA-Z0-9_-]', '_', name).strip() or 'default'
+
+
+def load_libraries(config_path: str) -> tuple:
+    """Return (access token, libraries) from the dashboard config"""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    figma = config.get('figma') or {}
+    return figma.get('accessToken', ''), figma.get('libraries') or []
+
+
+def refresh_library(library: Dict[str, Any], token: str, output_root: str, executor: ThreadPoolExecutor,
+                    args: argparse.Namespace) -> Dict[str, Any]:
+    """Generate one library's outputs with its fetches scheduled on the shared executor"""
+    name = library.get('name') or library.get('id') or 'default'
+    result = {'library': name, 'status': 'failed', 'rows': 0, 'files_with_data': 0, 'failed': [], 'error': None,
+              'metrics': metrics.RunMetrics({'library': name})}
+    started = time.time()
+
+    with metrics.collecting(result['metrics']):
+        try:
+            file_key = library_file_key(library.get('url'))
+            if not file_key:
+                raise ValueError(f"Invalid Figma library URL: \"{library.get('url')}\"")
+            output_dir = os.path.join(output_root, library_folder_name(name))
+            os.makedirs(output_dir, exist_ok=True)
+
+            summary = None if args.force else fresh_run_result(
+                output_dir, token, file_key, manifest_options(args.columnar, args.store, args.partition, args.rollup_cube), args.fresh_for)
+            if summary is None:
+                data = progress.submit(executor, load_component_index, token, file_key, args.metadata_source).result()
+                summary = generate_csv_files(data, output_dir, token, file_key, incremental=args.incremental,
+                                             columnar=args.columnar, executor=executor, use_store=args.store,
+                                             partition=args.partition, rollup_cube=args.rollup_cube)
+            result.update(
+                status=summary.get('status') or ('partial' if summary['failed'] else 'ok'),
+                rows=summary['total_rows'],
+                files_with_data=summary['files_with_data'],
+                failed=summary['failed'],
+            )
+        except Exception as e:
+            print(f"❌ Error: {str(e)}")
+            result['error'] = str(e)
+
+        finish_run_metrics(result['metrics'], result['status'] in ('ok', 'fresh'))
+
+    result['seconds'] = round(time.time() - started, 1)
+    return result
+
+
+def print_summary(results: List[Dict[str, Any]], elapsed: float):
+    """One line per library, then the overall outcome"""
+    icons = {'ok': '✅', 'fresh': '✨', 'partial': '⚠️ ', 'failed': '❌'}
+    width = max(len(r['library']) for r in results)
+
+    print("\n" + "=" * 60)
+    print(f"📚 Batch summary ({len(results)} libraries in {elapsed:.1f}s)")
+    print("=" * 60)
+    for r in results:
+        detail = f"{r['rows']} rows in {r['files_with_data']} files"
+        if r['status'] == 'fresh':
+            detail += ", already up to date"
+        if r['failed']:
+            detail += f", failed: {', '.join(r['failed'])}"
+        if r['error']:
+            detail = r['error']
+        print(f"{icons[r['status']]} {r['library']:<{width}}  {r['seconds']:>6.1f}s  {detail}")
+
+    succeeded = sum(1 for r in results if r['status'] in ('ok', 'fresh'))
+    print(f"\n{succeeded}/{len(results)} libraries refreshed successfully")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate CSV files for every library in the dashboard config',
+                                     parents=[output_options_parser(), client_options_parser()])
+    parser.add_argument('--config', default=DEFAULT_CONFIG_PATH, help='Dashboard config.json listing the libraries')
+    parser.add_argument('--output-root', default=DEFAULT_OUTPUT_ROOT,
+                        help='Folder that receives one sub-folder per library (default: public/csv)')
+    parser.add_argument('--token', default=None,
+                        help='Figma access token (default: FIGMA_ACCESS_TOKEN, then figma.accessToken from the config)')
+    parser.add_argument('--library', action='append', default=None,
+                        help='Only refresh the library with this name (repeatable)')
+    parser.add_argument('--workers', type=int, default=DEFAULT_BATCH_WORKERS,
+                        help=f'Endpoint fetches in flight across all libraries (default: {DEFAULT_BATCH_WORKERS})')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Write every library\'s stage timings and request counters to this Prometheus textfile')
+    args = parser.parse_args()
+
+    try:
+        config_token, libraries = load_libraries(args.config)
+        if args.columnar:
+            require_pyarrow()
+    except (OSError, ValueError, ImportError) as e:
+        print(f"\n❌ Error: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+
+    token = args.token or os.environ.get('FIGMA_ACCESS_TOKEN') or config_token
+    if args.library:
+        libraries = [library for library in libraries if library.get('name') in args.library]
+    if not token or not libraries:
+        print(f"\n❌ Error: {'No Figma access token configured' if not token else 'No libraries to refresh'}", file=sys.stderr)
+        sys.exit(1)
+
+    configure_client(args)
+
+    output_root = os.path.abspath(args.output_root)
+    print(f"📚 Refreshing {len(libraries)} libraries into {output_root} ({args.workers} shared workers)")
+
+    # Prefix each library's output so interleaved logs stay readable
+    stdout = sys.stdout
+    print_lock = threading.Lock()
+    sys.stdout = progress.LogCapture(stdout)
+
+    def run(library: Dict[str, Any]) -> Dict[str, Any]:
+        label = library.get('name') or library.get('id') or 'default'
+
+        def on_event(event: Dict[str, Any]):
+            if event['event'] == 'log':
+                with print_lock:
+                    stdout.write(f"[{label}] {event['message']}\n")
+
+        with progress.listening(on_event):
+            return refresh_library(library, token, output_root, executor, args)
+
+    started = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            # One coordinator per library only waits on the shared pool, which does the fetching
+            with ThreadPoolExecutor(max_workers=len(libraries)) as coordinators:
+                results = list(coordinators.map(run, libraries))
+    finally:
+        sys.stdout = stdout
+
+    print_summary(results, time.time() - started)
+    if args.metrics_file:
+        try:
+            metrics.write_prometheus_textfile(args.metrics_file, [r['metrics'] for r in results])
+            print(f"📈 Metrics written to {args.metrics_file}")
+        except OSError as e:
+            print(f"⚠️  Failed to write metrics file: {str(e)}")
+    cache = get_response_cache()
+    if cache:
+        print(f"🗄️  Response cache: {cache.summary()}")
+    limiter = get_rate_limiter()
+    if limiter:
+        print(f"🚦 Rate limiter: {limiter.summary()}")
+
+    sys.exit(0 if all(r['status'] in ('ok', 'fresh') for r in results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,645 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness
+Runs each generate_* stage against the mock Figma API (mock_figma_api.py) and
+reports wall time, pages/s, records/s and peak RSS per stage. Results can be
+saved as JSON and compared with a previous run to catch regressions.
+
+    python benchmark.py --scale 10
+    python benchmark.py --scale 10 --json after.json --baseline before.json
+
+With --compare-legacy it instead runs the per-endpoint loops the row engine
+replaced (kept below as reference implementations) and the engine over the same
+in-memory pages, and checks that both write identical CSVs:
+
+    python benchmark.py --scale 10 --compare-legacy
+
+With --compare-memory it runs the two usage aggregates, the legacy dict of sets
+and the engine's compact stats, each in a fresh process streaming pages from the
+mock, and reports the memory the aggregate keeps and the peak RSS growth:
+
+    python benchmark.py --scale 10 --compare-memory
+"""
+
+import argparse
+import contextlib
+import csv
+import filecmp
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Any, Callable, Optional
+
+import progress
+from output_files import atomic_write
+
+BENCH_TOKEN = 'benchmark-token'
+BENCH_FILE_KEY = 'BenchLibrary'
+
+# Differences below these floors are treated as noise when comparing with a baseline
+MIN_SECONDS_REGRESSION = 0.05
+MIN_RSS_REGRESSION = 5 * 1024 * 1024
+
+# How often the RSS sampler polls, in seconds
+RSS_SAMPLE_INTERVAL = 0.005
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes, where /proc is available"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def max_rss() -> int:
+    """Peak RSS of the whole process so far in bytes (ru_maxrss is KB on Linux, bytes on macOS)"""
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PeakRSSSampler:
+    """Background thread tracking the peak RSS since the last reset().
+
+    Without /proc, falls back to the process-wide ru_maxrss, which never resets.
+    """
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.sampling = current_rss() is not None
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True) if self.sampling else None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            rss = current_rss() or 0
+            if rss > self.peak:
+                self.peak = rss
+
+    def __enter__(self) -> 'PeakRSSSampler':
+        if self._thread:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def reset(self):
+        self.peak = current_rss() or 0
+
+    def read(self) -> int:
+        if not self.sampling:
+            return max_rss()
+        return max(self.peak, current_rss() or 0)
+
+
+def start_mock_server(args: argparse.Namespace) -> tuple:
+    """Start mock_figma_api.py on a free port; returns (process, API base URL)"""
+    command = [
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'mock_figma_api.py'),
+        '--port', '0', '--scale', str(args.scale), '--weeks', str(args.weeks), '--page-size', str(args.page_size),
+        '--latency', str(args.latency), '--error-rate', str(args.error_rate),
+        '--throttle-rate', str(args.throttle_rate), '--retry-after', str(args.retry_after),
+    ]
+    if args.versions is not None:
+        command += ['--versions', str(args.versions)]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True, encoding='utf-8')
+    banner = process.stdout.readline()
+    if 'listening on' not in banner:
+        process.kill()
+        raise RuntimeError(f"Mock Figma API failed to start: {banner.strip() or 'no output'}")
+    # Keep draining the server's output so it never blocks on a full pipe
+    threading.Thread(target=process.stdout.read, daemon=True).start()
+    return process, banner.split('listening on', 1)[1].strip()
+
+
+def legacy_records(pages: List[List[Dict[str, Any]]]):
+    for page_records in pages:
+        for item in page_records:
+            if isinstance(item, dict):
+                yield item
+
+
+def legacy_week_in_range(week: str, start_date: str, end_date: str) -> bool:
+    """The pre-engine week filter: three strptime calls per row, unparseable weeks kept"""
+    try:
+        week_date = datetime.strptime(week, "%Y-%m-%d")
+        return datetime.strptime(start_date, "%Y-%m-%d") <= week_date <= datetime.strptime(end_date, "%Y-%m-%d")
+    except (ValueError, TypeError):
+        return True
+
+
+def legacy_actions_by_component(pages, filepath, start_date, end_date, metadata, name_to_key, get_component_name):
+    unmatched_keys = set()
+    with atomic_write(filepath, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['component_name', 'component_set_name', 'week', 'insertions', 'detachments'])
+        for item in legacy_records(pages):
+            component_key = item.get('component_key', '')
+            week = item.get('week', '')
+            insertions = item.get('insertions', 0)
+            detachments = item.get('detachments', 0)
+            if start_date and end_date and week and not legacy_week_in_range(week, start_date, end_date):
+                continue
+            component_name, component_set_name = get_component_name(component_key, metadata, name_to_key, item)
+            if component_name == component_key and component_key not in metadata:
+                unmatched_keys.add(component_key)
+            writer.writerow([component_name, component_set_name, week, insertions, detachments])
+
+
+def legacy_actions_by_team(pages, filepath, start_date, end_date, metadata, name_to_key, get_component_name):
+    with atomic_write(filepath, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['team_name', 'week', 'insertions', 'detachments'])
+        for item in legacy_records(pages):
+            team_name = item.get('team_name', 'Unknown Team')
+            week = item.get('week', '')
+            insertions = item.get('insertions', 0)
+            detachments = item.get('detachments', 0)
+            if start_date and end_date and week and not legacy_week_in_range(week, start_date, end_date):
+                continue
+            writer.writerow([team_name, week, insertions, detachments])
+
+
+def legacy_usages_by_component(pages, filepath, start_date, end_date, metadata, name_to_key, get_component_name):
+    """Per-file rows plus the dict-of-sets aggregate the engine replaced with ComponentUsageStats"""
+    component_stats = defaultdict(lambda: {'instances': 0, 'files': set(), 'teams': set(), 'component_set': ''})
+    with atomic_write(filepath, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['component_name', 'component_set_name', 'file_name', 'instances'])
+        for item in legacy_records(pages):
+            component_key = item.get('component_key', '')
+            file_name = item.get('file_name', 'Unknown File')
+            team_name = item.get('team_name', 'Unknown Team')
+            instances = item.get('instances', 0)
+            component_name, component_set_name = get_component_name(component_key, metadata, name_to_key, item)
+            stats = component_stats[component_name]
+            stats['instances'] += instances
+            stats['files'].add(file_name)
+            stats['teams'].add(team_name)
+            if component_set_name:
+                stats['component_set'] = component_set_name
+            writer.writerow([component_name, component_set_name, file_name, instances])
+    return component_stats
+
+
+def legacy_usages_by_file(pages, filepath, start_date, end_date, metadata, name_to_key, get_component_name):
+    """Per-file totals from the dict-of-sets aggregate the engine replaced with FileUsageStats"""
+    file_data = defaultdict(lambda: {'component_count': 0, 'total_instances': 0, 'team_name': '', 'workspace_name': ''})
+    component_keys_seen = defaultdict(set)
+    for item in legacy_records(pages):
+        file_name = item.get('file_name', 'Unknown File')
+        component_key = item.get('component_key', '')
+        team_name = item.get('team_name', '')
+        workspace_name = item.get('workspace_name', '')
+        stats = file_data[file_name]
+        stats['total_instances'] += item.get('instances', 0)
+        if component_key not in component_keys_seen[file_name]:
+            stats['component_count'] += 1
+            component_keys_seen[file_name].add(component_key)
+        if team_name and not stats['team_name']:
+            stats['team_name'] = team_name
+        if workspace_name and not stats['workspace_name']:
+            stats['workspace_name'] = workspace_name
+    with atomic_write(filepath, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['file_name', 'component_count', 'total_instances'])
+        for file_name, data in file_data.items():
+            writer.writerow([file_name, data['component_count'], data['total_instances']])
+    return file_data, component_keys_seen
+
+
+# The per-endpoint loops of main.py before analytics_engine.py, per CSV they wrote
+LEGACY_ENDPOINTS = {
+    'actions_by_component.csv': legacy_actions_by_component,
+    'actions_by_team.csv': legacy_actions_by_team,
+    'usages_by_component.csv': legacy_usages_by_component,
+    'usages_by_file.csv': legacy_usages_by_file,
+}
+
+
+def best_time(fn: Callable[[], Any], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - started
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def compare_with_legacy(main, output_dir: str, token: str, file_key: str, metadata_source: str,
+                        repeat: int = 3) -> List[Dict[str, Any]]:
+    """Time the legacy loops and the row engine on the same pages, fetched once up front"""
+    from analytics_engine import ENDPOINT_SPECS, ComponentNameResolver, run_endpoint_spec
+
+    start_date = main.DEFAULT_START_DATE
+    end_date = time.strftime("%Y-%m-%d")
+    metadata, name_to_key = main.get_component_metadata(main.load_component_maps(token, file_key, metadata_source))
+    legacy_dir = os.path.join(output_dir, 'legacy')
+    engine_dir = os.path.join(output_dir, 'engine')
+    os.makedirs(legacy_dir, exist_ok=True)
+    os.makedirs(engine_dir, exist_ok=True)
+
+    results = []
+    for filename, legacy in LEGACY_ENDPOINTS.items():
+        spec = ENDPOINT_SPECS[filename]
+        pages = list(main.iter_analytics_pages(token, file_key, spec['endpoint'], spec['group_by'], start_date, end_date))
+
+        def run_legacy():
+            return legacy(pages, os.path.join(legacy_dir, filename), start_date, end_date, metadata, name_to_key,
+                          main.get_component_name)
+
+        def run_engine():
+            resolver = ComponentNameResolver(main.get_component_name, metadata, name_to_key)
+            return run_endpoint_spec(filename, pages, engine_dir, start_date, end_date, resolver)
+
+        legacy_seconds = best_time(run_legacy, repeat)
+        engine_seconds = best_time(run_engine, repeat)
+        results.append({
+            'output': filename,
+            'records': sum(len(page_records) for page_records in pages),
+            'legacy_seconds': round(legacy_seconds, 3),
+            'engine_seconds': round(engine_seconds, 3),
+            'identical': filecmp.cmp(os.path.join(legacy_dir, filename), os.path.join(engine_dir, filename), shallow=False),
+        })
+    return results
+
+
+def print_legacy_comparison(results: List[Dict[str, Any]], description: str):
+    print(f"\n⚖️  Legacy loops vs row engine, same in-memory pages: {description}")
+    print("=" * 86)
+    print(f"{'output':<28} {'records':>10} {'legacy s':>10} {'engine s':>10} {'speedup':>9} {'identical':>10}")
+    print("-" * 86)
+    for r in results:
+        speedup = r['legacy_seconds'] / r['engine_seconds'] if r['engine_seconds'] else 0.0
+        print(f"{r['output']:<28} {r['records']:>10} {r['legacy_seconds']:>10.3f} {r['engine_seconds']:>10.3f} "
+              f"{speedup:>8.2f}x {'yes' if r['identical'] else 'NO':>10}")
+
+
+# The outputs whose aggregates were moved to compact_records.py
+MEMORY_OUTPUTS = ('usages_by_component.csv', 'usages_by_file.csv')
+MEMORY_VARIANTS = ('legacy', 'engine')
+
+
+def memory_probe(main, output_dir: str, token: str, file_key: str, metadata_source: str,
+                 filename: str, variant: str, traced: bool) -> Dict[str, Any]:
+    """Stream `filename`'s pages through one variant and measure what its aggregate costs.
+
+    With `traced`, tracemalloc reports the bytes the aggregate still holds once the
+    pages are gone and the traced peak; without it, the peak RSS growth is sampled
+    (tracemalloc's own bookkeeping would inflate RSS).
+    """
+    from analytics_engine import ENDPOINT_SPECS, ComponentNameResolver, run_endpoint_spec
+
+    start_date = main.DEFAULT_START_DATE
+    end_date = time.strftime("%Y-%m-%d")
+    metadata, name_to_key = main.get_component_metadata(main.load_component_maps(token, file_key, metadata_source))
+    spec = ENDPOINT_SPECS[filename]
+    pages = main.iter_analytics_pages(token, file_key, spec['endpoint'], spec['group_by'], start_date, end_date)
+    gc.collect()
+
+    if traced:
+        tracemalloc.start()
+    baseline = current_rss() or 0
+    with PeakRSSSampler() as sampler:
+        sampler.reset()
+        if variant == 'legacy':
+            aggregate = LEGACY_ENDPOINTS[filename](pages, os.path.join(output_dir, filename), start_date, end_date,
+                                                   metadata, name_to_key, main.get_component_name)
+        else:
+            resolver = ComponentNameResolver(main.get_component_name, metadata, name_to_key)
+            aggregate = run_endpoint_spec(filename, pages, output_dir, start_date, end_date, resolver)['aggregate']
+        gc.collect()
+        rss_peak = sampler.read()
+
+    result = {'output': filename, 'variant': variant}
+    if traced:
+        retained, traced_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result.update(retained_bytes=retained, traced_peak_bytes=traced_peak)
+    else:
+        result['rss_growth_bytes'] = max(rss_peak - baseline, 0)
+    del aggregate
+    return result
+
+
+def compare_memory(args: argparse.Namespace, api_base: str, output_dir: str) -> List[Dict[str, Any]]:
+    """Run every (output, variant) memory probe in its own process, so no run reuses another's freed memory"""
+    results = []
+    for filename in MEMORY_OUTPUTS:
+        for variant in MEMORY_VARIANTS:
+            result = {}
+            for traced in (True, False):
+                command = [
+                    sys.executable, os.path.abspath(__file__), '--api-base', api_base, '--token', args.token,
+                    '--file-key', args.file_key, '--metadata-source', args.metadata_source,
+                    '--output-dir', os.path.join(output_dir, variant), '--memory-probe', f"{filename}:{variant}",
+                ]
+                if traced:
+                    command.append('--traced')
+                probe = subprocess.run(command, stdout=subprocess.PIPE, text=True, encoding='utf-8', check=True)
+                result.update(json.loads(probe.stdout.strip().splitlines()[-1]))
+            results.append(result)
+    return results
+
+
+def print_memory_comparison(results: List[Dict[str, Any]], description: str):
+    print(f"\n🧠 Usage aggregates, legacy dict of sets vs compact stats: {description}")
+    print("=" * 80)
+    print(f"{'output':<26} {'variant':<8} {'retained MB':>12} {'traced peak MB':>15} {'RSS growth MB':>15}")
+    print("-" * 80)
+    for r in results:
+        print(f"{r['output']:<26} {r['variant']:<8} {r['retained_bytes'] / 1048576:>12.2f} "
+              f"{r['traced_peak_bytes'] / 1048576:>15.2f} {r['rss_growth_bytes'] / 1048576:>15.2f}")
+
+
+def benchmark_stages(main, output_dir: str, token: str, file_key: str, metadata_source: str,
+                     store=None) -> List[tuple]:
+    """(stage name, callable returning the rows produced) for every generate_* stage, in run order"""
+    start_date = main.DEFAULT_START_DATE
+    end_date = time.strftime("%Y-%m-%d")
+    loaded = {}
+
+    def load_metadata():
+        loaded['data'] = main.load_component_maps(token, file_key, metadata_source)
+        loaded['metadata'], loaded['name_to_key'] = main.get_component_metadata(loaded['data'])
+        return len(loaded['metadata'])
+
+    def endpoint(generate: Callable, resolves_components: bool = False) -> Callable:
+        def run():
+            if resolves_components:
+                result = generate(output_dir, token, file_key, loaded['metadata'], loaded['name_to_key'],
+                                  start_date, end_date, store=store)
+            else:
+                result = generate(output_dir, token, file_key, start_date, end_date, store=store)
+            return result['rows']
+        return run
+
+    return [
+        ('load_component_maps', load_metadata),
+        ('generate_actions_by_component_csv', endpoint(main.generate_actions_by_component_csv, True)),
+        ('generate_actions_by_team_csv', endpoint(main.generate_actions_by_team_csv)),
+        ('generate_usages_by_component_csv', endpoint(main.generate_usages_by_component_csv, True)),
+        ('generate_usages_by_file_csv', endpoint(main.generate_usages_by_file_csv)),
+        ('generate_variable_actions_by_team_csv', endpoint(main.generate_variable_actions_by_team_csv)),
+        ('generate_variable_actions_by_variable_csv', endpoint(main.generate_variable_actions_by_variable_csv)),
+        ('generate_styles_actions_by_style_csv', endpoint(main.generate_styles_actions_by_style_csv)),
+        ('generate_styles_usages_by_style_csv', endpoint(main.generate_styles_usages_by_style_csv)),
+        ('generate_version_history_json', lambda: main.generate_version_history_json(output_dir, token, file_key, store=store)),
+    ]
+
+
+def run_stage(name: str, fn: Callable[[], int], sampler: PeakRSSSampler) -> Dict[str, Any]:
+    """Time one stage, counting the pages and records it fetched from its progress events"""
+    counters = {'pages': 0, 'records': 0}
+    fetched = {}
+
+    def on_event(event: Dict[str, Any]):
+        if event['event'] == 'page':
+            fetch = (event.get('endpoint'), event.get('group_by'))
+            counters['pages'] += 1
+            counters['records'] += event['records'] - fetched.get(fetch, 0)
+            fetched[fetch] = event['records']
+
+    gc.collect()
+    sampler.reset()
+    rss_before = current_rss() or 0
+    error = None
+    rows = 0
+    started = time.perf_counter()
+    with progress.listening(on_event):
+        try:
+            rows = fn() or 0
+        except Exception as e:
+            error = str(e)
+    seconds = time.perf_counter() - started
+    per_second = (lambda count: round(count / seconds, 1) if seconds > 0 else 0.0)
+    return {
+        'stage': name,
+        'seconds': round(seconds, 3),
+        'pages': counters['pages'],
+        'pages_per_second': per_second(counters['pages']),
+        'records': counters['records'],
+        'records_per_second': per_second(counters['records']),
+        'rows': rows,
+        'peak_rss': sampler.read(),
+        'rss_growth': max(0, sampler.read() - rss_before),
+        'error': error,
+    }
+
+
+def print_results(results: List[Dict[str, Any]], description: str):
+    print(f"\n⏱️  Benchmark: {description}")
+    print("=" * 118)
+    print(f"{'stage':<42} {'seconds':>8} {'pages':>7} {'pages/s':>9} {'records':>10} {'records/s':>11} "
+          f"{'rows':>10} {'peak MB':>8} {'+MB':>7}")
+    print("-" * 118)
+    for r in results:
+        line = (f"{r['stage']:<42} {r['seconds']:>8.2f} {r['pages']:>7} {r['pages_per_second']:>9.1f} "
+                f"{r['records']:>10} {r['records_per_second']:>11.0f} {r['rows']:>10} "
+                f"{r['peak_rss'] / 1048576:>8.1f} {r['rss_growth'] / 1048576:>7.1f}")
+        print(line + (f"  ❌ {r['error']}" if r['error'] else ""))
+    print("-" * 118)
+    total_seconds = sum(r['seconds'] for r in results)
+    total_records = sum(r['records'] for r in results)
+    print(f"{'total':<42} {total_seconds:>8.2f} {sum(r['pages'] for r in results):>7} {'':>9} {total_records:>10} "
+          f"{(total_records / total_seconds if total_seconds else 0):>11.0f} {sum(r['rows'] for r in results):>10} "
+          f"{max(r['peak_rss'] for r in results) / 1048576:>8.1f}")
+
+
+def find_regressions(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Stages whose wall time or peak RSS grew by more than `tolerance` over the baseline"""
+    previous = {r['stage']: r for r in baseline}
+    regressions = []
+    for r in results:
+        before = previous.get(r['stage'])
+        if not before:
+            continue
+        if r['seconds'] > before['seconds'] * (1 + tolerance) and r['seconds'] - before['seconds'] > MIN_SECONDS_REGRESSION:
+            regressions.append(f"{r['stage']}: {before['seconds']:.2f}s -> {r['seconds']:.2f}s")
+        if r['peak_rss'] > before['peak_rss'] * (1 + tolerance) and r['peak_rss'] - before['peak_rss'] > MIN_RSS_REGRESSION:
+            regressions.append(f"{r['stage']}: peak RSS {before['peak_rss'] / 1048576:.1f} MB -> "
+                               f"{r['peak_rss'] / 1048576:.1f} MB")
+    return regressions
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Benchmark every generate_* stage against the mock Figma API')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Synthetic library size relative to the ZDS_Components sample (default: 1)')
+    parser.add_argument('--weeks', type=int, default=52, help='Weeks of analytics history (default: 52)')
+    parser.add_argument('--versions', type=int, default=None, help='Versions in the synthetic file history')
+    parser.add_argument('--page-size', type=int, default=1000, help='Analytics rows per page (default: 1000)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of injected latency per request')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with a 5xx')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Share of requests answered with a 429')
+    parser.add_argument('--retry-after', type=float, default=0.0, help='Retry-After seconds sent with injected 429s')
+    parser.add_argument('--api-base', default=None,
+                        help='Benchmark against an already running API (e.g. http://127.0.0.1:8765/v1) '
+                             'instead of starting the mock')
+    parser.add_argument('--token', default=BENCH_TOKEN, help='Access token sent to the API')
+    parser.add_argument('--file-key', default=BENCH_FILE_KEY, help='File key requested from the API')
+    parser.add_argument('--metadata-source', choices=('published', 'file'), default='published',
+                        help='Component name source (default: published)')
+    parser.add_argument('--rate-limit', type=float, default=0,
+                        help='Client rate limit in requests per minute (default: 0 = unlimited)')
+    parser.add_argument('--store', action='store_true', help='Run the stages through the SQLite analytics store')
+    parser.add_argument('--stage', action='append', default=None,
+                        help='Only run stages whose name contains this text (repeatable); metadata always loads')
+    parser.add_argument('--output-dir', default=None, help='Where outputs are written (default: a temporary folder)')
+    parser.add_argument('--json', default=None, help='Save the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='Compare with the results JSON of an earlier run')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown or RSS growth over the baseline, as a fraction (default: 0.25)')
+    parser.add_argument('--compare-legacy', action='store_true',
+                        help='Instead of the stages, compare the pre-engine per-endpoint loops with the row engine '
+                             'on the same pages and check their CSVs are identical')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='Runs per side with --compare-legacy; the fastest is reported (default: 3)')
+    parser.add_argument('--compare-memory', action='store_true',
+                        help='Instead of the stages, compare the memory of the legacy dict-of-sets usage aggregates '
+                             'with the compact stats, each in a fresh process')
+    parser.add_argument('--memory-probe', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--traced', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--verbose', action='store_true', help='Show the generator\'s own output')
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+
+    server = None
+    api_base = args.api_base
+    if api_base is None:
+        server, api_base = start_mock_server(args)
+    # figma_client reads the base URL when it is first imported
+    os.environ['FIGMA_API_BASE'] = api_base
+    import main as generator
+    from figma_client import configure_response_cache, configure_rate_limiter, get_session
+    from rate_limiter import RateLimiter
+    from pagination_checkpoint import configure_checkpoints
+    from analytics_store import AnalyticsStore
+
+    # Measure the fetch and write paths themselves, not the cache or checkpoint replay
+    configure_response_cache(None)
+    configure_checkpoints(None)
+    configure_rate_limiter(RateLimiter(args.rate_limit) if args.rate_limit > 0 else None)
+
+    output_dir = args.output_dir or tempfile.mkdtemp(prefix='figma-benchmark-')
+    os.makedirs(output_dir, exist_ok=True)
+
+    if args.memory_probe:
+        filename, variant = args.memory_probe.split(':')
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            result = memory_probe(generator, output_dir, args.token, args.file_key, args.metadata_source,
+                                  filename, variant, args.traced)
+        print(json.dumps(result))
+        return
+
+    if args.compare_memory:
+        description = f"scale {args.scale:g}, {args.weeks} weeks, page size {args.page_size}"
+        try:
+            comparison = compare_memory(args, api_base, output_dir)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        print_memory_comparison(comparison, description)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'description': description, 'scale': args.scale, 'memory': comparison}, f, indent=2)
+            print(f"💾 Results saved to {args.json}")
+        return
+
+    if args.compare_legacy:
+        description = f"scale {args.scale:g}, {args.weeks} weeks, page size {args.page_size}, best of {args.repeat}"
+        try:
+            with open(os.devnull, 'w') as devnull:
+                with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull):
+                    comparison = compare_with_legacy(generator, output_dir, args.token, args.file_key,
+                                                     args.metadata_source, args.repeat)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+        print_legacy_comparison(comparison, description)
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'description': description, 'scale': args.scale, 'comparison': comparison}, f, indent=2)
+            print(f"💾 Results saved to {args.json}")
+        if not all(r['identical'] for r in comparison):
+            print("\n❌ The row engine's output differs from the legacy loops")
+        sys.exit(0 if all(r['identical'] for r in comparison) else 1)
+
+    store = AnalyticsStore.for_output_dir(output_dir, args.file_key) if args.store else None
+    stages = benchmark_stages(generator, output_dir, args.token, args.file_key, args.metadata_source, store)
+    if args.stage:
+        stages = [stage for i, stage in enumerate(stages) if i == 0 or any(text in stage[0] for text in args.stage)]
+
+    description = (f"scale {args.scale:g}, {args.weeks} weeks, page size {args.page_size}, "
+                   f"latency {args.latency:g}s, {'store' if args.store else 'csv'} mode against {api_base}")
+    results = []
+    try:
+        with PeakRSSSampler() as sampler, open(os.devnull, 'w') as devnull:
+            for name, fn in stages:
+                print(f"▶️  {name}...", flush=True)
+                with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(devnull):
+                    results.append(run_stage(name, fn, sampler))
+        if server is not None:
+            stats = get_session().get(f"{api_base.rsplit('/v1', 1)[0]}/__stats", timeout=10).json()
+            description += (f"; server saw {stats['requests']} requests, {stats['errors']} injected errors, "
+                            f"{stats['throttled']} throttled")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_results(results, description)
+    print(f"\n📁 Outputs: {output_dir}")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'description': description, 'scale': args.scale, 'results': results}, f, indent=2)
+        print(f"💾 Results saved to {args.json}")
+
+    failed = [r['stage'] for r in results if r['error']]
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('scale') != args.scale:
+            print(f"\n⚠️  Baseline was recorded at scale {baseline.get('scale')}, this run used scale {args.scale:g}")
+        regressions = find_regressions(results, baseline['results'], args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) over {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"   {regression}")
+        else:
+            print(f"\n✅ No regressions over {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    sys.exit(1 if failed or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
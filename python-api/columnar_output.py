@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Columnar output
+Writes typed, dictionary-encoded Parquet or Arrow IPC copies of the generated CSVs.
+Requires the optional `pyarrow` package.
+"""
+
+import csv
+import os
+from typing import Dict, List
+
+COLUMNAR_FORMATS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Column types for every CSV written by main.py; same columns, same order.
+# 'string' columns are dictionary-encoded, 'int' columns are 32-bit integers.
+CSV_SCHEMAS: Dict[str, Dict[str, str]] = {
+    'actions_by_component.csv': {
+        'component_name': 'string', 'component_set_name': 'string', 'week': 'string',
+        'insertions': 'int', 'detachments': 'int',
+    },
+    'actions_by_team.csv': {
+        'team_name': 'string', 'week': 'string', 'insertions': 'int', 'detachments': 'int',
+    },
+    'usages_by_component.csv': {
+        'component_name': 'string', 'component_set_name': 'string', 'file_name': 'string', 'instances': 'int',
+    },
+    'usages_by_file.csv': {
+        'file_name': 'string', 'component_count': 'int', 'total_instances': 'int',
+    },
+    'variable_actions_by_team.csv': {
+        'team_name': 'string', 'variable_name': 'string', 'actions': 'int',
+    },
+    'variable_actions_by_variable.csv': {
+        'variable_key': 'string', 'week': 'string', 'detachments': 'int', 'insertions': 'int',
+        'variable_name': 'string', 'variable_type': 'string', 'collection_key': 'string', 'collection_name': 'string',
+    },
+    'styles_actions_by_style.csv': {
+        'style_key': 'string', 'week': 'string', 'detachments': 'int', 'insertions': 'int',
+        'style_name': 'string', 'style_type': 'string',
+    },
+    'styles_usages_by_style.csv': {
+        'style_name': 'string', 'style_type': 'string', 'file_name': 'string', 'instances': 'int',
+    },
+    'usages_by_component_summary.csv': {
+        'component_name': 'string', 'component_set_name': 'string',
+        'num_instances': 'int', 'num_files_using': 'int', 'num_teams_using': 'int',
+    },
+    'team_weekly_totals.csv': {
+        'team_name': 'string', 'week': 'string', 'insertions': 'int', 'detachments': 'int',
+    },
+    'library_weekly_totals.csv': {
+        'week': 'string', 'insertions': 'int', 'detachments': 'int', 'active_components': 'int', 'active_teams': 'int',
+    },
+}
+
+
+def require_pyarrow():
+    """Import pyarrow or raise an ImportError explaining how to install it"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Columnar output requires pyarrow. Install it with: pip install pyarrow")
+    return pyarrow
+
+
+def _parse_int(value: str):
+    if value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return int(float(value))
+
+
+def _dictionary_index_type(pa, size: int):
+    """Smallest signed index type able to address a dictionary of `size` values"""
+    if size <= 127:
+        return pa.int8()
+    if size <= 32767:
+        return pa.int16()
+    return pa.int32()
+
+
+def read_csv_table(csv_path: str, schema: Dict[str, str]):
+    """Load a generated CSV into a typed pyarrow Table with dictionary-encoded strings"""
+    pa = require_pyarrow()
+
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or list(schema.keys())
+        columns: List[list] = [[] for _ in header]
+        for row in reader:
+            for index, value in enumerate(row[:len(header)]):
+                columns[index].append(value)
+
+    arrays = []
+    for name, values in zip(header, columns):
+        if schema.get(name) == 'int':
+            arrays.append(pa.array([_parse_int(v) for v in values], type=pa.int32()))
+        else:
+            encoded = pa.array(values, type=pa.string()).dictionary_encode()
+            index_type = _dictionary_index_type(pa, len(encoded.dictionary))
+            arrays.append(encoded.cast(pa.dictionary(index_type, pa.string())))
+    return pa.Table.from_arrays(arrays, names=header)
+
+
+def write_columnar_file(csv_path: str, columnar_format: str) -> str:
+    """Write a columnar copy next to `csv_path` and return its path.
+
+    Parquet files are zstd-compressed. Arrow IPC files are left uncompressed
+    so browsers can read them with apache-arrow without a codec.
+    """
+    pa = require_pyarrow()
+    filename = os.path.basename(csv_path)
+    table = read_csv_table(csv_path, CSV_SCHEMAS.get(filename, {}))
+
+    output_path = os.path.splitext(csv_path)[0] + COLUMNAR_FORMATS[columnar_format]
+    tmp_path = f"{output_path}.tmp"
+    if columnar_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, tmp_path, compression='zstd', use_dictionary=True)
+    else:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def write_columnar_outputs(output_dir: str, columnar_format: str, filenames: List[str]):
+    """Write columnar copies of the given CSVs, reporting sizes next to the CSV originals"""
+    for filename in filenames:
+        csv_path = os.path.join(output_dir, filename)
+        if not os.path.exists(csv_path):
+            continue
+        try:
+            output_path = write_columnar_file(csv_path, columnar_format)
+        except Exception as e:
+            print(f"⚠️  Failed to write {columnar_format} copy of {filename}: {str(e)}")
+            continue
+        csv_size = os.path.getsize(csv_path)
+        columnar_size = os.path.getsize(output_path)
+        print(f"✅ Generated: {os.path.basename(output_path)} ({columnar_size:,} bytes, CSV: {csv_size:,} bytes)")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Compact usage aggregates
+Per-component and per-file usage totals kept in array-backed columns instead of
+a dict of sets per entity. Names, file names, teams and component keys are
+interned once in a StringPool and referenced by integer id; the distinct files,
+teams or component keys of an entity are appended to a 4-byte id array, which
+is sorted and de-duplicated in place whenever it doubles. Rows don't have to
+arrive grouped by entity: each array stays under twice its distinct ids, so the
+aggregate is a few bytes per distinct (entity, id) pair, not per usage row.
+"""
+
+from array import array
+from typing import Iterator, List, Hashable
+
+# Typecodes: 4-byte string ids, 8-byte counters
+ID_TYPECODE = 'i'
+COUNT_TYPECODE = 'q'
+
+# Length at which an id array is first de-duplicated
+DISTINCT_IDS_MIN_LIMIT = 16
+
+
+class StringPool:
+    """Interns values to dense integer ids in first-seen order.
+
+    With reserve_empty, id 0 is the empty string, so a zeroed id column means "none".
+    """
+
+    __slots__ = ('ids', 'values')
+
+    def __init__(self, reserve_empty: bool = False):
+        self.ids = {'': 0} if reserve_empty else {}
+        self.values = [''] if reserve_empty else []
+
+    def id(self, value: Hashable) -> int:
+        ident = self.ids.get(value)
+        if ident is None:
+            ident = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return ident
+
+    def __getitem__(self, ident: int):
+        return self.values[ident]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class DistinctIds(array):
+    """Append-only id array kept under twice its distinct ids.
+
+    Repeats of the last id are skipped; once the array reaches `limit` it is sorted
+    and de-duplicated in place and the limit doubles past what is left.
+    """
+
+    __slots__ = ('limit',)
+
+    def __new__(cls):
+        ids = super().__new__(cls, ID_TYPECODE)
+        ids.limit = DISTINCT_IDS_MIN_LIMIT
+        return ids
+
+    def add(self, ident: int):
+        if self and self[-1] == ident:
+            return
+        self.append(ident)
+        if len(self) >= self.limit:
+            self[:] = array(ID_TYPECODE, sorted(set(self)))
+            self.limit = max(DISTINCT_IDS_MIN_LIMIT, 2 * len(self))
+
+    def distinct(self) -> int:
+        return len(set(self))
+
+
+class ComponentUsageStats:
+    """Instances, component set and distinct files/teams per resolved component name"""
+
+    __slots__ = ('components', 'strings', 'instances', 'component_sets', 'files', 'teams')
+
+    def __init__(self):
+        self.components = StringPool()
+        self.strings = StringPool(reserve_empty=True)
+        # Columns indexed by component id, in the order components were first seen
+        self.instances = array(COUNT_TYPECODE)
+        self.component_sets = array(ID_TYPECODE)
+        self.files: List[DistinctIds] = []
+        self.teams: List[DistinctIds] = []
+
+    def add(self, name: str, component_set: str, file_name: str, team_name: str, instances: int):
+        index = self.components.id(name)
+        if index == len(self.instances):
+            self.instances.append(0)
+            self.component_sets.append(0)
+            self.files.append(DistinctIds())
+            self.teams.append(DistinctIds())
+        self.instances[index] += int(instances or 0)
+        strings = self.strings
+        self.files[index].add(strings.id(file_name))
+        self.teams[index].add(strings.id(team_name))
+        if component_set:
+            self.component_sets[index] = strings.id(component_set)
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def summary_rows(self) -> Iterator[list]:
+        """[name, component_set, instances, files, teams] per component"""
+        strings = self.strings
+        for index, name in enumerate(self.components.values):
+            yield [name, strings[self.component_sets[index]], self.instances[index],
+                   self.files[index].distinct(), self.teams[index].distinct()]
+
+
+class FileUsageStats:
+    """Instances, distinct component keys and the first team/workspace seen per file"""
+
+    __slots__ = ('files', 'strings', 'instances', 'teams', 'workspaces', 'component_keys')
+
+    def __init__(self):
+        self.files = StringPool()
+        self.strings = StringPool(reserve_empty=True)
+        self.instances = array(COUNT_TYPECODE)
+        self.teams = array(ID_TYPECODE)
+        self.workspaces = array(ID_TYPECODE)
+        self.component_keys: List[DistinctIds] = []
+
+    def add(self, file_name: str, component_key: str, team_name: str, workspace_name: str, instances: int):
+        index = self.files.id(file_name)
+        if index == len(self.instances):
+            self.instances.append(0)
+            self.teams.append(0)
+            self.workspaces.append(0)
+            self.component_keys.append(DistinctIds())
+        self.instances[index] += int(instances or 0)
+        self.component_keys[index].add(self.strings.id(component_key))
+        if team_name and not self.teams[index]:
+            self.teams[index] = self.strings.id(team_name)
+        if workspace_name and not self.workspaces[index]:
+            self.workspaces[index] = self.strings.id(workspace_name)
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def rows(self) -> Iterator[list]:
+        """[file_name, component_count, total_instances] per file"""
+        for index, file_name in enumerate(self.files.values):
+            yield [file_name, self.component_keys[index].distinct(), self.instances[index]]
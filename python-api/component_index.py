@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Component index
+Persists the resolved component key -> (name, component set) index per file key
+and metadata source, tagged with the file's version and lastModified. A cheap
+depth=1 file request tells whether the library changed since the index was
+saved; if not, the components endpoints (or the full document) are not fetched.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Optional
+
+from figma_client import FIGMA_API_BASE, FigmaAPIError, figma_get
+from output_files import atomic_write
+
+DEFAULT_INDEX_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'component_index')
+INDEX_SCHEMA_VERSION = 1
+
+_index_store: Optional['ComponentIndexStore'] = None
+
+
+class ComponentIndex:
+    """Component metadata and the name -> key reverse lookup get_component_name resolves against"""
+
+    def __init__(self, metadata: Dict[str, Dict[str, str]], name_to_key: Dict[str, str] = None,
+                 version: Optional[Dict[str, str]] = None):
+        self.metadata = metadata
+        self.version = version
+        if name_to_key is None:
+            # First occurrence wins, as in get_component_metadata
+            name_to_key = {}
+            for key, data in metadata.items():
+                name = data.get('name', '')
+                if name and name not in name_to_key:
+                    name_to_key[name] = key
+        self.name_to_key = name_to_key
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+
+def fetch_file_version(token: str, file_key: str) -> Optional[Dict[str, str]]:
+    """{'version', 'last_modified'} of the file from a depth=1 request, or None if unavailable"""
+    try:
+        response = figma_get(f"{FIGMA_API_BASE}/files/{file_key}", token, params={'depth': 1})
+        if response.status_code != 200:
+            return None
+        data = response.json()
+    except (FigmaAPIError, ValueError) as e:
+        print(f"⚠️  Could not check the file version: {str(e)}")
+        return None
+    if not data.get('version'):
+        return None
+    return {'version': str(data['version']), 'last_modified': data.get('lastModified', '')}
+
+
+class ComponentIndexStore:
+    """Directory of saved component indexes, one file per (file key, metadata source).
+
+    Only reached after an authenticated version check, so a token without
+    access to the file never gets names from the index.
+    """
+
+    def __init__(self, directory: str = DEFAULT_INDEX_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, file_key: str, source: str) -> str:
+        return os.path.join(self.directory, f"{file_key}-{source}.json")
+
+    def load(self, file_key: str, source: str, version: Dict[str, str]) -> Optional[ComponentIndex]:
+        """The saved index if it was built from exactly this file version, else None"""
+        try:
+            with open(self._path(file_key, source), 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (saved.get('schema_version') != INDEX_SCHEMA_VERSION or saved.get('version') != version['version']
+                or saved.get('last_modified') != version['last_modified']):
+            return None
+        metadata = {key: {'name': name, 'component_set': component_set}
+                    for key, (name, component_set) in saved.get('components', {}).items()}
+        return ComponentIndex(metadata, version=version)
+
+    def save(self, file_key: str, source: str, index: ComponentIndex):
+        if not index.version:
+            return
+        with atomic_write(self._path(file_key, source)) as f:
+            json.dump({
+                'schema_version': INDEX_SCHEMA_VERSION,
+                'file_key': file_key,
+                'source': source,
+                'version': index.version['version'],
+                'last_modified': index.version['last_modified'],
+                'saved_at': time.time(),
+                'components': {key: [data.get('name', ''), data.get('component_set', '')]
+                               for key, data in index.metadata.items()},
+            }, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def configure_component_index(store: Optional[ComponentIndexStore]):
+    """Enable (or with None, disable) the persistent component index"""
+    global _index_store
+    _index_store = store
+
+
+def get_component_index() -> Optional[ComponentIndexStore]:
+    return _index_store
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Date-window sharding
+Splits a long weekly analytics range into week-aligned windows (one per month,
+per quarter, or N equal parts) so each window is paged through its own cursor,
+concurrently with the others. Every analytics week (starting on Sunday) belongs
+to exactly one window, and a window's request ends on the Saturday before the
+next window's first week, so the windows never overlap. Records a window
+returns for weeks outside its own are dropped when the windows are merged.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+SHARD_MODES = ('month', 'quarter')
+DEFAULT_SHARD_WORKERS = 4
+
+_ISO_WEEK = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+_sharding: Optional['ShardPlan'] = None
+
+
+def parse_shard_spec(value: str) -> str:
+    """argparse type for --shard: 'month', 'quarter' or a number of windows"""
+    value = value.strip().lower()
+    if value in SHARD_MODES or (value.isdigit() and int(value) >= 1):
+        return value
+    raise ValueError(f"expected {', '.join(SHARD_MODES)} or a number of windows, got '{value}'")
+
+
+def week_starts(start_date: str, end_date: str) -> List[str]:
+    """Sunday week starts between start_date and end_date, inclusive, oldest first"""
+    start = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    week = start + timedelta(days=(6 - start.weekday()) % 7)
+    weeks = []
+    while week <= end:
+        weeks.append(week.strftime("%Y-%m-%d"))
+        week += timedelta(weeks=1)
+    return weeks
+
+
+class DateWindow:
+    """A run of consecutive analytics weeks fetched with one start_date/end_date request"""
+
+    def __init__(self, weeks: List[str], end_date: str):
+        self.first_week = weeks[0]
+        self.last_week = weeks[-1]
+        self.start_date = self.first_week
+        # Through the Saturday ending the last week, never past the requested range
+        week_end = (datetime.strptime(self.last_week, "%Y-%m-%d") + timedelta(days=6)).strftime("%Y-%m-%d")
+        self.end_date = min(week_end, end_date)
+
+    def contains(self, week) -> bool:
+        # Weeks that aren't ISO dates can't be placed in a window and are left to WeekFilter
+        if not isinstance(week, str) or not _ISO_WEEK.match(week):
+            return True
+        return self.first_week <= week[:10] <= self.last_week
+
+    def __repr__(self) -> str:
+        return f"{self.first_week}..{self.last_week}"
+
+
+class ShardPlan:
+    """How weekly endpoints split their date range, and how many windows are fetched at once"""
+
+    def __init__(self, spec: str, workers: int = DEFAULT_SHARD_WORKERS):
+        self.spec = parse_shard_spec(spec)
+        self.workers = max(1, workers)
+
+    def windows(self, start_date: str, end_date: str) -> List[DateWindow]:
+        """Week-aligned windows covering the range, oldest first"""
+        weeks = week_starts(start_date, end_date)
+        if not weeks:
+            return []
+        if self.spec == 'month':
+            groups = _group_weeks(weeks, lambda week: week[:7])
+        elif self.spec == 'quarter':
+            groups = _group_weeks(weeks, lambda week: (week[:4], (int(week[5:7]) - 1) // 3))
+        else:
+            count = min(int(self.spec), len(weeks))
+            size, extra = divmod(len(weeks), count)
+            groups, offset = [], 0
+            for i in range(count):
+                length = size + (1 if i < extra else 0)
+                groups.append(weeks[offset:offset + length])
+                offset += length
+        return [DateWindow(group, end_date) for group in groups]
+
+
+def _group_weeks(weeks: List[str], key) -> List[List[str]]:
+    # A week belongs to the month (or quarter) its Sunday falls in
+    groups = []
+    for week in weeks:
+        if groups and key(groups[-1][0]) == key(week):
+            groups[-1].append(week)
+        else:
+            groups.append([week])
+    return groups
+
+
+def configure_sharding(plan: Optional[ShardPlan]):
+    """Enable (or with None, disable) date-window sharding of weekly endpoints"""
+    global _sharding
+    _sharding = plan
+
+
+def get_sharding() -> Optional[ShardPlan]:
+    return _sharding
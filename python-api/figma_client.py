@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Figma API client
+Shared HTTP transport for every Figma API call: pooled keep-alive connections,
+gzip responses, a shared rate limit and retries with jittered exponential backoff
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from response_cache import CachedResponse, ResponseCache
+from rate_limiter import RateLimiter
+
+# Figma API base URL; FIGMA_API_BASE points runs at a stand-in such as mock_figma_api.py
+FIGMA_API_BASE = os.environ.get("FIGMA_API_BASE", "https://api.figma.com/v1").rstrip("/")
+
+# Per-request timeout in seconds (connect and read)
+DEFAULT_TIMEOUT = 30
+
+# Retry policy for transient failures
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+RETRY_STATUS_CODES = {500, 502, 503, 504}
+
+# Connections kept alive per host; sized for concurrent endpoint fetches
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache: Optional[ResponseCache] = None
+_rate_limiter: Optional[RateLimiter] = RateLimiter()
+
+
+class FigmaAPIError(Exception):
+    """Raised when a Figma API call fails after all retries"""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                # Retries are handled in figma_get so 429/Retry-After can be honoured
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=0)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                # requests already asks for gzip/deflate and decodes the response
+                session.headers["Accept"] = "application/json"
+                _session = session
+    return _session
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff delay for the given attempt (0-based)"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _body_size(response: requests.Response, stream: bool) -> int:
+    """Response body size in bytes, from Content-Length when the body isn't read up front"""
+    if not stream:
+        return len(response.content)
+    try:
+        return int(response.headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+
+def configure_response_cache(cache: Optional[ResponseCache]):
+    """Enable (or with None, disable) the on-disk cache used by cacheable figma_get calls"""
+    global _response_cache
+    _response_cache = cache
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    return _response_cache
+
+
+def configure_rate_limiter(limiter: Optional[RateLimiter]):
+    """Replace (or with None, disable) the rate limiter every request waits on"""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    return _rate_limiter
+
+
+def figma_get(url: str, token: str, params: Dict[str, Any] = None, timeout: float = DEFAULT_TIMEOUT,
+              max_retries: int = MAX_RETRIES, stream: bool = False, cacheable: bool = False):
+    """GET a Figma API URL through the shared session, retrying transient failures.
+
+    Every request (including retries) first waits on the shared rate limiter.
+    Timeouts, connection errors and 5xx responses are retried with jittered
+    exponential backoff; 429 responses wait for Retry-After when present and
+    slow the rate limiter down for all callers.
+    Returns the final response (callers still check status_code) and raises
+    FigmaAPIError when the request never got a response. With stream=True the
+    body is not downloaded up front and the caller must close the response.
+
+    With cacheable=True and a response cache configured, fresh cached responses
+    are returned without a request and stale ones are revalidated when possible.
+    """
+    cache = _response_cache if cacheable and not stream else None
+    if cache is None:
+        return _get_with_retries(url, token, params, timeout, max_retries, stream)
+
+    key = cache.key(url, params, token)
+    entry = cache.get(key)
+    if entry and cache.is_fresh(entry):
+        cache.record('hits')
+        metrics.record_cache_hit()
+        return CachedResponse(entry)
+
+    conditional_headers = {}
+    if entry and entry.get("etag"):
+        conditional_headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        conditional_headers["If-Modified-Since"] = entry["last_modified"]
+
+    response = _get_with_retries(url, token, params, timeout, max_retries, stream, conditional_headers)
+    if response.status_code == 304 and entry:
+        cache.touch(key, entry)
+        cache.record('revalidated')
+        metrics.record_cache_hit()
+        return CachedResponse(entry)
+
+    cache.record('misses')
+    if response.status_code == 200:
+        cache.put(key, url, response)
+    return response
+
+
+def _get_with_retries(url: str, token: str, params: Optional[Dict[str, Any]], timeout: float, max_retries: int,
+                      stream: bool, extra_headers: Dict[str, str] = None) -> requests.Response:
+    """Perform the GET with the retry/backoff policy described in figma_get"""
+    session = get_session()
+    headers = {"X-Figma-Token": token}
+    if extra_headers:
+        headers.update(extra_headers)
+    attempt = 0
+
+    while True:
+        limiter = _rate_limiter
+        if limiter is not None:
+            metrics.record_wait(limiter.acquire())
+        try:
+            response = session.get(url, headers=headers, params=params, timeout=timeout, stream=stream)
+        except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+            if attempt >= max_retries:
+                raise FigmaAPIError(f"Request to {url} failed after {attempt + 1} attempts: {str(e)}")
+            metrics.record_retry('timeout' if isinstance(e, requests.exceptions.Timeout) else 'connection')
+            delay = backoff_delay(attempt)
+            attempt += 1
+            print(f"   ↻ {type(e).__name__} on {url}, retrying in {delay:.1f}s (attempt {attempt}/{max_retries})")
+            time.sleep(delay)
+            continue
+
+        if response.status_code == 429:
+            delay = retry_after_seconds(response)
+            if delay is None:
+                delay = backoff_delay(attempt)
+            if limiter is not None:
+                limiter.on_rate_limited(delay)
+        elif response.status_code in RETRY_STATUS_CODES:
+            delay = backoff_delay(attempt)
+        else:
+            if limiter is not None:
+                limiter.on_success()
+            metrics.record_request(response.status_code, _body_size(response, stream))
+            return response
+
+        metrics.record_request(response.status_code, _body_size(response, True))
+        if attempt >= max_retries:
+            return response
+        metrics.record_retry(str(response.status_code))
+        response.close()
+        attempt += 1
+        print(f"   ↻ HTTP {response.status_code} on {url}, retrying in {delay:.1f}s (attempt {attempt}/{max_retries})")
+        time.sleep(delay)
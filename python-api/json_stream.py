@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Streaming JSON extraction
+Pulls selected top-level values out of a large JSON object without building
+the rest of the document in memory
+"""
+
+import codecs
+import json
+import re
+from typing import Dict, Any, Iterable, List
+
+# Characters that change parser state; everything between them is skipped in bulk
+_SPECIAL_CHARS = re.compile(r'["\\{}\[\]]')
+
+
+class TopLevelValueExtractor:
+    """Incrementally scan a JSON object and keep only the values of `wanted` top-level keys.
+
+    Feed text chunks with feed(), then call close(); memory is bounded by the size
+    of the wanted values plus the current chunk, regardless of how large the other
+    values are. Only object and array values are captured, which covers Figma's
+    `components` and `componentSets` maps. Only the structure is tracked, so the
+    document is assumed to be valid JSON apart from where it ends.
+    """
+
+    def __init__(self, wanted: Iterable[str]):
+        self.wanted = set(wanted)
+        self.results: Dict[str, Any] = {}
+        self._depth = 0
+        self._in_string = False
+        self._skip_offset = -1
+        self._offset = 0
+        self._string_parts: List[str] = []
+        self._string_start = None
+        self._last_key = None
+        self._capture_key = None
+        self._capture_parts: List[str] = []
+        self._capture_start = None
+        self._opened = False
+
+    def feed(self, text: str):
+        """Process the next chunk of decoded JSON text"""
+        base = self._offset
+        for match in _SPECIAL_CHARS.finditer(text):
+            index = match.start()
+            char = match.group()
+            if base + index == self._skip_offset:
+                continue
+
+            if self._in_string:
+                if char == '\\':
+                    self._skip_offset = base + index + 1
+                elif char == '"':
+                    self._in_string = False
+                    if self._string_start is not None:
+                        self._string_parts.append(text[self._string_start:index])
+                        # Keys may contain escapes, e.g. "\u0063omponents"
+                        self._last_key = json.loads(f'"{"".join(self._string_parts)}"')
+                        self._string_parts = []
+                        self._string_start = None
+                continue
+
+            if char == '"':
+                self._in_string = True
+                # Only top-level strings can be keys we care about
+                if self._depth == 1:
+                    self._string_start = index + 1
+                    self._string_parts = []
+            elif char in '{[':
+                self._depth += 1
+                self._opened = True
+                if self._depth == 2 and self._last_key in self.wanted:
+                    self._capture_key = self._last_key
+                    self._capture_parts = []
+                    self._capture_start = index
+            else:
+                self._depth -= 1
+                if self._depth == 1 and self._capture_key is not None:
+                    self._capture_parts.append(text[self._capture_start:index + 1])
+                    self.results[self._capture_key] = json.loads(''.join(self._capture_parts))
+                    self._capture_key = None
+                    self._capture_parts = []
+                    self._capture_start = None
+
+        # Carry partial key strings and captured values over to the next chunk
+        if self._string_start is not None:
+            self._string_parts.append(text[self._string_start:])
+            self._string_start = 0
+        if self._capture_key is not None:
+            self._capture_parts.append(text[self._capture_start:])
+            self._capture_start = 0
+        self._offset += len(text)
+
+    def close(self):
+        """Raise ValueError if the document ended before its top-level value did"""
+        if not self._opened or self._depth or self._in_string:
+            raise ValueError(f"JSON document is truncated after {self._offset} characters")
+
+
+def extract_top_level_values(chunks: Iterable[bytes], wanted: Iterable[str]) -> Dict[str, Any]:
+    """Extract `wanted` top-level object/array values from a stream of UTF-8 JSON bytes.
+
+    Raises ValueError if the stream ends early, rather than returning partial results.
+    """
+    extractor = TopLevelValueExtractor(wanted)
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for chunk in chunks:
+        if chunk:
+            extractor.feed(decoder.decode(chunk))
+    extractor.feed(decoder.decode(b'', final=True))
+    extractor.close()
+    return extractor.results
@@ -5,37 +5,226 @@ Generates CSV files from Figma library data using the Library Analytics API
 """
 
 import argparse
+import contextlib
 import os
 import sys
 import csv
-import requests
-from datetime import datetime
-from typing import Dict, List, Any, Optional
-from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Iterator, Callable
 import json
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-# Figma API base URL
-FIGMA_API_BASE = "https://api.figma.com/v1"
+import metrics
+import progress
 
+from figma_client import (FIGMA_API_BASE, FigmaAPIError, figma_get, configure_response_cache, get_response_cache,
+                          configure_rate_limiter, get_rate_limiter)
+from response_cache import ResponseCache, DEFAULT_CACHE_DIR, DEFAULT_TTL, DEFAULT_MAX_BYTES
+from rate_limiter import RateLimiter, DEFAULT_RPM
+from json_stream import extract_top_level_values
+from pagination_checkpoint import CheckpointStore, DEFAULT_CHECKPOINT_DIR, configure_checkpoints, get_checkpoints
+from analytics_engine import ENDPOINT_SPECS, ComponentNameResolver, run_endpoint_spec
+from analytics_store import AnalyticsStore
+from date_shards import DEFAULT_SHARD_WORKERS, DateWindow, ShardPlan, configure_sharding, get_sharding, parse_shard_spec
+from component_index import (ComponentIndex, ComponentIndexStore, DEFAULT_INDEX_DIR, configure_component_index,
+                             get_component_index, fetch_file_version)
+from version_history import (VERSION_HISTORY_FILE, fetch_version_history, save_version_history,
+                             update_version_history, activity_index_path)
+from run_manifest import DEFAULT_FRESH_FOR, fresh_run_result, manifest_options, remove_run_manifest, write_run_manifest
+from output_files import artifact_rows, atomic_write, load_artifact_manifest
+from summary_tables import ACTIONS_COLUMNS, WeeklyTotals, write_component_usage_summary, write_weekly_totals
+from partitioned_output import PARTITION_GRANULARITIES, remove_partitioned_outputs, write_partitioned_outputs
+from rollup_cube import parse_rollup_levels, remove_rollup_cubes, write_rollup_cubes
+from columnar_output import COLUMNAR_FORMATS, CSV_SCHEMAS, require_pyarrow, write_columnar_outputs
 
-def fetch_figma_data(token: str, file_key: str) -> Dict[str, Any]:
-    """Fetch file data from Figma API to get component metadata"""
+# Default number of endpoints fetched in parallel by generate_csv_files
+DEFAULT_WORKERS = 4
+
+# Where component names come from: the published components/component_sets
+# endpoints (small), or the full file document parsed as a stream
+METADATA_SOURCES = ('published', 'file')
+DEFAULT_METADATA_SOURCE = 'published'
+
+# Read size for streamed file documents
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# Start of the analytics history fetched by a full (non-incremental) run
+DEFAULT_START_DATE = "2025-01-01"
+
+# Per-library watermarks for incremental sync, stored in the output directory
+SYNC_STATE_FILE = '.sync_state.json'
+
+# Weekly CSVs that support incremental sync: endpoint id and the identity columns
+# that, together with the week, uniquely identify a row
+INCREMENTAL_OUTPUTS = {
+    'actions_by_component.csv': ('component/actions:component', ['component_name', 'component_set_name']),
+    'actions_by_team.csv': ('component/actions:team', ['team_name']),
+    'variable_actions_by_variable.csv': ('variable/actions:variable', ['variable_key']),
+    'styles_actions_by_style.csv': ('style/actions:style', ['style_key']),
+}
+
+
+def fetch_file_component_maps(token: str, file_key: str) -> Dict[str, Any]:
+    """Stream the full file document and keep only its `components` and `componentSets` maps"""
     url = f"{FIGMA_API_BASE}/files/{file_key}"
-    headers = {"X-Figma-Token": token}
     
-    print(f"Fetching file data from Figma API for file: {file_key}")
-    response = requests.get(url, headers=headers)
+    print(f"Streaming file document from Figma API for file: {file_key}")
+    response = figma_get(url, token, stream=True)
+    try:
+        if response.status_code != 200:
+            raise Exception(f"Figma API error: {response.status_code} - {response.text}")
+        
+        maps = extract_top_level_values(response.iter_content(chunk_size=STREAM_CHUNK_SIZE), ("components", "componentSets"))
+    finally:
+        response.close()
+    
+    return {
+        "components": maps.get("components", {}),
+        "componentSets": maps.get("componentSets", {})
+    }
+
+
+def fetch_published_component_maps(token: str, file_key: str) -> Optional[Dict[str, Any]]:
+    """Build `components`/`componentSets` maps from the published components endpoints.
+
+    Components are keyed by their published key, which is what the analytics
+    endpoints report as component_key. Returns None if the endpoints are unavailable.
+    """
+    print(f"Fetching published components from Figma API for file: {file_key}")
+    components_response = figma_get(f"{FIGMA_API_BASE}/files/{file_key}/components", token)
+    if components_response.status_code != 200:
+        print(f"⚠️  Published components endpoint returned {components_response.status_code}")
+        return None
+    
+    sets_response = figma_get(f"{FIGMA_API_BASE}/files/{file_key}/component_sets", token)
+    if sets_response.status_code != 200:
+        print(f"⚠️  Published component sets endpoint returned {sets_response.status_code}")
+        return None
     
-    if response.status_code != 200:
-        raise Exception(f"Figma API error: {response.status_code} - {response.text}")
+    component_sets = {}
+    for component_set in sets_response.json().get("meta", {}).get("component_sets", []):
+        component_sets[component_set.get("node_id", "")] = {"name": component_set.get("name", "")}
+    
+    components = {}
+    for component in components_response.json().get("meta", {}).get("components", []):
+        containing_set = (component.get("containing_frame") or {}).get("containingComponentSet") or {}
+        set_id = containing_set.get("nodeId", "")
+        if set_id and set_id not in component_sets:
+            component_sets[set_id] = {"name": containing_set.get("name", "")}
+        components[component.get("key", "")] = {
+            "name": component.get("name", ""),
+            "componentSetId": set_id
+        }
+    
+    if not components:
+        print(f"⚠️  No published components found")
+        return None
     
-    return response.json()
+    return {"components": components, "componentSets": component_sets}
+
+
+def load_component_maps(token: str, file_key: str, source: str = DEFAULT_METADATA_SOURCE) -> Dict[str, Any]:
+    """Load the component maps get_component_metadata needs, without the full document tree"""
+    if source == 'published':
+        maps = fetch_published_component_maps(token, file_key)
+        if maps is not None:
+            return maps
+        print(f"   Falling back to streaming the file document")
+    return fetch_file_component_maps(token, file_key)
+
+
+def load_component_index(token: str, file_key: str, source: str = DEFAULT_METADATA_SOURCE) -> ComponentIndex:
+    """Resolved component metadata, reused from the saved index while the file version is unchanged"""
+    progress.emit('stage', stage='metadata', source=source)
+    with metrics.stage('metadata'):
+        store = get_component_index()
+        version = fetch_file_version(token, file_key) if store else None
+        if version:
+            index = store.load(file_key, source, version)
+            if index is not None:
+                print(f"🧠 Component index unchanged since version {version['version']} ({len(index)} components)")
+                metrics.record_cache_hit()
+                return index
+        
+        component_metadata, name_to_key = get_component_metadata(load_component_maps(token, file_key, source))
+        index = ComponentIndex(component_metadata, name_to_key, version)
+        if store and version:
+            try:
+                store.save(file_key, source, index)
+            except OSError as e:
+                print(f"⚠️  Failed to save component index: {str(e)}")
+        return index
+
 
+def fetch_analytics_page(url: str, token: str, params: Dict[str, Any], endpoint: str, page_num: int):
+    """Fetch one analytics page. Returns (records, next_cursor), or None if analytics aren't available (403/404).
 
-def fetch_analytics_data(token: str, file_key: str, endpoint: str, group_by: str = "component", start_date: str = None, end_date: str = None) -> Optional[Dict[str, Any]]:
-    """Fetch analytics data from Figma Library Analytics API with pagination support"""
+    Any other failure (429/5xx after retries, an unreadable body) raises FigmaAPIError,
+    so it is never mistaken for an endpoint without data.
+    """
+    response = figma_get(url, token, params=params, cacheable=True)
+    
+    if response.status_code == 200:
+        try:
+            page_data = response.json()
+        except json.JSONDecodeError as e:
+            print(f"   Response text (first 500 chars): {response.text[:500]}")
+            raise FigmaAPIError(f"{endpoint} returned an unreadable page {page_num}: {str(e)}", response.status_code)
+        
+        # Extract data from this page
+        page_records = []
+        if isinstance(page_data, dict):
+            if 'data' in page_data:
+                page_records = page_data.get('data', [])
+            elif 'results' in page_data:
+                page_records = page_data.get('results', [])
+            else:
+                # Try to find any list field
+                for key, value in page_data.items():
+                    if isinstance(value, list) and key != 'cursor':
+                        page_records = value
+                        break
+        elif isinstance(page_data, list):
+            page_records = page_data
+        
+        # Check for pagination
+        next_cursor = None
+        if isinstance(page_data, dict) and page_data.get('next_page', False):
+            next_cursor = page_data.get('cursor')
+        
+        return page_records, next_cursor
+    elif response.status_code == 403:
+        print(f"⚠️  Warning: Library Analytics API not available (403 Forbidden).")
+        print(f"   This requires Figma Enterprise plan and library_analytics:read scope.")
+        print(f"   Response: {response.text[:200]}")
+        return None
+    elif response.status_code == 404:
+        print(f"⚠️  Warning: Analytics endpoint not found (404).")
+        print(f"   The library may not have analytics enabled or the endpoint doesn't exist.")
+        print(f"   Response: {response.text[:200]}")
+        return None
+    else:
+        print(f"   Response: {response.text[:500]}")
+        raise FigmaAPIError(f"Analytics API error {response.status_code} on page {page_num} of {endpoint}",
+                            response.status_code)
+
+
+def iter_analytics_pages(token: str, file_key: str, endpoint: str, group_by: str = "component", start_date: str = None, end_date: str = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield analytics records page by page while the next page is prefetched in the background.
+
+    Memory stays bounded by about two pages. A 403/404 on the first page means the
+    library has no analytics and ends the stream without pages; any other failure,
+    on any page, raises FigmaAPIError so callers never write an empty or silently
+    truncated result over the previous one.
+
+    With checkpoints configured, every page and the next cursor are persisted as
+    they arrive. A later call for the same fetch replays the saved pages and
+    continues from the saved cursor; the checkpoint is removed once the last page is in.
+    """
     url = f"{FIGMA_API_BASE}/analytics/libraries/{file_key}/{endpoint}"
-    headers = {"X-Figma-Token": token}
     base_params = {"group_by": group_by}
     
     # Add date filters if provided
@@ -44,100 +233,162 @@ def fetch_analytics_data(token: str, file_key: str, endpoint: str, group_by: str
     if end_date:
         base_params["end_date"] = end_date
     
-    try:
-        date_range = ""
-        if start_date or end_date:
-            date_range = f" (from {start_date or 'beginning'} to {end_date or 'today'})"
-        print(f"Fetching {endpoint} data (grouped by {group_by}){date_range}...")
-        if start_date or end_date:
-            print(f"   API params: {base_params}")
-        
-        # Handle pagination - collect all pages of data
-        all_data = []
-        cursor = None
-        page_num = 1
-        
-        while True:
-            params = base_params.copy()
-            if cursor:
-                params["cursor"] = cursor
-            
-            response = requests.get(url, headers=headers, params=params, timeout=30)
+    date_range = ""
+    if start_date or end_date:
+        date_range = f" (from {start_date or 'beginning'} to {end_date or 'today'})"
+    print(f"Fetching {endpoint} data (grouped by {group_by}){date_range}...")
+    if start_date or end_date:
+        print(f"   API params: {base_params}")
+    
+    def fetch_page(cursor: Optional[str], page_num: int):
+        params = base_params.copy()
+        if cursor:
+            params["cursor"] = cursor
+        return fetch_analytics_page(url, token, params, endpoint, page_num)
+    
+    total_records = 0
+    page_num = 1
+    cursor = None
+    checkpoints = get_checkpoints()
+    checkpoint = checkpoints.open(url, base_params, token) if checkpoints else None
+    resumed = checkpoint.load() if checkpoint else None
+    if resumed:
+        print(f"   ⏯️  Resuming from checkpoint: {resumed['pages']} page(s), {resumed['records']} records already fetched")
+        for page_records in checkpoint.stored_pages():
+            total_records += len(page_records)
+            yield page_records
+        page_num = resumed['pages'] + 1
+        cursor = resumed['cursor']
+    
+    with ThreadPoolExecutor(max_workers=1) as prefetcher:
+        # A checkpoint without a cursor already holds the last page
+        future = progress.submit(prefetcher, fetch_page, cursor, page_num) if cursor or not resumed else None
+        if future is None:
+            page_num -= 1
+        while future is not None:
+            try:
+                result = future.result()
+            except FigmaAPIError:
+                # Error status or retries exhausted: fail the endpoint instead of writing empty or partial data
+                if checkpoint:
+                    checkpoint.record_failure()
+                raise
+            except Exception as e:
+                if checkpoint:
+                    checkpoint.record_failure()
+                raise FigmaAPIError(f"{endpoint} (grouped by {group_by}) failed on page {page_num}: {str(e)}")
             
-            if response.status_code == 200:
-                try:
-                    page_data = response.json()
-                    
-                    # Extract data from this page
-                    page_records = []
-                    if isinstance(page_data, dict):
-                        if 'data' in page_data:
-                            page_records = page_data.get('data', [])
-                        elif 'results' in page_data:
-                            page_records = page_data.get('results', [])
-                        else:
-                            # Try to find any list field
-                            for key, value in page_data.items():
-                                if isinstance(value, list) and key != 'cursor':
-                                    page_records = value
-                                    break
-                    elif isinstance(page_data, list):
-                        page_records = page_data
-                    
-                    all_data.extend(page_records)
-                    print(f"   Page {page_num}: Found {len(page_records)} records (total so far: {len(all_data)})")
-                    
-                    # Check for pagination
-                    has_next_page = False
-                    if isinstance(page_data, dict):
-                        has_next_page = page_data.get('next_page', False)
-                        cursor = page_data.get('cursor')
-                    
-                    if not has_next_page or not cursor:
-                        break
-                    
-                    page_num += 1
-                    
-                except json.JSONDecodeError as e:
-                    print(f"⚠️  Warning: Failed to parse JSON response: {str(e)}")
-                    print(f"   Response text (first 500 chars): {response.text[:500]}")
-                    return None
-            elif response.status_code == 403:
-                print(f"⚠️  Warning: Library Analytics API not available (403 Forbidden).")
-                print(f"   This requires Figma Enterprise plan and library_analytics:read scope.")
-                print(f"   Response: {response.text[:200]}")
-                return None
-            elif response.status_code == 404:
-                print(f"⚠️  Warning: Analytics endpoint not found (404).")
-                print(f"   The library may not have analytics enabled or the endpoint doesn't exist.")
-                print(f"   Response: {response.text[:200]}")
-                return None
-            else:
-                print(f"⚠️  Warning: Analytics API error {response.status_code}")
-                print(f"   Response: {response.text[:500]}")
-                # Break out of pagination loop on error
+            if result is None:
+                if page_num > 1 or resumed:
+                    # Never hand back a silently truncated result set; the checkpoint lets the next run resume here
+                    if checkpoint:
+                        checkpoint.record_failure()
+                    raise FigmaAPIError(f"{endpoint} (grouped by {group_by}) failed on page {page_num} after {total_records} records")
                 break
-        
-        if len(all_data) > 0:
-            print(f"✅ Successfully fetched {endpoint} data: {len(all_data)} total records across {page_num} page(s)")
-            if len(all_data) > 0:
+            
+            page_records, next_cursor = result
+            total_records += len(page_records)
+            if checkpoint:
+                checkpoint.save_page(page_num, page_records, next_cursor, total_records)
+            print(f"   Page {page_num}: Found {len(page_records)} records (total so far: {total_records})")
+            progress.emit('page', endpoint=endpoint, group_by=group_by, page=page_num, records=total_records)
+            metrics.record_page(len(page_records))
+            if page_num == 1 and page_records and isinstance(page_records[0], dict):
                 # Show first record structure for debugging
-                first_record = all_data[0]
-                print(f"   Sample record keys: {list(first_record.keys())[:5]}")
-            # Return in the expected format
-            return {"data": all_data}
-        else:
-            print(f"⚠️  No data returned from {endpoint}")
-            return None
-                
-    except requests.exceptions.Timeout:
-        print(f"⚠️  Warning: Request timeout when fetching {endpoint}")
-        return None
-    except Exception as e:
-        print(f"⚠️  Warning: Failed to fetch analytics data: {str(e)}")
-        import traceback
-        print(f"   Traceback: {traceback.format_exc()}")
+                print(f"   Sample record keys: {list(page_records[0].keys())[:5]}")
+            
+            # Start fetching the next page before handing this one to the consumer
+            future = None
+            if next_cursor:
+                future = progress.submit(prefetcher, fetch_page, next_cursor, page_num + 1)
+            
+            yield page_records
+            
+            if future is not None:
+                page_num += 1
+    
+    if checkpoint:
+        checkpoint.clear()
+    
+    if total_records > 0:
+        print(f"✅ Successfully fetched {endpoint} data: {total_records} total records across {page_num} page(s)")
+    else:
+        print(f"⚠️  No data returned from {endpoint}")
+
+
+def fetch_window_pages(token: str, file_key: str, endpoint: str, group_by: str, window: DateWindow) -> List[List[Dict[str, Any]]]:
+    """All pages of one date window, without records for weeks that belong to another window"""
+    return [[item for item in page_records if not isinstance(item, dict) or window.contains(item.get('week'))]
+            for page_records in iter_analytics_pages(token, file_key, endpoint, group_by, window.start_date, window.end_date)]
+
+
+def weeks_ascending(pages: List[List[Dict[str, Any]]]) -> Optional[bool]:
+    """Whether a window's records run oldest week first, or None if they cover fewer than two weeks"""
+    weeks = [item['week'] for page_records in pages for item in page_records
+             if isinstance(item, dict) and isinstance(item.get('week'), str)]
+    if len(weeks) < 2 or weeks[0] == weeks[-1]:
         return None
+    return weeks[0] < weeks[-1]
+
+
+def merge_order(windows: List[DateWindow], ascending: Optional[bool]) -> List[DateWindow]:
+    """Order to yield date windows in, given the record order a window showed (None: never shown).
+
+    Weeks keep the order the API returns them in; until a window spans two weeks
+    that order is unknown and the API's usual newest-first is assumed.
+    """
+    return list(windows) if ascending else list(reversed(windows))
+
+
+def iter_sharded_analytics_pages(token: str, file_key: str, endpoint: str, group_by: str,
+                                 windows: List[DateWindow], workers: int) -> Iterator[List[Dict[str, Any]]]:
+    """Fetch date windows concurrently and yield their pages in week order.
+
+    Windows are fetched newest first, at most `workers` ahead of the one being read.
+    The newest windows are read until one spanning two weeks shows the record order
+    (merge_order), then every window is yielded in that order; windows read before
+    that are held until their turn. A window that returns no pages while others do
+    fails the endpoint rather than leaving a gap in the output.
+    """
+    print(f"🧩 Fetching {endpoint} (grouped by {group_by}) as {len(windows)} date windows "
+          f"({min(workers, len(windows))} concurrent): {windows[0].first_week} to {windows[-1].last_week}")
+    futures = {}
+    pool = ThreadPoolExecutor(max_workers=workers)
+    
+    def fetch_ahead(upcoming: List[DateWindow]):
+        for window in upcoming[:workers]:
+            if window not in futures:
+                futures[window] = progress.submit(pool, fetch_window_pages, token, file_key, endpoint, group_by, window)
+    
+    try:
+        newest_first = merge_order(windows, None)
+        ascending = None
+        read = 0
+        while ascending is None and read < len(newest_first):
+            fetch_ahead(newest_first[read:])
+            ascending = weeks_ascending(futures[newest_first[read]].result())
+            read += 1
+        if ascending:
+            print(f"   {endpoint} returns oldest weeks first, merging date windows oldest first")
+        order = merge_order(windows, ascending)
+        
+        failed_windows = []
+        yielded = False
+        for position, window in enumerate(order):
+            fetch_ahead(order[position:])
+            pages = futures.pop(window).result()
+            if not pages:
+                failed_windows.append(window)
+            else:
+                for page_records in pages:
+                    yield page_records
+                yielded = True
+            if failed_windows and yielded:
+                # Other windows have data, so this one failed rather than being empty
+                raise FigmaAPIError(f"{endpoint} (grouped by {group_by}) returned no data for date window(s) "
+                                    f"{', '.join(map(repr, failed_windows))}")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
 
 
 def get_component_metadata(file_data: Dict[str, Any]):
@@ -201,556 +452,292 @@ def get_component_name(component_key: str, component_metadata: Dict[str, Dict[st
     return component_key, ''
 
 
-def generate_actions_by_component_csv(output_dir: str, token: str, file_key: str, component_metadata: Dict[str, Dict[str, str]], name_to_key: Dict[str, str], start_date: str = None, end_date: str = None):
-    """Generate actions_by_component.csv from component actions grouped by component"""
-    filepath = os.path.join(output_dir, 'actions_by_component.csv')
-    
-    analytics_data = fetch_analytics_data(token, file_key, "component/actions", "component", start_date, end_date)
-    
-    row_count = 0
-    filtered_count = 0
-    unmatched_keys = set()
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['component_name', 'component_set_name', 'week', 'insertions', 'detachments'])
-        
-        if analytics_data:
-            # Handle different possible response structures
-            data_list = []
-            if isinstance(analytics_data, dict):
-                if 'data' in analytics_data:
-                    data_list = analytics_data['data']
-                elif 'results' in analytics_data:
-                    data_list = analytics_data['results']
-                else:
-                    # Try to find any list in the response
-                    for key, value in analytics_data.items():
-                        if isinstance(value, list):
-                            data_list = value
-                            print(f"   Using '{key}' as data source")
-                            break
-            
-            if isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                    
-                component_key = item.get('component_key', '')
-                week = item.get('week', '')
-                insertions = item.get('insertions', 0)
-                detachments = item.get('detachments', 0)
-                
-                # Filter by date range if provided
-                if start_date and end_date and week:
-                    try:
-                        week_date = datetime.strptime(week, "%Y-%m-%d")
-                        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                        # Skip if outside date range (inclusive boundaries)
-                        if week_date < start_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (before {start_date})")
-                            continue
-                        if week_date > end_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (after {end_date})")
-                            continue
-                    except (ValueError, TypeError) as e:
-                        # If date parsing fails, include the row (don't filter)
-                        # This handles cases where week might be in a different format
-                        print(f"   ⚠️  Could not parse date '{week}': {e}")
-                        pass
-                
-                # Get component name and set name
-                component_name, component_set_name = get_component_name(
-                    component_key, component_metadata, name_to_key, item
-                )
-                
-                # Track unmatched keys for debugging
-                if component_name == component_key and component_key not in component_metadata:
-                    unmatched_keys.add(component_key)
-                
-                writer.writerow([component_name, component_set_name, week, insertions, detachments])
-                row_count += 1
-    
-    if unmatched_keys and len(unmatched_keys) <= 10:
-        print(f"   ⚠️  {len(unmatched_keys)} component keys not found in metadata (showing first few): {list(unmatched_keys)[:5]}")
-    elif unmatched_keys:
-        print(f"   ⚠️  {len(unmatched_keys)} component keys not found in metadata")
-    
-    if filtered_count > 0:
-        print(f"   📅 Filtered out {filtered_count} rows outside date range ({start_date} to {end_date})")
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: actions_by_component.csv (empty - no data available)")
+def generate_endpoint_csv(filename: str, output_dir: str, token: str, file_key: str, start_date: str = None,
+                          end_date: str = None, resolver: ComponentNameResolver = None,
+                          store: AnalyticsStore = None, on_rows: Callable = None) -> Dict[str, Any]:
+    """Stream an endpoint's pages through the row engine according to its ENDPOINT_SPECS entry.
+
+    `on_rows` is passed every batch of rows written to the CSV.
+    """
+    spec = ENDPOINT_SPECS[filename]
+    sharding = get_sharding()
+    windows = sharding.windows(start_date, end_date) if sharding and spec.get('week_filter') and start_date and end_date else []
+    if len(windows) > 1:
+        pages = iter_sharded_analytics_pages(token, file_key, spec['endpoint'], spec['group_by'], windows, sharding.workers)
     else:
-        print(f"✅ Generated: actions_by_component.csv ({row_count} rows)")
+        pages = iter_analytics_pages(token, file_key, spec['endpoint'], spec['group_by'], start_date, end_date)
+    return run_endpoint_spec(filename, pages, output_dir, start_date, end_date, resolver, store, on_rows)
 
 
-def generate_actions_by_team_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None):
+def generate_actions_by_component_csv(output_dir: str, token: str, file_key: str, component_metadata: Dict[str, Dict[str, str]], name_to_key: Dict[str, str], start_date: str = None, end_date: str = None, store: AnalyticsStore = None, on_rows: Callable = None):
+    """Generate actions_by_component.csv from component actions grouped by component"""
+    return generate_endpoint_csv('actions_by_component.csv', output_dir, token, file_key, start_date, end_date,
+                                 ComponentNameResolver(get_component_name, component_metadata, name_to_key),
+                                 store=store, on_rows=on_rows)
+
+
+def generate_actions_by_team_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None, store: AnalyticsStore = None, on_rows: Callable = None):
     """Generate actions_by_team.csv from component actions grouped by team"""
-    filepath = os.path.join(output_dir, 'actions_by_team.csv')
-    
-    analytics_data = fetch_analytics_data(token, file_key, "component/actions", "team", start_date, end_date)
-    
-    row_count = 0
-    filtered_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['team_name', 'week', 'insertions', 'detachments'])
-        
-        if analytics_data:
-            data_list = []
-            if isinstance(analytics_data, dict):
-                data_list = analytics_data.get('data', analytics_data.get('results', []))
-            elif isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                team_name = item.get('team_name', 'Unknown Team')
-                week = item.get('week', '')
-                insertions = item.get('insertions', 0)
-                detachments = item.get('detachments', 0)
-                
-                # Filter by date range if provided
-                if start_date and end_date and week:
-                    try:
-                        week_date = datetime.strptime(week, "%Y-%m-%d")
-                        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                        # Skip if outside date range (inclusive boundaries)
-                        if week_date < start_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (before {start_date})")
-                            continue
-                        if week_date > end_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (after {end_date})")
-                            continue
-                    except (ValueError, TypeError) as e:
-                        # If date parsing fails, include the row (don't filter)
-                        # This handles cases where week might be in a different format
-                        print(f"   ⚠️  Could not parse date '{week}': {e}")
-                        pass
-                
-                writer.writerow([team_name, week, insertions, detachments])
-                row_count += 1
-    
-    if filtered_count > 0:
-        print(f"   📅 Filtered out {filtered_count} rows outside date range ({start_date} to {end_date})")
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: actions_by_team.csv (empty - no data available)")
-    else:
-        print(f"✅ Generated: actions_by_team.csv ({row_count} rows)")
+    return generate_endpoint_csv('actions_by_team.csv', output_dir, token, file_key, start_date, end_date, store=store, on_rows=on_rows)
 
 
-def generate_usages_by_component_csv(output_dir: str, token: str, file_key: str, component_metadata: Dict[str, Dict[str, str]], name_to_key: Dict[str, str], start_date: str = None, end_date: str = None):
+def generate_usages_by_component_csv(output_dir: str, token: str, file_key: str, component_metadata: Dict[str, Dict[str, str]], name_to_key: Dict[str, str], start_date: str = None, end_date: str = None, store: AnalyticsStore = None):
     """Generate usages_by_component.csv from component usages grouped by component"""
-    filepath = os.path.join(output_dir, 'usages_by_component.csv')
-    
-    # Fetch data grouped by component to get per-component, per-file breakdown
+    # Per-file rows are written as-is; the per-component aggregate (instances, unique
+    # files and teams) is collected in the same pass and written as a summary table
     # Note: usages endpoint may not support date filtering, but we'll pass it anyway
-    analytics_data = fetch_analytics_data(token, file_key, "component/usages", "component", start_date, end_date)
-    
-    # Aggregate data: track instances, unique files, and unique teams per component
-    component_stats = defaultdict(lambda: {
-        'instances': 0,
-        'files': set(),
-        'teams': set(),
-        'component_set': ''
-    })
-    
-    if analytics_data and 'data' in analytics_data:
-        for item in analytics_data['data']:
-            component_key = item.get('component_key', '')
-            file_name = item.get('file_name', 'Unknown File')
-            team_name = item.get('team_name', 'Unknown Team')
-            instances = item.get('instances', 0)
-            
-            # Get component metadata
-            metadata = component_metadata.get(component_key, {})
-            component_name = metadata.get('name', component_key)
-            component_set_name = metadata.get('component_set', '')
-            
-            stats = component_stats[component_name]
-            stats['instances'] += instances
-            stats['files'].add(file_name)
-            stats['teams'].add(team_name)
-            if component_set_name:
-                stats['component_set'] = component_set_name
-    
-    # Write per-file rows (as defined by CSV header: component_name, component_set_name, file_name, instances)
-    # The frontend UsagesTable aggregates these, but expects num_instances, num_teams_using, num_files_using
-    # We'll write the raw data and the component will aggregate it
-    row_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['component_name', 'component_set_name', 'file_name', 'instances'])
-        
-        if analytics_data:
-            data_list = []
-            if isinstance(analytics_data, dict):
-                data_list = analytics_data.get('data', analytics_data.get('results', []))
-            elif isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                component_key = item.get('component_key', '')
-                file_name = item.get('file_name', 'Unknown File')
-                instances = item.get('instances', 0)
-                
-                # Get component name and set name
-                component_name, component_set_name = get_component_name(
-                    component_key, component_metadata, name_to_key, item
-                )
-                
-                writer.writerow([component_name, component_set_name, file_name, instances])
-                row_count += 1
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: usages_by_component.csv (empty - no data available)")
-    else:
-        print(f"✅ Generated: usages_by_component.csv ({row_count} rows)")
+    result = generate_endpoint_csv('usages_by_component.csv', output_dir, token, file_key, start_date, end_date,
+                                   ComponentNameResolver(get_component_name, component_metadata, name_to_key),
+                                   store=store)
+    
+    # Per-component totals, so the dashboard doesn't have to re-aggregate per-file rows
+    write_component_usage_summary(output_dir, result['aggregate'])
+    return result
 
 
-def generate_usages_by_file_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None):
+def generate_usages_by_file_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None, store: AnalyticsStore = None):
     """Generate usages_by_file.csv from component usages grouped by file"""
-    filepath = os.path.join(output_dir, 'usages_by_file.csv')
-    
-    # Fetch data grouped by file to get per-file breakdown
+    # Frontend expects: file_name, component_count, total_instances
     # Note: usages endpoint may not support date filtering, but we'll pass it anyway
-    analytics_data = fetch_analytics_data(token, file_key, "component/usages", "file", start_date, end_date)
-    
-    # Aggregate data by file (and team/workspace if available)
-    file_data = defaultdict(lambda: {
-        'component_count': 0,
-        'total_instances': 0,
-        'team_name': '',
-        'workspace_name': ''
-    })
-    component_keys_seen = defaultdict(set)
-    
-    if analytics_data:
-        data_list = []
-        if isinstance(analytics_data, dict):
-            data_list = analytics_data.get('data', analytics_data.get('results', []))
-        elif isinstance(analytics_data, list):
-            data_list = analytics_data
-        
-        for item in data_list:
-            if not isinstance(item, dict):
-                continue
-            file_name = item.get('file_name', 'Unknown File')
-            component_key = item.get('component_key', '')
-            instances = item.get('instances', 0)
-            team_name = item.get('team_name', '')
-            workspace_name = item.get('workspace_name', '')
-            
-            file_key = file_name  # Use file_name as key
-            file_data[file_key]['total_instances'] += instances
-            if component_key not in component_keys_seen[file_key]:
-                file_data[file_key]['component_count'] += 1
-                component_keys_seen[file_key].add(component_key)
-            if team_name and not file_data[file_key]['team_name']:
-                file_data[file_key]['team_name'] = team_name
-            if workspace_name and not file_data[file_key]['workspace_name']:
-                file_data[file_key]['workspace_name'] = workspace_name
-    
-    row_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        # Frontend expects: file_name, component_count, total_instances
-        # But FileUsagesTable also uses: team_name, workspace_name, num_instances
-        # We'll write the basic format, and if team/workspace data is available, we can extend
-        writer.writerow(['file_name', 'component_count', 'total_instances'])
-        
-        for file_name, data in file_data.items():
-            writer.writerow([file_name, data['component_count'], data['total_instances']])
-            row_count += 1
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: usages_by_file.csv (empty - no data available)")
-    else:
-        print(f"✅ Generated: usages_by_file.csv ({row_count} rows)")
+    return generate_endpoint_csv('usages_by_file.csv', output_dir, token, file_key, start_date, end_date, store=store)
 
 
-def generate_variable_actions_by_team_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None):
+def generate_variable_actions_by_team_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None, store: AnalyticsStore = None):
     """Generate variable_actions_by_team.csv from variable actions grouped by team"""
-    filepath = os.path.join(output_dir, 'variable_actions_by_team.csv')
-    
-    analytics_data = fetch_analytics_data(token, file_key, "variable/actions", "team", start_date, end_date)
-    
-    row_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['team_name', 'variable_name', 'actions'])
-        
-        if analytics_data:
-            data_list = []
-            if isinstance(analytics_data, dict):
-                data_list = analytics_data.get('data', analytics_data.get('results', []))
-            elif isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                team_name = item.get('team_name', 'Unknown Team')
-                variable_name = item.get('variable_name', 'Unknown Variable')
-                actions = item.get('actions', 0)
-                
-                writer.writerow([team_name, variable_name, actions])
-                row_count += 1
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: variable_actions_by_team.csv (empty - no data available)")
-    else:
-        print(f"✅ Generated: variable_actions_by_team.csv ({row_count} rows)")
+    return generate_endpoint_csv('variable_actions_by_team.csv', output_dir, token, file_key, start_date, end_date, store=store)
 
 
-def generate_variable_actions_by_variable_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None):
+def generate_variable_actions_by_variable_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None, store: AnalyticsStore = None, on_rows: Callable = None):
     """Generate variable_actions_by_variable.csv from variable actions grouped by variable"""
-    filepath = os.path.join(output_dir, 'variable_actions_by_variable.csv')
-    
-    analytics_data = fetch_analytics_data(token, file_key, "variable/actions", "variable", start_date, end_date)
-    
-    row_count = 0
-    filtered_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['variable_key', 'week', 'detachments', 'insertions', 'variable_name', 'variable_type', 'collection_key', 'collection_name'])
-        
-        if analytics_data:
-            data_list = []
-            if isinstance(analytics_data, dict):
-                data_list = analytics_data.get('data', analytics_data.get('results', []))
-            elif isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                
-                variable_key = item.get('variable_key', '')
-                week = item.get('week', '')
-                detachments = item.get('detachments', 0)
-                insertions = item.get('insertions', 0)
-                variable_name = item.get('variable_name', '')
-                variable_type = item.get('variable_type', '')
-                collection_key = item.get('collection_key', '')
-                collection_name = item.get('collection_name', '')
-                
-                # Filter by date range if provided
-                if start_date and end_date and week:
-                    try:
-                        week_date = datetime.strptime(week, "%Y-%m-%d")
-                        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                        # Skip if outside date range (inclusive boundaries)
-                        if week_date < start_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (before {start_date})")
-                            continue
-                        if week_date > end_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (after {end_date})")
-                            continue
-                    except (ValueError, TypeError) as e:
-                        # If date parsing fails, include the row (don't filter)
-                        # This handles cases where week might be in a different format
-                        print(f"   ⚠️  Could not parse date '{week}': {e}")
-                        pass
-                
-                writer.writerow([variable_key, week, detachments, insertions, variable_name, variable_type, collection_key, collection_name])
-                row_count += 1
-    
-    if filtered_count > 0:
-        print(f"   📅 Filtered out {filtered_count} rows outside date range ({start_date} to {end_date})")
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: variable_actions_by_variable.csv (empty - no data available)")
-    else:
-        print(f"✅ Generated: variable_actions_by_variable.csv ({row_count} rows)")
+    return generate_endpoint_csv('variable_actions_by_variable.csv', output_dir, token, file_key, start_date, end_date, store=store, on_rows=on_rows)
 
 
-def generate_styles_actions_by_style_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None):
+def generate_styles_actions_by_style_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None, store: AnalyticsStore = None, on_rows: Callable = None):
     """Generate styles_actions_by_style.csv from style actions grouped by style"""
-    filepath = os.path.join(output_dir, 'styles_actions_by_style.csv')
-    
-    analytics_data = fetch_analytics_data(token, file_key, "style/actions", "style", start_date, end_date)
-    
-    row_count = 0
-    filtered_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['style_key', 'week', 'detachments', 'insertions', 'style_name', 'style_type'])
-        
-        if analytics_data:
-            data_list = []
-            if isinstance(analytics_data, dict):
-                data_list = analytics_data.get('data', analytics_data.get('results', []))
-            elif isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                
-                style_key = item.get('style_key', '')
-                week = item.get('week', '')
-                detachments = item.get('detachments', 0)
-                insertions = item.get('insertions', 0)
-                style_name = item.get('style_name', '')
-                style_type = item.get('style_type', '')
-                
-                # Filter by date range if provided
-                if start_date and end_date and week:
-                    try:
-                        week_date = datetime.strptime(week, "%Y-%m-%d")
-                        start_dt = datetime.strptime(start_date, "%Y-%m-%d")
-                        end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-                        # Skip if outside date range (inclusive boundaries)
-                        if week_date < start_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (before {start_date})")
-                            continue
-                        if week_date > end_dt:
-                            filtered_count += 1
-                            if filtered_count <= 3:  # Debug: show first few filtered dates
-                                print(f"   ⚠️  Filtering out {week} (after {end_date})")
-                            continue
-                    except (ValueError, TypeError) as e:
-                        # If date parsing fails, include the row (don't filter)
-                        # This handles cases where week might be in a different format
-                        print(f"   ⚠️  Could not parse date '{week}': {e}")
-                        pass
-                
-                writer.writerow([style_key, week, detachments, insertions, style_name, style_type])
-                row_count += 1
-    
-    if filtered_count > 0:
-        print(f"   📅 Filtered out {filtered_count} rows outside date range ({start_date} to {end_date})")
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: styles_actions_by_style.csv (empty - no data available)")
-    else:
-        print(f"✅ Generated: styles_actions_by_style.csv ({row_count} rows)")
+    return generate_endpoint_csv('styles_actions_by_style.csv', output_dir, token, file_key, start_date, end_date, store=store, on_rows=on_rows)
 
 
-def generate_styles_usages_by_style_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None):
+def generate_styles_usages_by_style_csv(output_dir: str, token: str, file_key: str, start_date: str = None, end_date: str = None, store: AnalyticsStore = None):
     """Generate styles_usages_by_style.csv from style usages grouped by style"""
-    filepath = os.path.join(output_dir, 'styles_usages_by_style.csv')
-    
-    # Fetch data grouped by style to get per-style, per-file breakdown
     # Note: usages endpoint may not support date filtering, but we'll pass it anyway
-    analytics_data = fetch_analytics_data(token, file_key, "style/usages", "style", start_date, end_date)
+    return generate_endpoint_csv('styles_usages_by_style.csv', output_dir, token, file_key, start_date, end_date, store=store)
+
+
+def generate_version_history_json(output_dir: str, token: str, file_key: str, store: AnalyticsStore = None):
+    """Generate version_history.json, fetching only versions newer than the ones already saved.
+
+    Failures propagate, so the task is reported as failed and the saved history is kept.
+    """
+    filepath = os.path.join(output_dir, VERSION_HISTORY_FILE)
     
-    row_count = 0
-    with open(filepath, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow(['style_name', 'style_type', 'file_name', 'instances'])
-        
-        if analytics_data:
-            data_list = []
-            if isinstance(analytics_data, dict):
-                data_list = analytics_data.get('data', analytics_data.get('results', []))
-            elif isinstance(analytics_data, list):
-                data_list = analytics_data
-            
-            for item in data_list:
-                if not isinstance(item, dict):
-                    continue
-                style_key = item.get('style_key', '')
-                style_name = item.get('style_name', '')
-                style_type = item.get('style_type', '')
-                file_name = item.get('file_name', 'Unknown File')
-                instances = item.get('instances', 0)
-                
-                writer.writerow([style_name, style_type, file_name, instances])
-                row_count += 1
-    
-    if row_count == 0:
-        print(f"⚠️  Generated: styles_usages_by_style.csv (empty - no data available)")
+    if store is None:
+        versions, new_count = update_version_history(token, file_key, filepath)
     else:
-        print(f"✅ Generated: styles_usages_by_style.csv ({row_count} rows)")
+        # Keep every version seen so far and export the full history from the store
+        known_ids = {version_id for (version_id,) in store.query("SELECT id FROM versions")}
+        new_versions, _ = fetch_version_history(token, file_key, known_ids)
+        store.upsert_versions(new_versions)
+        versions = store.versions()
+        new_count = len(new_versions)
+        if new_count or not os.path.exists(filepath) or not os.path.exists(activity_index_path(filepath)):
+            save_version_history(versions, filepath)
+    
+    print(f"✅ Generated: version_history.json ({len(versions)} versions, {new_count} new)")
+    progress.emit('file', name=VERSION_HISTORY_FILE, rows=len(versions), new=new_count)
+    metrics.record_rows(len(versions))
+    return len(versions)
 
 
-def fetch_version_history(token: str, file_key: str) -> List[Dict[str, Any]]:
-    """Fetch version history from Figma API with pagination support"""
-    url = f"{FIGMA_API_BASE}/files/{file_key}/versions"
-    headers = {"X-Figma-Token": token}
-    
-    print(f"\n📚 Fetching version history from Figma API for file: {file_key}")
+def last_complete_week(today: datetime = None) -> str:
+    """Return the start date (Sunday) of the most recent fully elapsed analytics week"""
+    today = (today or datetime.now()).date()
+    current_week_start = today - timedelta(days=(today.weekday() + 1) % 7)
+    return (current_week_start - timedelta(days=7)).strftime("%Y-%m-%d")
+
+
+def load_sync_state(output_dir: str, file_key: str) -> Dict[str, Any]:
+    """Load incremental sync watermarks, discarding state recorded for another file key"""
+    filepath = os.path.join(output_dir, SYNC_STATE_FILE)
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return {"file_key": file_key, "endpoints": {}}
+    
+    if state.get("file_key") != file_key:
+        print(f"   Sync state belongs to another file key, starting a full sync")
+        return {"file_key": file_key, "endpoints": {}}
+    state.setdefault("endpoints", {})
+    return state
+
+
+def save_sync_state(output_dir: str, state: Dict[str, Any]):
+    """Persist incremental sync watermarks atomically"""
+    filepath = os.path.join(output_dir, SYNC_STATE_FILE)
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, filepath)
+
+
+def merge_incremental_csv(existing_path: str, new_path: str, identity_columns: List[str], fetch_start: str,
+                          on_rows: Callable = None):
+    """Merge freshly fetched weekly rows into an existing CSV.
+
+    Existing rows from fetch_start onward are replaced by the new fetch, and any
+    older row sharing a (identity, week) pair with a new row is dropped. Rows are
+    written newest week first, like the API returns them; rows of the same week
+    keep their order, new rows before kept ones. `on_rows` is passed the merged rows.
+    Returns (new_row_count, total_row_count).
+    """
+    with open(new_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        new_rows = list(reader)
+    
+    week_index = header.index('week')
+    key_indexes = [header.index(column) for column in identity_columns] + [week_index]
+    new_identities = {tuple(row[i] for i in key_indexes) for row in new_rows}
+    
+    kept_rows = []
+    if os.path.exists(existing_path):
+        with open(existing_path, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            existing_header = next(reader, None)
+            if existing_header == header:
+                for row in reader:
+                    if row[week_index] >= fetch_start:
+                        continue
+                    if tuple(row[i] for i in key_indexes) in new_identities:
+                        continue
+                    kept_rows.append(row)
+            else:
+                print(f"   ⚠️  {os.path.basename(existing_path)} has a different header, replacing it")
     
-    all_versions = []
-    page = 1
+    # Stable even with reverse=True, so rows of the same week keep the API's order
+    merged_rows = new_rows + kept_rows
+    merged_rows.sort(key=lambda row: row[week_index], reverse=True)
+    if on_rows is not None:
+        on_rows(merged_rows)
     
-    while True:
-        params = {}
-        response = requests.get(url, headers=headers, params=params)
-        
-        if response.status_code != 200:
-            raise Exception(f"Figma API error: {response.status_code} - {response.text}")
-        
-        data = response.json()
-        versions = data.get("versions", [])
-        
-        if not versions:
-            break
-            
-        all_versions.extend(versions)
-        print(f"  Page {page}: Found {len(versions)} versions (total so far: {len(all_versions)})")
-        
-        # Check for pagination - Figma uses 'pagination' field
-        pagination = data.get("pagination", {})
-        next_page = pagination.get("next_page")
-        
-        if not next_page:
-            break
-            
-        # Update URL for next page
-        url = next_page
-        page += 1
+    with atomic_write(existing_path, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(merged_rows)
     
-    print(f"✅ Found {len(all_versions)} total versions across {page} page(s)")
-    return all_versions
+    return len(new_rows), len(merged_rows)
 
 
-def generate_version_history_json(output_dir: str, token: str, file_key: str):
-    """Generate version_history.json file"""
-    filepath = os.path.join(output_dir, 'version_history.json')
+def generate_incremental_csv(filename: str, generate, output_dir: str, sync_state: Dict[str, Any],
+                             state_lock: threading.Lock, start_date: str, store: AnalyticsStore = None,
+                             on_rows: Callable = None):
+    """Fetch a weekly CSV from its watermark onward and merge it into the existing file.
+
+    `generate(out_dir, start_date, on_rows)` writes `filename` into `out_dir`. With a
+    store the fetched weeks are upserted into it and the CSV is re-exported, otherwise
+    the fetch is merged into the CSV itself; either way `on_rows` sees the final rows. The watermark only advances when the fetch returned
+    rows, so a failed or empty fetch is retried from the same week next time.
+    """
+    endpoint_id, identity_columns = INCREMENTAL_OUTPUTS[filename]
+    filepath = os.path.join(output_dir, filename)
+    
+    with state_lock:
+        watermark = sync_state["endpoints"].get(endpoint_id, {}).get("last_complete_week")
+    
+    if watermark and os.path.exists(filepath):
+        fetch_start = max(watermark, start_date)
+        print(f"🔁 Incremental sync for {filename}: fetching from {fetch_start} (watermark {watermark})")
+    else:
+        fetch_start = start_date
+        print(f"🔁 No watermark for {filename}: fetching full history from {fetch_start}")
     
+    if store is not None:
+        result = generate(output_dir, fetch_start, on_rows)
+        new_rows, total_rows = result['fetched'], result['rows']
+    else:
+        tmp_dir = tempfile.mkdtemp(prefix='.incremental-', dir=output_dir)
+        try:
+            generate(tmp_dir, fetch_start, None)
+            new_rows, total_rows = merge_incremental_csv(filepath, os.path.join(tmp_dir, filename), identity_columns,
+                                                         fetch_start, on_rows)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    print(f"✅ Merged: {filename} ({new_rows} fetched rows, {total_rows} total rows)")
+    
+    if new_rows > 0:
+        with state_lock:
+            sync_state["endpoints"][endpoint_id] = {
+                "last_complete_week": last_complete_week(),
+                "synced_at": datetime.now().isoformat(timespec='seconds')
+            }
+
+
+def run_stage(name: str, task):
+    """Run one generation task as a timed metrics stage"""
+    with metrics.stage(name):
+        return task()
+
+
+def run_generation_tasks(tasks: List[tuple], workers: int = 1, executor: ThreadPoolExecutor = None):
+    """Run (name, callable) generation tasks, sequentially or on a bounded thread pool.
+
+    Pass `executor` to schedule the tasks on a pool shared with other runs (see batch.py)
+    instead of a pool of `workers` threads owned by this call.
+    A failing task is reported and skipped so the remaining endpoints still run.
+    Returns the list of task names that failed.
+    """
+    failed = []
+    
+    if executor is None and workers <= 1:
+        for name, task in tasks:
+            try:
+                run_stage(name, task)
+            except Exception as e:
+                print(f"⚠️  {name} failed: {str(e)}")
+                progress.emit('failed', name=name, error=str(e))
+                failed.append(name)
+        return failed
+    
+    own_executor = executor is None
+    if own_executor:
+        print(f"⚡ Fetching {len(tasks)} endpoints concurrently ({min(workers, len(tasks))} workers)")
+        executor = ThreadPoolExecutor(max_workers=workers)
     try:
-        versions = fetch_version_history(token, file_key)
-        
-        # Save to JSON file
-        os.makedirs(os.path.dirname(filepath), exist_ok=True)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(versions, f, indent=2, ensure_ascii=False)
-        
-        print(f"✅ Generated: version_history.json ({len(versions)} versions)")
-        return len(versions)
-    except Exception as e:
-        print(f"⚠️  Failed to generate version_history.json: {str(e)}")
-        return 0
+        futures = {progress.submit(executor, run_stage, name, task): name for name, task in tasks}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"⚠️  {name} failed: {str(e)}")
+                progress.emit('failed', name=name, error=str(e))
+                failed.append(name)
+    finally:
+        if own_executor:
+            executor.shutdown()
+    
+    # Report failures in task order regardless of completion order
+    order = [name for name, _ in tasks]
+    return sorted(failed, key=order.index)
+
+
+def generate_csv_files(data: ComponentIndex, output_dir: str, token: str, file_key: str, workers: int = 1,
+                       incremental: bool = False, columnar: str = None,
+                       executor: ThreadPoolExecutor = None, use_store: bool = False,
+                       partition: str = None, rollup_cube: List[str] = None) -> Dict[str, Any]:
+    """Generate all CSV files and version history from Figma analytics data.
 
+    `data` is the ComponentIndex from load_component_index (raw component maps
+    from load_component_maps are accepted too).
+    With use_store, every fetch is upserted into the library's SQLite store
+    (see analytics_store.py) and the CSVs are exported from it. With partition
+    ('week' or 'month'), the weekly CSVs are also split into partitions/ (see
+    partitioned_output.py). With rollup_cube (levels such as ['week', 'month']),
+    per-component and per-team cumulative sums are written (see rollup_cube.py).
 
-def generate_csv_files(data: Dict[str, Any], output_dir: str, token: str, file_key: str):
-    """Generate all CSV files and version history from Figma analytics data"""
+    Returns a summary: {'files', 'files_with_data', 'total_rows', 'failed', 'version_history'}.
+    """
     
     # Ensure output directory exists
     print(f"\n📁 Output directory: {output_dir}")
@@ -763,31 +750,94 @@ def generate_csv_files(data: Dict[str, Any], output_dir: str, token: str, file_k
     
     # Set date range: from 2025-01-01 to today
     # This will fetch all data from January 1, 2025 onwards
-    start_date = "2025-01-01"
+    start_date = DEFAULT_START_DATE
     end_date = datetime.now().strftime("%Y-%m-%d")
     print(f"📅 Date range: {start_date} to {end_date}")
     print(f"   Will fetch all data from {start_date} to {end_date} (with pagination if needed)")
     print("=" * 60)
     
-    # Extract component metadata for mapping component keys to names
-    component_metadata, name_to_key = get_component_metadata(data)
+    # Component metadata for mapping component keys to names
+    component_index = data if isinstance(data, ComponentIndex) else ComponentIndex(*get_component_metadata(data))
+    component_metadata, name_to_key = component_index.metadata, component_index.name_to_key
     print(f"Found {len(component_metadata)} components in library")
     
-    # Generate each CSV file with date filtering
-    generate_actions_by_component_csv(output_dir, token, file_key, component_metadata, name_to_key, start_date, end_date)
-    generate_actions_by_team_csv(output_dir, token, file_key, start_date, end_date)
-    generate_usages_by_component_csv(output_dir, token, file_key, component_metadata, name_to_key, start_date, end_date)
-    generate_usages_by_file_csv(output_dir, token, file_key, start_date, end_date)
-    generate_variable_actions_by_team_csv(output_dir, token, file_key, start_date, end_date)
-    generate_variable_actions_by_variable_csv(output_dir, token, file_key, start_date, end_date)
-    generate_styles_actions_by_style_csv(output_dir, token, file_key, start_date, end_date)
-    generate_styles_usages_by_style_csv(output_dir, token, file_key, start_date, end_date)
+    store = AnalyticsStore.for_output_dir(output_dir, file_key) if use_store else None
+    if store is not None:
+        print(f"🗃️  Analytics store: {store.path}")
+    
+    sync_state = load_sync_state(output_dir, file_key) if incremental else None
+    state_lock = threading.Lock()
+    # Fed the actions CSV rows as they are written, for the weekly rollups
+    weekly_totals = WeeklyTotals()
+    
+    def weekly_task(filename: str, generate):
+        """Wrap a weekly generator so incremental runs fetch from the watermark and merge"""
+        on_rows = weekly_totals.on_rows(filename) if filename in ACTIONS_COLUMNS else None
+        if incremental:
+            return lambda: generate_incremental_csv(filename, generate, output_dir, sync_state, state_lock, start_date,
+                                                    store, on_rows)
+        return lambda: generate(output_dir, start_date, on_rows)
+    
+    # Generate each CSV file with date filtering, plus the version history JSON file.
+    # Every task writes its own output file, so they can safely run in parallel.
+    tasks = [
+        ('actions_by_component.csv', weekly_task('actions_by_component.csv', lambda out_dir, start, on_rows: generate_actions_by_component_csv(out_dir, token, file_key, component_metadata, name_to_key, start, end_date, store=store, on_rows=on_rows))),
+        ('actions_by_team.csv', weekly_task('actions_by_team.csv', lambda out_dir, start, on_rows: generate_actions_by_team_csv(out_dir, token, file_key, start, end_date, store=store, on_rows=on_rows))),
+        ('usages_by_component.csv', lambda: generate_usages_by_component_csv(output_dir, token, file_key, component_metadata, name_to_key, start_date, end_date, store=store)),
+        ('usages_by_file.csv', lambda: generate_usages_by_file_csv(output_dir, token, file_key, start_date, end_date, store=store)),
+        ('variable_actions_by_team.csv', lambda: generate_variable_actions_by_team_csv(output_dir, token, file_key, start_date, end_date, store=store)),
+        ('variable_actions_by_variable.csv', weekly_task('variable_actions_by_variable.csv', lambda out_dir, start, on_rows: generate_variable_actions_by_variable_csv(out_dir, token, file_key, start, end_date, store=store, on_rows=on_rows))),
+        ('styles_actions_by_style.csv', weekly_task('styles_actions_by_style.csv', lambda out_dir, start, on_rows: generate_styles_actions_by_style_csv(out_dir, token, file_key, start, end_date, store=store, on_rows=on_rows))),
+        ('styles_usages_by_style.csv', lambda: generate_styles_usages_by_style_csv(output_dir, token, file_key, start_date, end_date, store=store)),
+        ('version_history.json', lambda: generate_version_history_json(output_dir, token, file_key, store=store)),
+    ]
+    progress.emit('stage', stage='generate', outputs=[name for name, _ in tasks])
+    failed_tasks = run_generation_tasks(tasks, workers, executor)
     
-    # Generate version history JSON file
-    generate_version_history_json(output_dir, token, file_key)
+    if incremental:
+        save_sync_state(output_dir, sync_state)
     
     print("=" * 60)
     
+    if failed_tasks:
+        print(f"⚠️  {len(failed_tasks)} output(s) failed to generate: {', '.join(failed_tasks)}")
+    
+    # Weekly rollups of the final (possibly merged) actions rows; outputs that failed keep their
+    # previous CSV, which is read back instead
+    progress.emit('stage', stage='summaries')
+    try:
+        with metrics.stage('summaries'):
+            write_weekly_totals(output_dir, weekly_totals, reread=failed_tasks)
+    except Exception as e:
+        print(f"⚠️  Failed to generate weekly totals: {str(e)}")
+    
+    # Optional typed, dictionary-encoded copies of the CSVs for faster dashboard loads
+    if columnar:
+        with metrics.stage('columnar'):
+            write_columnar_outputs(output_dir, columnar, [name for name in CSV_SCHEMAS if name not in failed_tasks])
+    
+    # Per-week or per-month copies of the weekly CSVs, rewritten only where they changed
+    try:
+        if partition:
+            progress.emit('stage', stage='partitions')
+            with metrics.stage('partitions'):
+                write_partitioned_outputs(output_dir, partition, [name for name, _ in tasks if name not in failed_tasks])
+        else:
+            remove_partitioned_outputs(output_dir)
+    except OSError as e:
+        print(f"⚠️  Failed to write partitioned outputs: {str(e)}")
+    
+    # Prefix-sum cubes answering date-range totals without scanning the weekly rows
+    try:
+        if rollup_cube:
+            progress.emit('stage', stage='rollups')
+            with metrics.stage('rollups'):
+                write_rollup_cubes(output_dir, rollup_cube, [name for name, _ in tasks if name not in failed_tasks])
+        else:
+            remove_rollup_cubes(output_dir)
+    except OSError as e:
+        print(f"⚠️  Failed to write rollup cubes: {str(e)}")
+    
     # Check if any files have data
     csv_files = [
         'actions_by_component.csv',
@@ -800,18 +850,22 @@ def generate_csv_files(data: Dict[str, Any], output_dir: str, token: str, file_k
         'styles_usages_by_style.csv'
     ]
     
+    # Row counts were recorded in the artifact manifest while the CSVs were written
+    artifacts = load_artifact_manifest(output_dir)
+    generated_files = []
     files_with_data = 0
     total_rows = 0
     for filename in csv_files:
         filepath = os.path.join(output_dir, filename)
         if os.path.exists(filepath):
-            with open(filepath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                # Subtract 1 for header
-                row_count = len(lines) - 1 if len(lines) > 1 else 0
-                if row_count > 0:
-                    files_with_data += 1
-                    total_rows += row_count
+            generated_files.append(filename)
+            row_count = artifact_rows(output_dir, filename, artifacts)
+            if row_count is None:
+                # Left over from a run before the manifest existed
+                row_count = count_csv_rows(filepath)
+            if row_count > 0:
+                files_with_data += 1
+                total_rows += row_count
     
     # Check if version_history.json was generated
     version_history_path = os.path.join(output_dir, 'version_history.json')
@@ -831,35 +885,209 @@ def generate_csv_files(data: Dict[str, Any], output_dir: str, token: str, file_k
         print("\n   Check the warnings above for specific API errors.")
     else:
         print("\n✅ CSV generation completed successfully!")
+    
+    summary = {
+        'files': generated_files,
+        'files_with_data': files_with_data,
+        'total_rows': total_rows,
+        'failed': failed_tasks,
+        'version_history': version_history_generated,
+    }
+    
+    # Lets the next run skip everything while these outputs are still current; after
+    # a failed output the next run must refresh, so an older manifest is dropped too
+    try:
+        if failed_tasks:
+            remove_run_manifest(output_dir)
+        else:
+            write_run_manifest(output_dir, file_key, summary, manifest_options(columnar, use_store, partition, rollup_cube))
+    except OSError as e:
+        print(f"⚠️  Failed to update run manifest: {str(e)}")
+    
+    return summary
 
 
-def main():
-    parser = argparse.ArgumentParser(description='Generate CSV files from Figma library data')
+def count_csv_rows(filepath: str) -> int:
+    """Data lines in a CSV without a manifest entry, counted in binary chunks"""
+    lines = 0
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(STREAM_CHUNK_SIZE), b''):
+            lines += chunk.count(b'\n')
+    return max(lines - 1, 0)
+
+
+def finish_run_metrics(run_metrics: metrics.RunMetrics, success: bool, metrics_file: str = None):
+    """Print per-stage timings, emit the final 'metrics' event and write the Prometheus textfile"""
+    run_metrics.finish(success)
+    snapshot = run_metrics.snapshot()
+    print(f"\n⏱️  Stage timings ({snapshot['seconds']:.1f}s total):")
+    for name, stage in snapshot['stages'].items():
+        retries = sum(stage['retries'].values())
+        print(f"   {name:<34} {stage['seconds']:>7.2f}s  {stage['pages']:>5} pages  {stage['records']:>8} records  "
+              f"{stage['bytes'] / 1024:>9.0f} KB  {stage['requests']:>4} requests  {retries:>3} retries"
+              f"{'  ❌' if stage['status'] != 'ok' else ''}")
+    progress.emit('metrics', **snapshot)
+    
+    if metrics_file:
+        try:
+            metrics.write_prometheus_textfile(metrics_file, [run_metrics])
+            print(f"📈 Metrics written to {metrics_file}")
+        except OSError as e:
+            print(f"⚠️  Failed to write metrics file: {str(e)}")
+
+
+def output_options_parser() -> argparse.ArgumentParser:
+    """Options choosing what a run writes and when it may be skipped, shared by main.py and batch.py"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--metadata-source', choices=METADATA_SOURCES, default=DEFAULT_METADATA_SOURCE,
+                        help='Component name source: published components endpoints, or the streamed file document '
+                             f'(default: {DEFAULT_METADATA_SOURCE})')
+    parser.add_argument('--columnar', choices=sorted(COLUMNAR_FORMATS),
+                        help='Also write Parquet or Arrow IPC copies of every CSV (requires pyarrow)')
+    parser.add_argument('--partition', choices=PARTITION_GRANULARITIES,
+                        help='Also split the weekly CSVs into one file per week or month under partitions/, '
+                             'so the dashboard loads only the selected date range')
+    parser.add_argument('--rollup-cube', type=parse_rollup_levels, default=None, metavar='LEVELS',
+                        help="Also write per-component and per-team cumulative sums for O(1) date-range totals, "
+                             "at comma-separated levels of 'week', 'month' and 'quarter'")
+    parser.add_argument('--incremental', action='store_true',
+                        help='Only fetch weeks since the last successful run and merge them into the existing CSVs')
+    parser.add_argument('--store', action='store_true',
+                        help='Upsert every fetch into a SQLite store in the output directory and export the CSVs from it')
+    parser.add_argument('--force', action='store_true',
+                        help='Refresh even if the last run is still fresh (no new version, same analytics week)')
+    parser.add_argument('--fresh-for', type=float, default=DEFAULT_FRESH_FOR,
+                        help=f'Seconds a successful run stays fresh when no version was saved since '
+                             f'(default: {DEFAULT_FRESH_FOR}, 0 = always refresh)')
+    return parser
+
+
+def client_options_parser() -> argparse.ArgumentParser:
+    """Options for the process-wide Figma client (see configure_client), shared by every entry point"""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help='Directory for the on-disk API response cache')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL,
+                        help=f'Seconds a cached API response is served without revalidation (default: {DEFAULT_TTL})')
+    parser.add_argument('--cache-max-mb', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Size budget of the response cache in MB; least recently used entries are evicted')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the API response cache and always fetch from Figma')
+    parser.add_argument('--checkpoint-dir', default=DEFAULT_CHECKPOINT_DIR,
+                        help='Directory where partially fetched analytics pages are saved so interrupted runs resume')
+    parser.add_argument('--no-checkpoints', action='store_true',
+                        help='Do not save or resume pagination checkpoints')
+    parser.add_argument('--component-index-dir', default=DEFAULT_INDEX_DIR,
+                        help='Directory where resolved component names are saved per file version')
+    parser.add_argument('--no-component-index', action='store_true',
+                        help='Always fetch component metadata instead of reusing the index saved for the same file version')
+    parser.add_argument('--rate-limit', type=float, default=DEFAULT_RPM,
+                        help=f'Figma requests per minute shared by all fetches; lowered automatically after 429s '
+                             f'(default: {DEFAULT_RPM}, 0 = unlimited)')
+    parser.add_argument('--shard', type=parse_shard_spec, default=None,
+                        help="Split the date range of weekly endpoints into windows fetched concurrently: "
+                             "'month', 'quarter' or a number of windows")
+    parser.add_argument('--shard-workers', type=int, default=DEFAULT_SHARD_WORKERS,
+                        help=f'Date windows fetched concurrently per endpoint with --shard (default: {DEFAULT_SHARD_WORKERS})')
+    return parser
+
+
+def configure_client(args: argparse.Namespace):
+    """Set up the response cache, rate limiter, checkpoints, component index and sharding from client options"""
+    if not args.no_cache:
+        configure_response_cache(ResponseCache(args.cache_dir, ttl=args.cache_ttl,
+                                               max_bytes=args.cache_max_mb * 1024 * 1024))
+    configure_rate_limiter(RateLimiter(args.rate_limit) if args.rate_limit > 0 else None)
+    if not args.no_checkpoints:
+        configure_checkpoints(CheckpointStore(args.checkpoint_dir))
+    if not args.no_component_index:
+        configure_component_index(ComponentIndexStore(args.component_index_dir))
+    if args.shard:
+        configure_sharding(ShardPlan(args.shard, args.shard_workers))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Command-line options shared by main.py and the jobs accepted by service.py"""
+    parser = argparse.ArgumentParser(description='Generate CSV files from Figma library data',
+                                     parents=[output_options_parser(), client_options_parser()])
     parser.add_argument('--token', required=True, help='Figma access token')
     parser.add_argument('--file-key', required=True, help='Figma file key')
     parser.add_argument('--output-dir', required=True, help='Output directory for CSV files')
     parser.add_argument('--library-name', default='', help='Library name for folder organization')
-    
-    args = parser.parse_args()
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Number of endpoints to fetch concurrently (default: {DEFAULT_WORKERS}, 1 = sequential)')
+    parser.add_argument('--progress-fd', type=int, default=None,
+                        help='Write progress events as JSON lines to this already open file descriptor (e.g. 3)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Write per-stage timings and request counters to this Prometheus textfile when the run ends')
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
     
     # Resolve output directory to absolute path to avoid path resolution issues
     output_dir = os.path.abspath(args.output_dir)
     print(f"📁 Received output directory: {args.output_dir}")
     print(f"📁 Resolved to absolute path: {output_dir}")
     
+    if args.columnar:
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            print(f"\n❌ Error: {str(e)}", file=sys.stderr)
+            sys.exit(1)
+    
+    configure_client(args)
+    
     try:
-        # Fetch data from Figma
-        data = fetch_figma_data(args.token, args.file_key)
-        
-        # Generate CSV files (output_dir already includes library folder from server)
-        generate_csv_files(data, output_dir, args.token, args.file_key)
-        
-        print("\n✅ CSV generation completed successfully!")
-        sys.exit(0)
+        # Machine-readable progress goes to its own channel, never mixed into the log on stdout
+        progress_stream = os.fdopen(args.progress_fd, 'w', encoding='utf-8', buffering=1) if args.progress_fd is not None else None
+    except OSError as e:
+        print(f"\n❌ Error: cannot write progress events to fd {args.progress_fd}: {str(e)}", file=sys.stderr)
+        sys.exit(1)
+    
+    writer = progress.JsonLinesWriter(progress_stream) if progress_stream else None
+    
+    # Pre-flight: one small versions request decides whether anything could have changed
+    if not args.force:
+        fresh = fresh_run_result(output_dir, args.token, args.file_key,
+                                 manifest_options(args.columnar, args.store, args.partition, args.rollup_cube), args.fresh_for)
+        if fresh is not None:
+            with progress.listening(writer) if writer else contextlib.nullcontext():
+                progress.emit('fresh', **fresh)
+            sys.exit(0)
+    
+    run_metrics = metrics.RunMetrics({'library': args.library_name or args.file_key})
+    listener = progress.listening(writer) if writer else contextlib.nullcontext()
+    with metrics.collecting(run_metrics), listener:
+        try:
+            # Fetch component metadata from Figma
+            data = load_component_index(args.token, args.file_key, args.metadata_source)
+            
+            # Generate CSV files (output_dir already includes library folder from server)
+            summary = generate_csv_files(data, output_dir, args.token, args.file_key, workers=args.workers,
+                                         incremental=args.incremental, columnar=args.columnar, use_store=args.store,
+                                         partition=args.partition, rollup_cube=args.rollup_cube)
+            
+            cache = get_response_cache()
+            if cache:
+                print(f"🗄️  Response cache: {cache.summary()}")
+            limiter = get_rate_limiter()
+            if limiter:
+                print(f"🚦 Rate limiter: {limiter.summary()}")
+            error = None
+        except Exception as e:
+            summary = None
+            error = e
         
-    except Exception as e:
-        print(f"\n❌ Error: {str(e)}", file=sys.stderr)
+        finish_run_metrics(run_metrics, summary is not None and not summary['failed'], args.metrics_file)
+    
+    if error is not None:
+        print(f"\n❌ Error: {str(error)}", file=sys.stderr)
         sys.exit(1)
+    print("\n✅ CSV generation completed successfully!")
+    sys.exit(0)
 
 
 if __name__ == "__main__":
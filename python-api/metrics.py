@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Run metrics
+Timers and counters for every generation stage: pages, records, rows, response
+bytes, HTTP status counts, retries and rate-limit waits. Like progress events,
+the collector lives in a context variable, so concurrent runs (batch.py, service.py)
+each count only their own requests. Recording is a no-op outside collecting().
+
+At the end of a run the totals can be written as a Prometheus textfile
+(node_exporter's textfile collector) to track refresh latency over time.
+"""
+
+import contextvars
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Any, Optional
+
+import progress
+from output_files import atomic_write
+
+METRIC_PREFIX = 'figma_refresh'
+
+_collector: contextvars.ContextVar[Optional['RunMetrics']] = contextvars.ContextVar('run_metrics', default=None)
+_stage: contextvars.ContextVar[str] = contextvars.ContextVar('metrics_stage', default='run')
+
+
+def _new_stage() -> Dict[str, Any]:
+    return {'seconds': 0.0, 'status': 'ok', 'pages': 0, 'records': 0, 'rows': 0, 'bytes': 0,
+            'statuses': Counter(), 'retries': Counter(), 'cache_hits': 0, 'rate_limit_wait_seconds': 0.0}
+
+
+class RunMetrics:
+    """Per-stage timers and counters for one generation run (thread-safe)"""
+
+    def __init__(self, labels: Dict[str, str] = None):
+        self.labels = dict(labels or {})
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.success: Optional[bool] = None
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _stage(self, name: str) -> Dict[str, Any]:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = _new_stage()
+        return stage
+
+    def add(self, name: str, counter: str, amount: float = 1):
+        with self._lock:
+            self._stage(name)[counter] += amount
+
+    def count(self, name: str, counter: str, key: str):
+        with self._lock:
+            self._stage(name)[counter][key] += 1
+
+    def finish_stage(self, name: str, seconds: float, status: str):
+        with self._lock:
+            stage = self._stage(name)
+            stage['seconds'] += seconds
+            if status != 'ok':
+                stage['status'] = status
+
+    def finish(self, success: bool):
+        self.finished_at = time.time()
+        self.success = success
+
+    def stage_summary(self, name: str) -> Dict[str, Any]:
+        """JSON-friendly totals of one stage"""
+        with self._lock:
+            stage = self._stage(name)
+            return {
+                'seconds': round(stage['seconds'], 3), 'status': stage['status'],
+                'pages': stage['pages'], 'records': stage['records'], 'rows': stage['rows'], 'bytes': stage['bytes'],
+                'requests': sum(stage['statuses'].values()), 'statuses': dict(stage['statuses']),
+                'retries': dict(stage['retries']), 'cache_hits': stage['cache_hits'],
+                'rate_limit_wait_seconds': round(stage['rate_limit_wait_seconds'], 3),
+            }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly totals of the run and every stage"""
+        end = self.finished_at or time.time()
+        return {
+            'labels': self.labels,
+            'seconds': round(end - self.started_at, 3),
+            'success': self.success,
+            'stages': {name: self.stage_summary(name) for name in list(self.stages)},
+        }
+
+
+def current() -> Optional[RunMetrics]:
+    return _collector.get()
+
+
+@contextmanager
+def collecting(run: RunMetrics):
+    """Attribute metrics recorded in this context (and tasks submitted with progress.submit) to `run`"""
+    token = _collector.set(run)
+    try:
+        yield run
+    finally:
+        _collector.reset(token)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a stage and attribute requests made inside it; emits a 'stage_done' progress event"""
+    run = _collector.get()
+    token = _stage.set(name)
+    started = time.perf_counter()
+    status = 'failed'
+    try:
+        yield
+        status = 'ok'
+    finally:
+        _stage.reset(token)
+        if run is not None:
+            run.finish_stage(name, time.perf_counter() - started, status)
+            progress.emit('stage_done', stage=name, **run.stage_summary(name))
+
+
+def record_request(status: int, response_bytes: int):
+    run = _collector.get()
+    if run is not None:
+        name = _stage.get()
+        run.count(name, 'statuses', str(status))
+        run.add(name, 'bytes', response_bytes)
+
+
+def record_retry(reason: str):
+    run = _collector.get()
+    if run is not None:
+        run.count(_stage.get(), 'retries', reason)
+
+
+def record_wait(seconds: float):
+    run = _collector.get()
+    if run is not None and seconds > 0:
+        run.add(_stage.get(), 'rate_limit_wait_seconds', seconds)
+
+
+def record_cache_hit():
+    run = _collector.get()
+    if run is not None:
+        run.add(_stage.get(), 'cache_hits')
+
+
+def record_page(records: int):
+    run = _collector.get()
+    if run is not None:
+        name = _stage.get()
+        run.add(name, 'pages')
+        run.add(name, 'records', records)
+
+
+def record_rows(rows: int):
+    run = _collector.get()
+    if run is not None:
+        run.add(_stage.get(), 'rows', rows)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _series(name: str, labels: Dict[str, Any], value: float) -> str:
+    label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+    number = str(value) if isinstance(value, int) else repr(round(value, 6))
+    return f"{METRIC_PREFIX}_{name}{{{label_text}}} {number}" if label_text else f"{METRIC_PREFIX}_{name} {number}"
+
+
+# (name, help, values from one run) for every exported metric
+PROMETHEUS_METRICS = [
+    ('duration_seconds', 'Wall time of the last refresh',
+     lambda run: [({}, (run.finished_at or time.time()) - run.started_at)]),
+    ('last_run_timestamp_seconds', 'Unix time the last refresh finished',
+     lambda run: [({}, run.finished_at or time.time())]),
+    ('success', 'Whether the last refresh generated every output (1) or not (0)',
+     lambda run: [({}, 1 if run.success else 0)]),
+    ('stage_duration_seconds', 'Wall time of each stage in the last refresh',
+     lambda run: [({'stage': name}, s['seconds']) for name, s in run.stages.items()]),
+    ('stage_failed', 'Whether the stage failed in the last refresh',
+     lambda run: [({'stage': name}, 0 if s['status'] == 'ok' else 1) for name, s in run.stages.items()]),
+    ('pages', 'Analytics or version pages fetched in the last refresh',
+     lambda run: [({'stage': name}, s['pages']) for name, s in run.stages.items()]),
+    ('records', 'API records received in the last refresh',
+     lambda run: [({'stage': name}, s['records']) for name, s in run.stages.items()]),
+    ('rows', 'Rows written in the last refresh',
+     lambda run: [({'stage': name}, s['rows']) for name, s in run.stages.items()]),
+    ('response_bytes', 'Response body bytes received in the last refresh',
+     lambda run: [({'stage': name}, s['bytes']) for name, s in run.stages.items()]),
+    ('http_responses', 'HTTP responses by status code in the last refresh',
+     lambda run: [({'stage': name, 'code': code}, count)
+                  for name, s in run.stages.items() for code, count in sorted(s['statuses'].items())]),
+    ('http_retries', 'Retried requests by reason in the last refresh',
+     lambda run: [({'stage': name, 'reason': reason}, count)
+                  for name, s in run.stages.items() for reason, count in sorted(s['retries'].items())]),
+    ('cache_hits', 'Responses served from the response cache in the last refresh',
+     lambda run: [({'stage': name}, s['cache_hits']) for name, s in run.stages.items()]),
+    ('rate_limit_wait_seconds', 'Seconds spent waiting on the rate limiter in the last refresh',
+     lambda run: [({'stage': name}, s['rate_limit_wait_seconds']) for name, s in run.stages.items()]),
+]
+
+
+def prometheus_text(runs: List[RunMetrics]) -> str:
+    """Prometheus text exposition of one or more runs (e.g. every library of a batch)"""
+    lines = []
+    for name, help_text, values in PROMETHEUS_METRICS:
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        for run in runs:
+            with run._lock:
+                lines.extend(_series(name, {**run.labels, **labels}, value) for labels, value in values(run))
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus_textfile(path: str, runs: List[RunMetrics]):
+    """Atomically write the runs' metrics; the textfile collector never sees a partial file"""
+    with atomic_write(path) as f:
+        f.write(prometheus_text(runs))
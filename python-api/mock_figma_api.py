@@ -0,0 +1,526 @@
+#!/usr/bin/env python3
+"""
+Mock Figma API
+Local stand-in for the Figma endpoints the generator calls (/files, /files/{key}/versions
+and /analytics/libraries/...), serving a synthetic library whose size scales from the
+ZDS_Components sample to millions of rows. Responses are cursor-paginated like
+the real API, and latency, server errors and 429s can be injected to exercise the
+client's retry, rate-limiting and checkpoint paths. With --etags, successful
+responses carry an ETag and a matching If-None-Match is answered with a 304,
+for the response cache's revalidation path.
+
+Point the generator at it with FIGMA_API_BASE=http://127.0.0.1:<port>/v1.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Any, Callable, Optional
+from urllib.parse import urlparse, parse_qs, urlencode
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Published sample whose names and row counts scale=1 reproduces
+SAMPLE_DIR = os.path.join(PROJECT_ROOT, 'public', 'csv', 'ZDS_Components')
+
+DEFAULT_PORT = 8765
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_VERSIONS_PAGE_SIZE = 30
+DEFAULT_WEEKS = 52
+
+# Entity counts of the ZDS_Components sample; every count is multiplied by --scale
+SAMPLE_PROFILE = {
+    'components': 1626,          # published components (metadata)
+    'components_per_set': 8,
+    'active_components': 542,    # components with weekly actions (~28k action rows)
+    'teams': 34,                 # teams with weekly actions
+    'files_per_component': 2,    # usages by file fan-out (~3.3k rows)
+    'variable_teams': 52,
+    'variables_per_team': 27,
+    'variables': 63,
+    'collections': 2,
+    'styles': 88,
+    'style_usages': 93,
+    'versions': 500,
+}
+
+# Version ids grow with each publish, so a longer history only adds newer ids
+VERSION_ID_BASE = 3000000000000000000
+
+STYLE_TYPES = ('FILL', 'TEXT', 'EFFECT', 'GRID')
+VARIABLE_TYPES = ('COLOR', 'FLOAT', 'STRING', 'BOOLEAN')
+
+
+def _mix(*values: int) -> int:
+    """Cheap deterministic hash of integers, used for synthetic counts"""
+    h = 2166136261
+    for value in values:
+        h = ((h ^ (value & 0xffffffff)) * 16777619) & 0xffffffff
+    return h ^ (h >> 13)
+
+
+def _key(kind: str, index: int) -> str:
+    """40-hex key like the ones the real API returns"""
+    return hashlib.sha1(f"{kind}:{index}".encode('utf-8')).hexdigest()
+
+
+def _read_sample_names(sample_dir: str, filename: str, column: str) -> List[str]:
+    """Distinct values of `column` in a sample CSV, in first-seen order (empty if unavailable)"""
+    names = {}
+    try:
+        with open(os.path.join(sample_dir, filename), 'r', encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                value = row.get(column)
+                if value and not value.startswith('Unknown'):
+                    names.setdefault(value, None)
+    except OSError:
+        pass
+    return list(names)
+
+
+class NamePool:
+    """Names for entity indexes: sample names first, then numbered copies once they run out"""
+
+    def __init__(self, sample: List[str], fallback: str):
+        self.sample = sample or []
+        self.fallback = fallback
+
+    def __call__(self, index: int) -> str:
+        if not self.sample:
+            return f"{self.fallback} {index + 1}"
+        name = self.sample[index % len(self.sample)]
+        copy = index // len(self.sample)
+        return f"{name} #{copy + 1}" if copy else name
+
+
+class Dataset:
+    """Rows of one analytics endpoint, computed from their index so any page is O(page size).
+
+    Weekly datasets are ordered week-major (oldest week first, or newest first with
+    newest_first), which turns a start/end date filter into one contiguous index range.
+    """
+
+    def __init__(self, entities: int, build: Callable[[int, int], Dict[str, Any]], weeks: Optional[List[str]] = None,
+                 newest_first: bool = False):
+        self.entities = max(0, entities)
+        self.build = build
+        self.weeks = weeks
+        self.newest_first = newest_first
+
+    def window(self, start_date: Optional[str], end_date: Optional[str]) -> range:
+        if self.weeks is None:
+            return range(self.entities)
+        first = sum(1 for week in self.weeks if start_date and week < start_date)
+        last = len(self.weeks) - sum(1 for week in self.weeks if end_date and week > end_date)
+        if self.newest_first:
+            first, last = len(self.weeks) - last, len(self.weeks) - first
+        return range(first * self.entities, max(first, last) * self.entities)
+
+    def row(self, index: int) -> Dict[str, Any]:
+        if self.weeks is None:
+            return self.build(index, -1)
+        week_index, entity = divmod(index, self.entities)
+        if self.newest_first:
+            week_index = len(self.weeks) - 1 - week_index
+        return self.build(entity, week_index)
+
+
+class SyntheticLibrary:
+    """Deterministic library shaped like the ZDS_Components sample, `scale` times larger"""
+
+    def __init__(self, scale: float = 1.0, weeks: int = DEFAULT_WEEKS, end_week: Optional[str] = None,
+                 versions: Optional[int] = None, sample_dir: str = SAMPLE_DIR, newest_first: bool = False):
+        self.scale = scale
+        self.newest_first = newest_first
+        counts = {name: max(1, int(round(value * scale))) for name, value in SAMPLE_PROFILE.items()}
+        counts['components_per_set'] = SAMPLE_PROFILE['components_per_set']
+        counts['files_per_component'] = SAMPLE_PROFILE['files_per_component']
+        counts['collections'] = SAMPLE_PROFILE['collections']
+        counts['versions'] = versions if versions is not None else SAMPLE_PROFILE['versions']
+        self.counts = counts
+
+        if end_week is None:
+            # Last complete week, weeks starting on Sunday like the analytics API
+            today = datetime.now()
+            end = today - timedelta(days=(today.weekday() + 1) % 7 + 7)
+        else:
+            end = datetime.strptime(end_week, "%Y-%m-%d")
+        self.weeks = [(end - timedelta(weeks=weeks - 1 - i)).strftime("%Y-%m-%d") for i in range(weeks)]
+
+        self.component_name = NamePool(_read_sample_names(sample_dir, 'usages_by_component.csv', 'component_name'), 'Component')
+        self.set_name = NamePool(_read_sample_names(sample_dir, 'actions_by_component.csv', 'component_set_name'), 'Component set')
+        self.team_name = NamePool(_read_sample_names(sample_dir, 'actions_by_team.csv', 'team_name'), 'Team')
+        self.file_name = NamePool(_read_sample_names(sample_dir, 'usages_by_file.csv', 'file_name'), 'File')
+        self.variable_name = NamePool(_read_sample_names(sample_dir, 'variable_actions_by_variable.csv', 'variable_name'), 'Variable')
+        self.collection_name = NamePool(_read_sample_names(sample_dir, 'variable_actions_by_variable.csv', 'collection_name'), 'Collection')
+        self.style_name = NamePool(_read_sample_names(sample_dir, 'styles_actions_by_style.csv', 'style_name'), 'Style')
+        self.datasets = self._build_datasets()
+
+    def component(self, index: int) -> Dict[str, Any]:
+        set_index = index // self.counts['components_per_set']
+        return {
+            'key': _key('component', index),
+            'node_id': f"{index + 1}:{index % 97}",
+            'name': self.component_name(index),
+            'set_key': _key('set', set_index),
+            'set_node_id': f"set:{set_index}",
+            'set_name': self.set_name(set_index),
+        }
+
+    def _build_datasets(self) -> Dict[str, Dataset]:
+        c = self.counts
+        weeks = self.weeks
+        files = c['files_per_component']
+
+        def component_action(entity: int, week: int) -> Dict[str, Any]:
+            component = self.component(entity)
+            return {
+                'component_key': component['key'], 'component_name': component['name'],
+                'component_set_key': component['set_key'],
+                'component_set_name': component['set_name'], 'week': weeks[week],
+                'insertions': _mix(entity, week, 1) % 40, 'detachments': _mix(entity, week, 2) % 4,
+            }
+
+        def team_action(entity: int, week: int) -> Dict[str, Any]:
+            return {'team_name': self.team_name(entity), 'week': weeks[week],
+                    'insertions': _mix(entity, week, 3) % 300, 'detachments': _mix(entity, week, 4) % 10}
+
+        def component_usage(entity: int, _week: int) -> Dict[str, Any]:
+            component = self.component(entity)
+            return {
+                'component_key': component['key'], 'component_name': component['name'],
+                'component_set_name': component['set_name'],
+                'file_name': self.file_name(_mix(entity, 5) % max(1, c['components'] // 2)),
+                'team_name': self.team_name(_mix(entity, 6) % c['teams']),
+                'instances': _mix(entity, 7) % 500,
+            }
+
+        def file_usage(entity: int, _week: int) -> Dict[str, Any]:
+            component_index, slot = divmod(entity, files)
+            file_index = _mix(component_index, slot, 8) % max(1, c['components'] // 2)
+            return {
+                'component_key': _key('component', component_index), 'file_name': self.file_name(file_index),
+                'team_name': self.team_name(file_index % c['teams']), 'workspace_name': 'Workspace',
+                'instances': _mix(component_index, slot, 9) % 200,
+            }
+
+        def variable_team_action(entity: int, _week: int) -> Dict[str, Any]:
+            team, variable = divmod(entity, c['variables_per_team'])
+            return {'team_name': self.team_name(team), 'variable_name': self.variable_name(variable),
+                    'actions': _mix(team, variable, 10) % 100}
+
+        def variable_action(entity: int, week: int) -> Dict[str, Any]:
+            collection = entity % c['collections']
+            return {
+                'variable_key': _key('variable', entity), 'week': weeks[week],
+                'detachments': _mix(entity, week, 11) % 3, 'insertions': _mix(entity, week, 12) % 150,
+                'variable_name': self.variable_name(entity), 'variable_type': VARIABLE_TYPES[entity % 4],
+                'collection_key': _key('collection', collection), 'collection_name': self.collection_name(collection),
+            }
+
+        def style_action(entity: int, week: int) -> Dict[str, Any]:
+            return {
+                'style_key': _key('style', entity), 'week': weeks[week],
+                'detachments': _mix(entity, week, 13) % 3, 'insertions': _mix(entity, week, 14) % 60,
+                'style_name': self.style_name(entity), 'style_type': STYLE_TYPES[entity % 4],
+            }
+
+        def style_usage(entity: int, _week: int) -> Dict[str, Any]:
+            style = entity % c['styles']
+            return {
+                'style_key': _key('style', style), 'style_name': self.style_name(style),
+                'style_type': STYLE_TYPES[style % 4], 'file_name': self.file_name(entity),
+                'instances': _mix(entity, 15) % 300,
+            }
+
+        return {
+            'component/actions:component': Dataset(c['active_components'], component_action, weeks, self.newest_first),
+            'component/actions:team': Dataset(c['teams'], team_action, weeks, self.newest_first),
+            'component/usages:component': Dataset(c['components'], component_usage),
+            'component/usages:file': Dataset(c['components'] * files, file_usage),
+            'variable/actions:team': Dataset(c['variable_teams'] * c['variables_per_team'], variable_team_action),
+            'variable/actions:variable': Dataset(c['variables'], variable_action, weeks, self.newest_first),
+            'style/actions:style': Dataset(c['styles'], style_action, weeks, self.newest_first),
+            'style/usages:style': Dataset(c['style_usages'], style_usage),
+        }
+
+    def row_counts(self) -> Dict[str, int]:
+        """Rows each endpoint serves for an unfiltered fetch"""
+        return {name: len(dataset.window(None, None)) for name, dataset in self.datasets.items()}
+
+    def version(self, index: int) -> Dict[str, Any]:
+        """Version `index`, 0 being the newest; one every 12 hours back from the end week"""
+        created = datetime.strptime(self.weeks[-1], "%Y-%m-%d") + timedelta(days=6) - timedelta(hours=12 * index)
+        author = _mix(index, 16) % 12
+        return {
+            'id': str(VERSION_ID_BASE + self.counts['versions'] - index),
+            'created_at': created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            'label': f"Release {self.counts['versions'] - index}" if index % 10 == 0 else None,
+            'description': None,
+            'user': {'handle': self.team_name(author), 'img_url': '', 'id': str(1500000000000000000 + author)},
+        }
+
+    @property
+    def version_id(self) -> str:
+        return self.version(0)['id']
+
+    @property
+    def last_modified(self) -> str:
+        return self.version(0)['created_at']
+
+
+class FaultInjector:
+    """Decides per request whether to delay, fail with a 5xx or throttle with a 429"""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 throttle_rate: float = 0.0, retry_after: float = 1.0, rpm: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.rpm = rpm
+        self.stats = {'requests': 0, 'errors': 0, 'throttled': 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = rpm / 6 if rpm else 0.0
+        self._updated = time.monotonic()
+
+    def _over_budget(self) -> bool:
+        """Server-side token bucket: rpm per minute with a ten second burst"""
+        now = time.monotonic()
+        self._tokens = min(self.rpm / 6, self._tokens + (now - self._updated) * self.rpm / 60.0)
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return False
+        return True
+
+    def decide(self) -> tuple:
+        """Return (delay seconds, status to fail with or None)"""
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+            if (self.rpm and self._over_budget()) or roll < self.throttle_rate:
+                self.stats['throttled'] += 1
+                return delay, 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.stats['errors'] += 1
+                return delay, self._random.choice((500, 502, 503))
+            return delay, None
+
+
+class MockFigmaHandler(BaseHTTPRequestHandler):
+    """Routes /v1 requests to the server's SyntheticLibrary"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, payload: Any, status: int = 200, headers: Dict[str, str] = None):
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        if status == 200 and self.server.etags:
+            etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.server.count('not_modified')
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+            headers = {**(headers or {}), 'ETag': etag}
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if len(body) > 1024 and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header('Content-Encoding', 'gzip')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status: int, message: str, headers: Dict[str, str] = None):
+        self._send_json({'status': status, 'error': True, 'message': message}, status, headers)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        params = {name: values[0] for name, values in parse_qs(parsed.query).items()}
+        parts = [part for part in parsed.path.split('/') if part]
+
+        if parts == ['__stats']:
+            return self._send_json(self.server.stats())
+        if not self.headers.get('X-Figma-Token'):
+            return self._error(403, 'Invalid token')
+
+        delay, failure = self.server.faults.decide()
+        if delay:
+            time.sleep(delay)
+        if failure == 429:
+            return self._error(429, 'Rate limit exceeded', {'Retry-After': f"{self.server.faults.retry_after:g}"})
+        if failure:
+            return self._error(failure, 'Injected server error')
+
+        if len(parts) < 3 or parts[0] != 'v1':
+            return self._error(404, 'Not found')
+        if parts[1] == 'files':
+            return self._files(parts[2:], params)
+        if parts[1:3] == ['analytics', 'libraries'] and len(parts) == 6:
+            return self._analytics(parts[3], f"{parts[4]}/{parts[5]}", params)
+        return self._error(404, 'Not found')
+
+    def _files(self, parts: List[str], params: Dict[str, str]):
+        library = self.server.library
+        # Like Figma, a depth-limited file request only lists components in the returned nodes (none here)
+        wants_components = (len(parts) == 1 and 'depth' not in params) or (len(parts) > 1 and parts[1] in ('components', 'component_sets'))
+        components = [library.component(i) for i in range(library.counts['components'])] if wants_components else []
+        if len(parts) == 1:
+            sets = {c['set_node_id']: {'key': c['set_key'], 'name': c['set_name']} for c in components}
+            return self._send_json({
+                'name': 'Synthetic library', 'version': library.version_id, 'lastModified': library.last_modified,
+                'document': {'id': '0:0', 'name': 'Document', 'type': 'DOCUMENT', 'children': []},
+                'components': {c['key']: {'key': c['key'], 'name': c['name'], 'componentSetId': c['set_node_id']}
+                               for c in components},
+                'componentSets': sets,
+            })
+        if parts[1] == 'components':
+            return self._send_json({'status': 200, 'error': False, 'meta': {'components': [
+                {'key': c['key'], 'node_id': c['node_id'], 'name': c['name'],
+                 'containing_frame': {'containingComponentSet': {'nodeId': c['set_node_id'], 'name': c['set_name']}}}
+                for c in components
+            ]}})
+        if parts[1] == 'component_sets':
+            sets = {c['set_node_id']: {'key': c['set_key'], 'node_id': c['set_node_id'], 'name': c['set_name']}
+                    for c in components}
+            return self._send_json({'status': 200, 'error': False, 'meta': {'component_sets': list(sets.values())}})
+        if parts[1] == 'versions':
+            return self._versions(parts[0], params)
+        return self._error(404, 'Not found')
+
+    def _versions(self, file_key: str, params: Dict[str, str]):
+        library = self.server.library
+        page_size = min(int(params.get('page_size', DEFAULT_VERSIONS_PAGE_SIZE)), 50)
+        total = library.counts['versions']
+        # `before` is a version id; ids count down from the newest version
+        start = VERSION_ID_BASE + total - int(params['before']) + 1 if params.get('before') else 0
+        versions = [library.version(i) for i in range(start, min(total, start + page_size))]
+        pagination = {}
+        if start + page_size < total:
+            query = urlencode({'page_size': page_size, 'before': versions[-1]['id']})
+            pagination['next_page'] = f"{self.server.base_url}/v1/files/{file_key}/versions?{query}"
+        return self._send_json({'versions': versions, 'pagination': pagination})
+
+    def _analytics(self, file_key: str, endpoint: str, params: Dict[str, str]):
+        dataset = self.server.library.datasets.get(f"{endpoint}:{params.get('group_by')}")
+        if dataset is None:
+            return self._error(400, f"Unsupported group_by for {endpoint}")
+        window = dataset.window(params.get('start_date'), params.get('end_date'))
+        try:
+            offset = int(params.get('cursor') or 0)
+        except ValueError:
+            return self._error(400, 'Invalid cursor')
+        page = window[offset:offset + self.server.page_size]
+        next_offset = offset + len(page)
+        has_next = next_offset < len(window)
+        return self._send_json({
+            'rows': [dataset.row(index) for index in page],
+            'next_page': has_next,
+            'cursor': str(next_offset) if has_next else None,
+        })
+
+
+class MockFigmaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple, library: SyntheticLibrary, faults: FaultInjector,
+                 page_size: int = DEFAULT_PAGE_SIZE, verbose: bool = False, etags: bool = False):
+        super().__init__(address, MockFigmaHandler)
+        self.library = library
+        self.faults = faults
+        self.page_size = page_size
+        self.verbose = verbose
+        self.etags = etags
+        self.responses = {'not_modified': 0}
+        self._responses_lock = threading.Lock()
+
+    def count(self, outcome: str):
+        with self._responses_lock:
+            self.responses[outcome] += 1
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.faults.stats, **self.responses, 'rows': self.library.row_counts(),
+                'versions': self.library.counts['versions']}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Serve a synthetic Figma library for local runs and benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT}, 0 = any)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='Library size relative to the ZDS_Components sample (1 = ~44k rows, 100 = ~4.4M rows)')
+    parser.add_argument('--weeks', type=int, default=DEFAULT_WEEKS, help=f'Weeks of analytics history (default: {DEFAULT_WEEKS})')
+    parser.add_argument('--end-week', default=None, help='Last week served, YYYY-MM-DD (default: last complete week)')
+    parser.add_argument('--versions', type=int, default=None,
+                        help=f"Versions in the file's history (default: {SAMPLE_PROFILE['versions']})")
+    parser.add_argument('--newest-first', action='store_true',
+                        help='Serve weekly rows newest week first, like the Figma API (default: oldest first)')
+    parser.add_argument('--etags', action='store_true',
+                        help='Send ETags and answer a matching If-None-Match with 304 Not Modified')
+    parser.add_argument('--page-size', type=int, default=DEFAULT_PAGE_SIZE,
+                        help=f'Analytics rows per page (default: {DEFAULT_PAGE_SIZE})')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency of up to this many seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 5xx')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Share of requests answered with a 429')
+    parser.add_argument('--rpm', type=float, default=0.0,
+                        help='Answer 429 when requests exceed this many per minute (default: 0 = no limit)')
+    parser.add_argument('--retry-after', type=float, default=1.0, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for injected latency and faults')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    return parser
+
+
+def create_server(args: argparse.Namespace) -> MockFigmaServer:
+    library = SyntheticLibrary(args.scale, args.weeks, args.end_week, args.versions, newest_first=args.newest_first)
+    faults = FaultInjector(args.latency, args.jitter, args.error_rate, args.throttle_rate, args.retry_after,
+                           args.rpm, args.seed)
+    return MockFigmaServer((args.host, args.port), library, faults, args.page_size, args.verbose, args.etags)
+
+
+def main():
+    args = build_parser().parse_args()
+    server = create_server(args)
+    rows = server.library.row_counts()
+    print(f"🧪 Mock Figma API listening on {server.base_url}/v1", flush=True)
+    print(f"   Synthetic library: scale {args.scale:g}, {len(server.library.weeks)} weeks "
+          f"({server.library.weeks[0]} to {server.library.weeks[-1]}), {sum(rows.values())} analytics rows", flush=True)
+    for name, count in rows.items():
+        print(f"   {name:<28} {count:>10}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"\n🧪 Served {server.faults.stats['requests']} requests "
+              f"({server.faults.stats['errors']} errors, {server.faults.stats['throttled']} throttled)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Pagination checkpoints
+Persists each analytics page and the cursor for the next one as soon as the
+page arrives, so an interrupted fetch resumes where it stopped instead of
+re-downloading every page from the start
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Any, Optional, Iterator
+
+# Default checkpoint location and how long an unfinished fetch stays resumable
+DEFAULT_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'checkpoints')
+DEFAULT_MAX_AGE = 24 * 60 * 60
+
+# Consecutive failed resume attempts before a checkpoint is discarded (e.g. an expired cursor)
+MAX_RESUME_FAILURES = 3
+
+STATE_FILE = 'state.json'
+
+_checkpoints: Optional['CheckpointStore'] = None
+
+
+def _write_atomic(path: str, data: bytes):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class PaginationCheckpoint:
+    """Checkpoint of one paginated fetch: the pages received so far and the next cursor"""
+
+    def __init__(self, directory: str, max_age: float):
+        self.directory = directory
+        self.max_age = max_age
+        self.state: Optional[Dict[str, Any]] = None
+
+    def _page_path(self, page_num: int) -> str:
+        return os.path.join(self.directory, f"page-{page_num:05d}.json.gz")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Return {'cursor', 'pages', 'records', 'failures'} for a resumable fetch, or None"""
+        try:
+            with open(os.path.join(self.directory, STATE_FILE), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - state.get('updated_at', 0) > self.max_age or state.get('failures', 0) >= MAX_RESUME_FAILURES:
+            self.clear()
+            return None
+        self.state = state
+        return state
+
+    def stored_pages(self) -> Iterator[List[Dict[str, Any]]]:
+        """Yield the checkpointed pages in order, one at a time"""
+        for page_num in range(1, self.state['pages'] + 1):
+            with gzip.open(self._page_path(page_num), 'rt', encoding='utf-8') as f:
+                yield json.load(f)
+
+    def save_page(self, page_num: int, records: List[Dict[str, Any]], next_cursor: Optional[str], total_records: int):
+        """Persist a page, then point the state at it; a crash in between leaves the old state valid"""
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomic(self._page_path(page_num), gzip.compress(json.dumps(records).encode('utf-8'), compresslevel=1))
+        self.state = {
+            'cursor': next_cursor,
+            'pages': page_num,
+            'records': total_records,
+            'failures': 0,
+            'updated_at': time.time(),
+        }
+        _write_atomic(os.path.join(self.directory, STATE_FILE), json.dumps(self.state).encode('utf-8'))
+
+    def record_failure(self):
+        """Count a failed attempt to continue from the checkpoint"""
+        if not self.state:
+            return
+        self.state['failures'] = self.state.get('failures', 0) + 1
+        _write_atomic(os.path.join(self.directory, STATE_FILE), json.dumps(self.state).encode('utf-8'))
+
+    def clear(self):
+        """Remove the checkpoint once the fetch has completed"""
+        self.state = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class CheckpointStore:
+    """Directory of pagination checkpoints, one sub-directory per fetch"""
+
+    def __init__(self, directory: str = DEFAULT_CHECKPOINT_DIR, max_age: float = DEFAULT_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+        self._prune()
+
+    def _prune(self):
+        """Drop checkpoints of fetches abandoned longer than max_age ago"""
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                if time.time() - os.path.getmtime(path) > self.max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                pass
+
+    def open(self, url: str, params: Dict[str, Any], token: str) -> PaginationCheckpoint:
+        """Checkpoint for a fetch of `url` with `params`; the token is hashed in so users never share one"""
+        material = json.dumps({
+            "url": url,
+            "params": sorted((str(k), str(v)) for k, v in params.items()),
+            "token": hashlib.sha256(token.encode('utf-8')).hexdigest()
+        })
+        key = hashlib.sha256(material.encode('utf-8')).hexdigest()[:32]
+        return PaginationCheckpoint(os.path.join(self.directory, key), self.max_age)
+
+
+def configure_checkpoints(store: Optional[CheckpointStore]):
+    """Enable (or with None, disable) pagination checkpoints"""
+    global _checkpoints
+    _checkpoints = store
+
+
+def get_checkpoints() -> Optional[CheckpointStore]:
+    return _checkpoints
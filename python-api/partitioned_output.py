@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Partitioned outputs
+Optional copies of the weekly CSVs split into one file per analytics week or
+calendar month, so the dashboard only downloads the partitions overlapping the
+selected date range. partitions/index.json lists every partition with its
+weeks, row count and content hash:
+
+    partitions/index.json
+    partitions/actions_by_component/2026-10.csv   (+ .gz/.br, manifest.json)
+
+Partitions are rebuilt from the final CSVs after every run, but a partition is
+only rewritten when its content hash changed, so an incremental run touches the
+latest partition or two. Partitions that no longer have rows are removed.
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import time
+from typing import Dict, List, Any, Optional
+
+from output_files import atomic_write, remove_artifact
+
+PARTITION_DIR = 'partitions'
+PARTITION_INDEX_FILE = 'index.json'
+PARTITION_SCHEMA_VERSION = 1
+PARTITION_GRANULARITIES = ('week', 'month')
+
+# Weekly CSVs written partitioned; rows whose week isn't a date go to UNDATED_PARTITION
+PARTITIONED_OUTPUTS = [
+    'actions_by_component.csv',
+    'actions_by_team.csv',
+    'variable_actions_by_variable.csv',
+    'styles_actions_by_style.csv',
+]
+UNDATED_PARTITION = 'undated'
+
+_ISO_WEEK = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+def partition_key(week: str, granularity: str) -> str:
+    """Partition holding `week`: the week itself, or the month its Sunday falls in"""
+    if not _ISO_WEEK.match(week or ''):
+        return UNDATED_PARTITION
+    return week[:10] if granularity == 'week' else week[:7]
+
+
+def load_partition_index(output_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(output_dir, PARTITION_DIR, PARTITION_INDEX_FILE), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) and index.get('schema_version') == PARTITION_SCHEMA_VERSION else None
+
+
+def _split_csv(filepath: str, granularity: str) -> tuple:
+    """(header, {key: [rows, first_week, last_week, text buffer, writer]}) in file order"""
+    partitions: Dict[str, list] = {}
+    with open(filepath, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or 'week' not in header:
+            return header, partitions
+        week_column = header.index('week')
+        for row in reader:
+            week = row[week_column] if week_column < len(row) else ''
+            key = partition_key(week, granularity)
+            partition = partitions.get(key)
+            if partition is None:
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(header)
+                partition = partitions[key] = [0, week, week, buffer, writer]
+            partition[0] += 1
+            if week < partition[1]:
+                partition[1] = week
+            if week > partition[2]:
+                partition[2] = week
+            partition[4].writerow(row)
+    return header, partitions
+
+
+def write_output_partitions(output_dir: str, filename: str, granularity: str,
+                            previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Partition one CSV; returns its index entry. Unchanged partitions are left as they are."""
+    stem = filename[:-len('.csv')]
+    folder = os.path.join(output_dir, PARTITION_DIR, stem)
+    os.makedirs(folder, exist_ok=True)
+    header, partitions = _split_csv(os.path.join(output_dir, filename), granularity)
+
+    previous_entries = {entry['key']: entry for entry in (previous or {}).get('partitions', [])}
+    entries = []
+    rewritten = 0
+    for key, (rows, first_week, last_week, buffer, _) in partitions.items():
+        content = buffer.getvalue()
+        data = content.encode('utf-8')
+        sha256 = hashlib.sha256(data).hexdigest()
+        filepath = os.path.join(folder, f"{key}.csv")
+        before = previous_entries.get(key)
+        if not (before and before.get('sha256') == sha256 and os.path.exists(filepath)
+                and os.path.getsize(filepath) == len(data)):
+            with atomic_write(filepath, artifact=True, rows=rows) as f:
+                f.write(content)
+            rewritten += 1
+        entries.append({
+            'key': key,
+            'path': f"{stem}/{key}.csv",
+            'first_week': first_week if key != UNDATED_PARTITION else None,
+            'last_week': last_week if key != UNDATED_PARTITION else None,
+            'rows': rows,
+            'bytes': len(data),
+            'sha256': sha256,
+        })
+
+    removed = 0
+    for name in os.listdir(folder):
+        if name.endswith('.csv') and name[:-len('.csv')] not in partitions:
+            remove_artifact(os.path.join(folder, name))
+            removed += 1
+
+    # Newest first like the CSVs themselves; undated rows last
+    entries.sort(key=lambda entry: (entry['key'] != UNDATED_PARTITION, entry['key']), reverse=True)
+    print(f"🗂️  Partitioned {filename} by {granularity}: {len(entries)} partitions, "
+          f"{rewritten} rewritten, {len(entries) - rewritten} unchanged, {removed} removed")
+    return {'header': header or [], 'rows': sum(entry['rows'] for entry in entries), 'partitions': entries}
+
+
+def write_partitioned_outputs(output_dir: str, granularity: str, filenames: List[str] = None) -> Dict[str, Any]:
+    """Partition the weekly CSVs that exist in `output_dir` and write partitions/index.json.
+
+    Outputs not in `filenames` (e.g. ones that failed this run) keep their previous entry.
+    """
+    os.makedirs(os.path.join(output_dir, PARTITION_DIR), exist_ok=True)
+    previous = load_partition_index(output_dir) or {}
+    if previous.get('granularity') != granularity:
+        previous = {}
+    outputs = dict(previous.get('outputs', {}))
+    for filename in PARTITIONED_OUTPUTS:
+        if filenames is not None and filename not in filenames:
+            continue
+        if not os.path.exists(os.path.join(output_dir, filename)):
+            continue
+        try:
+            outputs[filename] = write_output_partitions(output_dir, filename, granularity, outputs.get(filename))
+        except (OSError, csv.Error) as e:
+            print(f"⚠️  Failed to partition {filename}: {str(e)}")
+            outputs.pop(filename, None)
+
+    # Folders of outputs that are no longer indexed
+    for stem in os.listdir(os.path.join(output_dir, PARTITION_DIR)):
+        folder = os.path.join(output_dir, PARTITION_DIR, stem)
+        if os.path.isdir(folder) and f"{stem}.csv" not in outputs:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    index = {
+        'schema_version': PARTITION_SCHEMA_VERSION,
+        'granularity': granularity,
+        'updated_at': time.time(),
+        'outputs': outputs,
+    }
+    with atomic_write(os.path.join(output_dir, PARTITION_DIR, PARTITION_INDEX_FILE), artifact=True) as f:
+        json.dump(index, f, indent=2)
+    return index
+
+
+def remove_partitioned_outputs(output_dir: str):
+    """Drop partitions written by an earlier run, so the dashboard falls back to the full CSVs"""
+    directory = os.path.join(output_dir, PARTITION_DIR)
+    if os.path.isdir(directory):
+        shutil.rmtree(directory, ignore_errors=True)
+        print(f"🗂️  Removed partitioned outputs (this run was not partitioned)")
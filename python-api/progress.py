@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Progress events
+Structured progress reporting for generation runs. Events go to whichever
+listener is active in the current context, so concurrent jobs in the service
+each receive only their own events; without a listener, emit() is a no-op.
+"""
+
+import contextvars
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Optional
+
+_listener: contextvars.ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = \
+    contextvars.ContextVar('progress_listener', default=None)
+
+
+def emit(event: str, **fields):
+    """Send a progress event such as {'event': 'file', 'name': ..., 'rows': ...} to the active listener"""
+    listener = _listener.get()
+    if listener is not None:
+        listener({'event': event, 'time': round(time.time(), 3), **fields})
+
+
+def has_listener() -> bool:
+    return _listener.get() is not None
+
+
+@contextmanager
+def listening(callback: Callable[[Dict[str, Any]], None]):
+    """Route events emitted in this context (and tasks submitted with submit()) to `callback`"""
+    token = _listener.set(callback)
+    try:
+        yield
+    finally:
+        _listener.reset(token)
+
+
+def submit(executor, fn, *args, **kwargs):
+    """executor.submit that carries the caller's progress listener into the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class LogCapture:
+    """sys.stdout replacement that turns prints made under a listener into 'log' events.
+
+    Output from outside any listener passes through to the wrapped stream.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._partial = threading.local()
+
+    def write(self, text: str) -> int:
+        if not has_listener():
+            return self.stream.write(text)
+        buffered = getattr(self._partial, 'text', '') + text
+        *lines, self._partial.text = buffered.split('\n')
+        for line in lines:
+            if line.strip():
+                emit('log', message=line)
+        return len(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class JsonLinesWriter:
+    """Listener writing every event as one JSON line to `stream`, e.g. a dedicated file descriptor"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Dict[str, Any]):
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + '\n')
+            self.stream.flush()
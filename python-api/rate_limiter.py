@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Rate limiter
+Process-wide token bucket shared by every Figma API request, with an
+additive-increase/multiplicative-decrease rate that backs off when the API
+answers 429 and recovers towards the configured budget as requests succeed
+"""
+
+import threading
+import time
+from typing import Optional
+
+# Requests per minute allowed by default; the limiter lowers this on its own after 429s
+DEFAULT_RPM = 120
+
+# Never throttle below this many requests per minute
+MIN_RPM = 6
+
+# Rate multiplier applied on a 429, and the share of the budget regained per successful request
+DECREASE_FACTOR = 0.5
+RECOVERY_STEP = 0.02
+
+# 429s arriving this close together (seconds) count as one signal, since in-flight
+# requests sent before the first one was seen will all be rejected together
+DECREASE_COOLDOWN = 2.0
+
+
+class RateLimiter:
+    """Token bucket refilled at `rpm` requests per minute, holding at most `burst` tokens.
+
+    acquire() blocks until the caller may send a request. After a 429 the rate
+    is halved, the bucket is emptied and every caller waits out Retry-After;
+    each success then adds back RECOVERY_STEP of the configured budget.
+    """
+
+    def __init__(self, requests_per_minute: float = DEFAULT_RPM, burst: Optional[float] = None,
+                 min_rpm: float = MIN_RPM):
+        self.max_rpm = float(requests_per_minute)
+        self.min_rpm = min(float(min_rpm), self.max_rpm)
+        self.rpm = self.max_rpm
+        # Default burst: ten seconds' worth of requests
+        self.capacity = float(burst) if burst else max(1.0, self.max_rpm / 6)
+        self.requests = 0
+        self.throttled = 0
+        self.waited = 0.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._last_decrease = float('-inf')
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rpm / 60.0)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._blocked_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.requests += 1
+                    self.waited += waited
+                    return waited
+                delay = max(self._blocked_until - now, (1 - self._tokens) * 60.0 / self.rpm)
+            time.sleep(delay)
+            waited += delay
+
+    def on_success(self):
+        """Creep back towards the configured budget after a request that wasn't throttled"""
+        with self._lock:
+            if self.rpm < self.max_rpm:
+                self.rpm = min(self.max_rpm, self.rpm + self.max_rpm * RECOVERY_STEP)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None):
+        """Back off after a 429: slow down and pause every caller for `retry_after` seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self._refill(now)
+            self._tokens = 0.0
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+            if now - self._last_decrease >= DECREASE_COOLDOWN:
+                self.rpm = max(self.min_rpm, self.rpm * DECREASE_FACTOR)
+                self._last_decrease = now
+
+    def summary(self) -> str:
+        return (f"{self.requests} requests, {self.throttled} throttled (429), "
+                f"{self.waited:.1f}s waited, now {self.rpm:.0f}/{self.max_rpm:.0f} rpm")
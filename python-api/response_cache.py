@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+On-disk HTTP response cache
+Stores successful Figma API responses keyed by URL and query parameters, with a
+TTL, ETag/Last-Modified revalidation and size-bounded LRU eviction
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Optional
+
+# Default cache location, TTL and size budget
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'responses')
+DEFAULT_TTL = 15 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_FILE_SUFFIX = '.json.gz'
+
+
+class CachedResponse:
+    """Minimal stand-in for requests.Response built from a cache entry"""
+
+    def __init__(self, entry: Dict[str, Any]):
+        self.status_code = entry["status"]
+        self.text = entry["body"]
+        self.content = self.text.encode('utf-8')
+        self.headers = {k: v for k, v in (("ETag", entry.get("etag")), ("Last-Modified", entry.get("last_modified"))) if v}
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+
+class ResponseCache:
+    """Persistent cache of successful GET responses.
+
+    Entries younger than `ttl` seconds are served without a request. Older
+    entries are revalidated with If-None-Match/If-Modified-Since when the API
+    sent validators, and dropped otherwise. The directory is kept under
+    `max_bytes` by evicting the least recently used entries.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._total_bytes = sum(size for _, size, _ in self._entries())
+
+    def key(self, url: str, params: Dict[str, Any] = None, token: str = '') -> str:
+        """Cache key for a request; the token is hashed in so users never share entries"""
+        material = json.dumps({
+            "url": url,
+            "params": sorted((str(k), str(v)) for k, v in (params or {}).items()),
+            "token": hashlib.sha256(token.encode('utf-8')).hexdigest()
+        })
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_FILE_SUFFIX)
+
+    def _entries(self):
+        """Yield (path, size, last_used) for every cache file"""
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(CACHE_FILE_SUFFIX):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for `key` (fresh or stale), or None"""
+        path = self._path(key)
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError, EOFError):
+            return None
+        # Touch the file so eviction sees it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def record(self, outcome: str):
+        """Count a lookup outcome: 'hits', 'revalidated' or 'misses'"""
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        return time.time() - entry.get("stored_at", 0) < self.ttl
+
+    def put(self, key: str, url: str, response) -> Dict[str, Any]:
+        """Store a successful response and return its entry"""
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "stored_at": time.time(),
+            "body": response.text
+        }
+        self._write(key, entry)
+        return entry
+
+    def touch(self, key: str, entry: Dict[str, Any]):
+        """Mark a revalidated entry as fresh again"""
+        entry["stored_at"] = time.time()
+        self._write(key, entry)
+
+    def _write(self, key: str, entry: Dict[str, Any]):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f)
+        size = os.path.getsize(tmp_path)
+        with self._lock:
+            try:
+                self._total_bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            self._total_bytes += size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used entries until the cache fits its budget (lock held)"""
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        self._total_bytes = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._total_bytes -= size
+            except OSError:
+                pass
+
+    def summary(self) -> str:
+        return f"{self.hits} hits, {self.revalidated} revalidated, {self.misses} misses"
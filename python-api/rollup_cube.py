@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Rollup cubes
+Cumulative (prefix) sums of insertions and detachments per component and per
+team over the week axis, with optional monthly and quarterly rollups, written
+next to the weekly CSVs. The total for any range of weeks is
+cumulative[end] - cumulative[start], so a range total per entity takes constant
+time after a binary search for the bounds, and a range top-N is one subtraction
+per entity instead of a scan over every row.
+
+Each level's cumulative sums are a row-major matrix (entities x (periods + 1))
+stored as base64 little-endian int32, or float64 when a sum doesn't fit, in the
+cube's JSON file:
+
+    {"entities": [[name, ...], ...], "metrics": ["insertions", "detachments"],
+     "dtype": "int32", "levels": {"week": {"keys": ["2025-01-05", ...],
+     "cumulative": {"insertions": "<base64>", ...}}, "month": ..., "quarter": ...}}
+"""
+
+import base64
+import csv
+import json
+import os
+import re
+import sys
+import time
+from array import array
+from typing import Dict, List, Any
+
+from compact_records import StringPool
+from output_files import atomic_write, remove_artifact
+
+CUBE_SCHEMA_VERSION = 1
+CUBE_METRICS = ['insertions', 'detachments']
+ROLLUP_LEVELS = ('week', 'month', 'quarter')
+
+# Weekly CSV -> (cube file, columns identifying an entity)
+CUBE_SOURCES = {
+    'actions_by_component.csv': ('actions_by_component_cube.json', ['component_name', 'component_set_name']),
+    'actions_by_team.csv': ('actions_by_team_cube.json', ['team_name']),
+}
+
+_ISO_WEEK = re.compile(r'\d{4}-\d{2}-\d{2}')
+_INT32_MAX = 2 ** 31 - 1
+
+
+def parse_rollup_levels(value: str) -> List[str]:
+    """argparse type for --rollup-cube: comma-separated levels, e.g. 'week,month,quarter'"""
+    levels = [level.strip().lower() for level in value.split(',') if level.strip()]
+    unknown = [level for level in levels if level not in ROLLUP_LEVELS]
+    if not levels or unknown:
+        raise ValueError(f"expected a comma-separated list of {', '.join(ROLLUP_LEVELS)}, got '{value}'")
+    return [level for level in ROLLUP_LEVELS if level in levels]
+
+
+def period_key(week: str, level: str) -> str:
+    """Key of the period a week (by its Sunday) belongs to at `level`"""
+    if level == 'week':
+        return week
+    if level == 'month':
+        return week[:7]
+    return f"{week[:4]}-Q{(int(week[5:7]) - 1) // 3 + 1}"
+
+
+def _to_int(value: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _encode(values: array, dtype: str) -> str:
+    data = array('i' if dtype == 'int32' else 'd', values)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    return base64.b64encode(data.tobytes()).decode('ascii')
+
+
+def build_rollup_cube(csv_path: str, entity_columns: List[str], levels: List[str] = ROLLUP_LEVELS) -> Dict[str, Any]:
+    """Read a weekly CSV once and build the cumulative sums for every level"""
+    entities = StringPool()
+    weeks = StringPool()
+    entity_ids, week_ids = array('i'), array('i')
+    values = {metric: array('q') for metric in CUBE_METRICS}
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            week = row.get('week') or ''
+            if not _ISO_WEEK.fullmatch(week):
+                continue
+            entity_ids.append(entities.id(tuple(row.get(column) or '' for column in entity_columns)))
+            week_ids.append(weeks.id(week))
+            for metric in CUBE_METRICS:
+                values[metric].append(_to_int(row.get(metric)))
+
+    # Week axis in date order; pooled ids are in file order (newest first)
+    week_keys = sorted(weeks.values)
+    position = array('i', bytes(4 * len(week_keys)))
+    for index, week in enumerate(week_keys):
+        position[weeks.ids[week]] = index
+
+    entity_count, stride = len(entities), len(week_keys) + 1
+    cube_levels = {}
+    largest = 0
+    weekly = {}
+    for metric in CUBE_METRICS:
+        # Per-week sums, shifted by one so a running sum turns them into prefix sums in place
+        cumulative = array('q', bytes(8 * entity_count * stride))
+        for entity, week, value in zip(entity_ids, week_ids, values[metric]):
+            cumulative[entity * stride + position[week] + 1] += value
+        for entity in range(entity_count):
+            row = entity * stride
+            for offset in range(row + 1, row + stride):
+                cumulative[offset] += cumulative[offset - 1]
+            largest = max(largest, abs(cumulative[row + stride - 1]))
+        weekly[metric] = cumulative
+
+    for level in levels:
+        if level == 'week':
+            keys, boundaries = week_keys, list(range(stride))
+        else:
+            # A period's cumulative sum is the weekly one sampled after its last week
+            keys, boundaries = [], [0]
+            for index, week in enumerate(week_keys):
+                key = period_key(week, level)
+                if keys and keys[-1] == key:
+                    boundaries[-1] = index + 1
+                else:
+                    keys.append(key)
+                    boundaries.append(index + 1)
+        cube_levels[level] = {'keys': keys, 'boundaries': boundaries}
+
+    dtype = 'int32' if largest <= _INT32_MAX else 'float64'
+    for level, data in cube_levels.items():
+        boundaries = data.pop('boundaries')
+        data['cumulative'] = {}
+        for metric, cumulative in weekly.items():
+            sampled = array('q', (cumulative[entity * stride + boundary]
+                                  for entity in range(entity_count) for boundary in boundaries))
+            data['cumulative'][metric] = _encode(sampled, dtype)
+
+    return {
+        'schema_version': CUBE_SCHEMA_VERSION,
+        'source': os.path.basename(csv_path),
+        'entity_columns': entity_columns,
+        'entities': [list(entity) for entity in entities.values],
+        'metrics': CUBE_METRICS,
+        'dtype': dtype,
+        'byte_order': 'little',
+        'levels': cube_levels,
+        'built_at': time.time(),
+    }
+
+
+def write_rollup_cubes(output_dir: str, levels: List[str], filenames: List[str] = None):
+    """Build the cube of every weekly CSV in `output_dir` that has one (optionally only `filenames`)"""
+    for source, (cube_file, entity_columns) in CUBE_SOURCES.items():
+        csv_path = os.path.join(output_dir, source)
+        if (filenames is not None and source not in filenames) or not os.path.exists(csv_path):
+            continue
+        try:
+            cube = build_rollup_cube(csv_path, entity_columns, levels)
+            with atomic_write(os.path.join(output_dir, cube_file), artifact=True) as f:
+                json.dump(cube, f, ensure_ascii=False, separators=(',', ':'))
+        except (OSError, csv.Error) as e:
+            print(f"⚠️  Failed to build {cube_file}: {str(e)}")
+            continue
+        week_count = len(cube['levels']['week']['keys']) if 'week' in cube['levels'] else 0
+        print(f"🧮 Generated: {cube_file} ({len(cube['entities'])} entities, {week_count or 'no'} weekly columns, "
+              f"levels: {', '.join(levels)}, {cube['dtype']})")
+
+
+def remove_rollup_cubes(output_dir: str):
+    """Drop cubes written by an earlier run, so they never describe older CSVs"""
+    for cube_file, _ in CUBE_SOURCES.values():
+        filepath = os.path.join(output_dir, cube_file)
+        if os.path.exists(filepath):
+            remove_artifact(filepath)
+            print(f"🧮 Removed {cube_file} (this run built no rollup cubes)")
+
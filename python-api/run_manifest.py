@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Run manifest
+Records what the last successful run produced and which inputs it saw: the
+newest version id, the analytics week and when it finished. Before fetching
+anything, check_freshness compares the manifest with a one-version request; if
+no version was saved since, the analytics week hasn't rolled over and the last
+run is recent enough, the outputs on disk are already up to date.
+"""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+
+from figma_client import FIGMA_API_BASE, FigmaAPIError, figma_get
+from output_files import atomic_write
+from version_history import ACTIVITY_INDEX_FILE, load_activity_index
+
+RUN_MANIFEST_FILE = '.run_manifest.json'
+MANIFEST_SCHEMA_VERSION = 1
+
+# How long a successful run counts as fresh when nothing else changed
+DEFAULT_FRESH_FOR = 6 * 60 * 60
+
+
+def current_analytics_week(today: datetime = None) -> str:
+    """Start date (Sunday) of the analytics week containing `today`"""
+    today = (today or datetime.now()).date()
+    return (today - timedelta(days=(today.weekday() + 1) % 7)).strftime("%Y-%m-%d")
+
+
+def fetch_latest_version_id(token: str, file_key: str) -> Optional[str]:
+    """Id of the newest saved version from a one-item versions page, or None if unavailable"""
+    try:
+        response = figma_get(f"{FIGMA_API_BASE}/files/{file_key}/versions", token, params={'page_size': 1})
+        if response.status_code != 200:
+            return None
+        versions = response.json().get('versions') or []
+    except (FigmaAPIError, ValueError) as e:
+        print(f"⚠️  Could not check the latest version: {str(e)}")
+        return None
+    return str(versions[0].get('id', '')) if versions else ''
+
+
+def load_run_manifest(output_dir: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(os.path.join(output_dir, RUN_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if isinstance(manifest, dict) and manifest.get('schema_version') == MANIFEST_SCHEMA_VERSION else None
+
+
+def write_run_manifest(output_dir: str, file_key: str, summary: Dict[str, Any], options: Dict[str, Any]):
+    """Record a successful run; the newest version id comes from the activity index it just wrote"""
+    index = load_activity_index(os.path.join(output_dir, ACTIVITY_INDEX_FILE)) or {}
+    latest = index.get('latest') or [{}]
+    manifest = {
+        'schema_version': MANIFEST_SCHEMA_VERSION,
+        'file_key': file_key,
+        'options': options,
+        'finished_at': time.time(),
+        'analytics_week': current_analytics_week(),
+        'latest_version_id': latest[0].get('id'),
+        'files': summary['files'],
+        'files_with_data': summary['files_with_data'],
+        'total_rows': summary['total_rows'],
+    }
+    with atomic_write(os.path.join(output_dir, RUN_MANIFEST_FILE)) as f:
+        json.dump(manifest, f, indent=2)
+
+
+def remove_run_manifest(output_dir: str):
+    """Forget the last successful run, so the next request refreshes instead of trusting it"""
+    filepath = os.path.join(output_dir, RUN_MANIFEST_FILE)
+    if os.path.exists(filepath):
+        os.remove(filepath)
+
+
+def check_freshness(output_dir: str, token: str, file_key: str, options: Dict[str, Any],
+                    fresh_for: float = DEFAULT_FRESH_FOR) -> tuple:
+    """Return (fresh, reason, manifest). The version request is only made once the local checks pass."""
+    manifest = load_run_manifest(output_dir)
+    if manifest is None:
+        return False, 'no previous successful run', None
+    if manifest.get('file_key') != file_key:
+        return False, 'last run was for another file', manifest
+    if manifest.get('options') != options:
+        return False, 'output options changed', manifest
+    age = time.time() - manifest.get('finished_at', 0)
+    if age > fresh_for:
+        return False, f'last run finished {age / 3600:.1f}h ago', manifest
+    if manifest.get('analytics_week') != current_analytics_week():
+        return False, 'a new analytics week started', manifest
+    missing = [name for name in manifest.get('files', []) if not os.path.exists(os.path.join(output_dir, name))]
+    if missing:
+        return False, f"{len(missing)} output(s) missing", manifest
+    latest_version_id = fetch_latest_version_id(token, file_key)
+    if latest_version_id is None:
+        return False, 'could not check the latest version', manifest
+    if latest_version_id != manifest.get('latest_version_id'):
+        return False, 'a new version was saved', manifest
+    return True, f'no new version and same analytics week, last run {age / 60:.0f} min ago', manifest
+
+
+def manifest_options(columnar: Optional[str], store: bool, partition: Optional[str] = None,
+                     rollup_cube: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run options that change which outputs are written; a change forces a refresh"""
+    return {'columnar': columnar or None, 'store': bool(store), 'partition': partition or None,
+            'rollup_cube': list(rollup_cube) if rollup_cube else None}
+
+
+def fresh_run_result(output_dir: str, token: str, file_key: str, options: Dict[str, Any],
+                     fresh_for: float = DEFAULT_FRESH_FOR) -> Optional[Dict[str, Any]]:
+    """The last run's summary marked 'fresh' if its outputs are still current, else None"""
+    started = time.perf_counter()
+    fresh, reason, manifest = check_freshness(output_dir, token, file_key, options, fresh_for)
+    if not fresh:
+        print(f"🔄 Refreshing: {reason}")
+        return None
+    print(f"✨ Outputs are up to date: {reason} (checked in {time.perf_counter() - started:.2f}s, use --force to refresh anyway)")
+    return {
+        'status': 'fresh',
+        'reason': reason,
+        'last_run_at': manifest['finished_at'],
+        'latest_version_id': manifest.get('latest_version_id'),
+        'files': manifest.get('files', []),
+        'files_with_data': manifest.get('files_with_data', 0),
+        'total_rows': manifest.get('total_rows', 0),
+        'failed': [],
+    }
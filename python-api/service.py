@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Generation service
+Long-lived local HTTP service that runs main.py generation jobs in-process, so
+repeated refreshes skip interpreter startup and reuse warm connection pools,
+the response cache and loaded component metadata.
+
+    POST /jobs                 Queue a job (same options as main.py, as JSON)
+    GET  /jobs                 List jobs
+    GET  /jobs/<id>            Job status and result
+    GET  /jobs/<id>/events     JSON-lines progress stream, replayed from the start
+    GET  /health               Queue status
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional
+from urllib.parse import urlparse, parse_qs
+
+import metrics
+import progress
+from figma_client import get_response_cache, get_rate_limiter, get_session
+from run_manifest import fresh_run_result, manifest_options
+from component_index import ComponentIndex
+from columnar_output import require_pyarrow
+from main import (build_parser, client_options_parser, configure_client, generate_csv_files, load_component_index,
+                  finish_run_metrics)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8787
+
+# Jobs generating at the same time; each job also fetches its endpoints concurrently
+DEFAULT_MAX_JOBS = 2
+
+# Seconds loaded component metadata is reused across jobs for the same file
+DEFAULT_METADATA_TTL = 10 * 60
+
+# Finished jobs kept for status queries
+FINISHED_JOBS_KEPT = 50
+
+# Job body fields mapped to main.py flags; booleans become bare switches
+JOB_OPTIONS = {
+    'token': '--token',
+    'file_key': '--file-key',
+    'output_dir': '--output-dir',
+    'library_name': '--library-name',
+    'workers': '--workers',
+    'metadata_source': '--metadata-source',
+    'columnar': '--columnar',
+    'partition': '--partition',
+    'rollup_cube': '--rollup-cube',
+    'incremental': '--incremental',
+    'store': '--store',
+    'force': '--force',
+}
+
+
+class JobOptionsError(ValueError):
+    """Raised when a job body doesn't describe a valid main.py run"""
+
+
+def parse_job_options(body: Dict[str, Any]) -> argparse.Namespace:
+    """Validate a job body with main.py's own argument parser"""
+    argv = []
+    for field, flag in JOB_OPTIONS.items():
+        value = body.get(field)
+        if value is None or value is False or value == '':
+            continue
+        if isinstance(value, list):
+            value = ','.join(str(item) for item in value)
+        argv.extend([flag] if value is True else [flag, str(value)])
+
+    parser = build_parser()
+
+    def reject(message: str):
+        raise JobOptionsError(f"Invalid job options: {message}")
+
+    # Report bad options to the client instead of printing usage and exiting
+    parser.error = reject
+    args = parser.parse_args(argv)
+    args.output_dir = os.path.abspath(args.output_dir)
+    return args
+
+
+def token_hash(token: str) -> str:
+    """Stand-in for the token in cache and dedup keys, so tokens never share results or sit in memory twice"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class MetadataCache:
+    """Component indexes per (token, file key, metadata source), reused for `ttl` seconds without a version check"""
+
+    def __init__(self, ttl: float = DEFAULT_METADATA_TTL):
+        self.ttl = ttl
+        self._entries: Dict[tuple, tuple] = {}
+        self._lock = threading.Lock()
+
+    def load(self, token: str, file_key: str, source: str) -> ComponentIndex:
+        # Another token may not be allowed to read this file, so it never gets this token's metadata
+        key = (token_hash(token), file_key, source)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.time() - entry[0] < self.ttl:
+            print(f"🧠 Using component metadata loaded {int(time.time() - entry[0])}s ago for file: {file_key}")
+            return entry[1]
+        data = load_component_index(token, file_key, source)
+        with self._lock:
+            self._entries[key] = (time.time(), data)
+        return data
+
+
+class Job:
+    """One generation run and the progress events it has produced so far"""
+
+    def __init__(self, args: argparse.Namespace, dedup_key: tuple):
+        self.id = uuid.uuid4().hex[:12]
+        self.args = args
+        self.dedup_key = dedup_key
+        self.status = 'queued'
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.events: List[Dict[str, Any]] = []
+        self.done = False
+        self._changed = threading.Condition()
+
+    def add_event(self, event: Dict[str, Any]):
+        with self._changed:
+            self.events.append(event)
+            # The stream ends once the final 'done' event has been recorded
+            if event['event'] == 'done':
+                self.done = True
+            self._changed.notify_all()
+
+    def wait_for_events(self, start: int, timeout: float = 15.0) -> List[Dict[str, Any]]:
+        """Events from index `start`, blocking until there are some or the job is done"""
+        with self._changed:
+            if len(self.events) <= start and not self.done:
+                self._changed.wait(timeout)
+            return self.events[start:]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Public view of the job; never includes the token"""
+        return {
+            'id': self.id,
+            'status': self.status,
+            'file_key': self.args.file_key,
+            'output_dir': self.args.output_dir,
+            'library_name': self.args.library_name,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'events': len(self.events),
+            'result': self.result,
+            'error': self.error,
+        }
+
+
+class JobQueue:
+    """Runs at most `max_jobs` jobs at once and merges identical in-flight submissions.
+
+    Jobs writing to the same output directory never run at the same time.
+    """
+
+    def __init__(self, max_jobs: int = DEFAULT_MAX_JOBS, metadata_cache: MetadataCache = None):
+        self.max_jobs = max_jobs
+        self.metadata_cache = metadata_cache or MetadataCache()
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix='job')
+        self._jobs: Dict[str, Job] = {}
+        self._in_flight: Dict[tuple, Job] = {}
+        self._dir_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, args: argparse.Namespace) -> tuple:
+        """Queue a job, or return the identical one already queued or running. Returns (job, deduplicated)."""
+        dedup_key = (token_hash(args.token), args.file_key, args.output_dir, args.metadata_source, args.incremental, args.columnar, args.store,
+                     args.partition, tuple(args.rollup_cube or ()), args.force)
+        with self._lock:
+            existing = self._in_flight.get(dedup_key)
+            if existing is not None:
+                return existing, True
+            job = Job(args, dedup_key)
+            self._jobs[job.id] = job
+            self._in_flight[dedup_key] = job
+            self._dir_locks.setdefault(args.output_dir, threading.Lock())
+            self._prune()
+        job.add_event({'event': 'queued', 'time': round(job.created_at, 3), 'job': job.id})
+        self._executor.submit(self._run, job)
+        return job, False
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def counts(self) -> Dict[str, int]:
+        counts = {'queued': 0, 'running': 0, 'succeeded': 0, 'failed': 0}
+        for job in self.list():
+            counts[job.status] += 1
+        return counts
+
+    def _prune(self):
+        """Forget the oldest finished jobs beyond FINISHED_JOBS_KEPT (lock held)"""
+        finished = [job for job in self._jobs.values() if job.done]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - FINISHED_JOBS_KEPT)]:
+            del self._jobs[job.id]
+
+    def _run(self, job: Job):
+        args = job.args
+        run_metrics = metrics.RunMetrics({'library': args.library_name or args.file_key})
+        with self._dir_locks[args.output_dir], progress.listening(job.add_event), metrics.collecting(run_metrics):
+            job.status = 'running'
+            job.started_at = time.time()
+            progress.emit('started', job=job.id, file_key=args.file_key)
+            try:
+                if args.columnar:
+                    require_pyarrow()
+                fresh = None if args.force else fresh_run_result(
+                    args.output_dir, args.token, args.file_key,
+                    manifest_options(args.columnar, args.store, args.partition, args.rollup_cube), args.fresh_for)
+                if fresh is not None:
+                    progress.emit('fresh', **fresh)
+                    job.result = fresh
+                else:
+                    data = self.metadata_cache.load(args.token, args.file_key, args.metadata_source)
+                    job.result = generate_csv_files(data, args.output_dir, args.token, args.file_key,
+                                                    workers=args.workers, incremental=args.incremental,
+                                                    columnar=args.columnar, use_store=args.store,
+                                                    partition=args.partition, rollup_cube=args.rollup_cube)
+                job.status = 'succeeded'
+            except Exception as e:
+                print(f"❌ Error: {str(e)}")
+                print(f"   Traceback: {traceback.format_exc()}")
+                job.error = str(e)
+                job.status = 'failed'
+            finally:
+                job.finished_at = time.time()
+                with self._lock:
+                    self._in_flight.pop(job.dedup_key, None)
+            finish_run_metrics(run_metrics, job.status == 'succeeded' and not job.result['failed'])
+            progress.emit('done', job=job.id, status=job.status, result=job.result, error=job.error,
+                          seconds=round(job.finished_at - job.started_at, 3))
+        print(f"{'✅' if job.status == 'succeeded' else '❌'} Job {job.id} {job.status} "
+              f"({args.file_key}, {job.finished_at - job.started_at:.1f}s)")
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """JSON API over the job queue; events are streamed as JSON lines until the job finishes"""
+
+    queue: JobQueue = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+
+        if parts == ['health']:
+            return self._send_json(200, {'status': 'ok', 'max_jobs': self.queue.max_jobs, 'jobs': self.queue.counts()})
+        if parts == ['jobs']:
+            return self._send_json(200, [job.snapshot() for job in self.queue.list()])
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self.queue.get(parts[1])
+            if job is None:
+                return self._send_json(404, {'error': f"Unknown job: {parts[1]}"})
+            if len(parts) == 2:
+                return self._send_json(200, job.snapshot())
+            if parts[2] == 'events':
+                try:
+                    start = int(parse_qs(url.query).get('from', ['0'])[0])
+                except ValueError:
+                    return self._send_json(400, {'error': "'from' must be an event index"})
+                return self._stream_events(job, start)
+        self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        if urlparse(self.path).path.rstrip('/') != '/jobs':
+            return self._send_json(404, {'error': 'Not found'})
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+            body = json.loads(self.rfile.read(length) or b'{}')
+            args = parse_job_options(body)
+        except (ValueError, JobOptionsError) as e:
+            return self._send_json(400, {'error': str(e)})
+        job, deduplicated = self.queue.submit(args)
+        if deduplicated:
+            print(f"🔁 Joined in-flight job {job.id} for file: {args.file_key}")
+        else:
+            print(f"📥 Queued job {job.id} for file: {args.file_key}")
+        self._send_json(202, {**job.snapshot(), 'deduplicated': deduplicated})
+
+    def _stream_events(self, job: Job, start: int):
+        # No Content-Length: the stream ends when the connection closes after 'done'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        position = max(0, start)
+        try:
+            while True:
+                events = job.wait_for_events(position)
+                for event in events:
+                    self.wfile.write((json.dumps(event) + '\n').encode('utf-8'))
+                self.wfile.flush()
+                position += len(events)
+                if job.done and position >= len(job.events):
+                    break
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve CSV generation jobs over a local HTTP API',
+                                     parents=[client_options_parser()])
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Interface to bind (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--max-jobs', type=int, default=DEFAULT_MAX_JOBS,
+                        help=f'Jobs generating at the same time; further jobs wait in the queue (default: {DEFAULT_MAX_JOBS})')
+    parser.add_argument('--metadata-ttl', type=float, default=DEFAULT_METADATA_TTL,
+                        help=f'Seconds component metadata is reused across jobs for the same file (default: {DEFAULT_METADATA_TTL})')
+    args = parser.parse_args()
+
+    configure_client(args)
+    # Create the pooled session up front so the first job doesn't pay for it
+    get_session()
+    sys.stdout = progress.LogCapture(sys.stdout)
+
+    ServiceHandler.queue = JobQueue(max(1, args.max_jobs), MetadataCache(args.metadata_ttl))
+    server = ThreadingHTTPServer((args.host, args.port), ServiceHandler)
+    server.daemon_threads = True
+    print(f"🚀 Generation service listening on http://{args.host}:{args.port} ({args.max_jobs} concurrent jobs)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        cache = get_response_cache()
+        if cache:
+            print(f"🗄️  Response cache: {cache.summary()}")
+        limiter = get_rate_limiter()
+        if limiter:
+            print(f"🚦 Rate limiter: {limiter.summary()}")
+
+
+if __name__ == "__main__":
+    main()
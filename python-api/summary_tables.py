@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Summary tables
+Pre-aggregated rollups written next to the raw CSVs so the dashboard can render
+them directly instead of re-aggregating in the browser
+"""
+
+import csv
+import os
+from collections import defaultdict
+from typing import Callable, Iterable, List
+
+from compact_records import ComponentUsageStats, StringPool
+from output_files import atomic_write
+
+COMPONENT_USAGE_SUMMARY_FILE = 'usages_by_component_summary.csv'
+TEAM_WEEKLY_TOTALS_FILE = 'team_weekly_totals.csv'
+LIBRARY_WEEKLY_TOTALS_FILE = 'library_weekly_totals.csv'
+
+TEAM_ACTIONS_FILE = 'actions_by_team.csv'
+COMPONENT_ACTIONS_FILE = 'actions_by_component.csv'
+
+# Columns of the actions CSVs the weekly totals are built from, in CSV order
+ACTIONS_COLUMNS = {
+    TEAM_ACTIONS_FILE: ['team_name', 'week', 'insertions', 'detachments'],
+    COMPONENT_ACTIONS_FILE: ['component_name', 'component_set_name', 'week', 'insertions', 'detachments'],
+}
+
+SUMMARY_FILES = [
+    COMPONENT_USAGE_SUMMARY_FILE,
+    TEAM_WEEKLY_TOTALS_FILE,
+    LIBRARY_WEEKLY_TOTALS_FILE,
+]
+
+
+def _cell(value) -> str:
+    """A value as csv.writer writes it, so fed rows and rows read back from a CSV group alike"""
+    return '' if value is None else str(value)
+
+
+def _to_int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def write_component_usage_summary(output_dir: str, component_stats: ComponentUsageStats) -> int:
+    """Write one row per component with its instance, file and team totals.
+
+    `component_stats` is the ComponentUsageStats accumulated by
+    generate_usages_by_component_csv. Rows are sorted by instances, descending.
+    """
+    filepath = os.path.join(output_dir, COMPONENT_USAGE_SUMMARY_FILE)
+    rows = sorted(component_stats.summary_rows(), key=lambda row: (-row[2], row[0]))
+
+    with atomic_write(filepath, artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['component_name', 'component_set_name', 'num_instances', 'num_files_using', 'num_teams_using'])
+        writer.writerows(rows)
+
+    print(f"✅ Generated: {COMPONENT_USAGE_SUMMARY_FILE} ({len(rows)} rows)")
+    return len(rows)
+
+
+class WeeklyTotals:
+    """Per-team and per-library weekly totals, fed the actions CSV rows as they are written.
+
+    on_rows(filename) returns the callable each writer of actions_by_team.csv or
+    actions_by_component.csv passes its row batches to; the two files fill separate
+    totals, so their generators can run in parallel.
+    """
+
+    def __init__(self):
+        self.reset(TEAM_ACTIONS_FILE)
+        self.reset(COMPONENT_ACTIONS_FILE)
+
+    def reset(self, filename: str):
+        """Forget what was fed for `filename`, e.g. before reading it back after a failed write"""
+        # Active teams and components per week are kept as pooled ids, not per-week copies of every name
+        fed = {'totals': defaultdict(lambda: [0, 0]), 'names': StringPool(), 'active': defaultdict(set)}
+        if filename == TEAM_ACTIONS_FILE:
+            self._team = fed
+        else:
+            self._component = fed
+
+    def on_rows(self, filename: str) -> Callable[[Iterable[list]], None]:
+        return self.add_team_rows if filename == TEAM_ACTIONS_FILE else self.add_component_rows
+
+    def add_team_rows(self, rows: Iterable[list]):
+        """Rows of actions_by_team.csv: team_name, week, insertions, detachments"""
+        totals, names, active = self._team['totals'], self._team['names'], self._team['active']
+        for team, week, insertions, detachments in rows:
+            team, week = _cell(team), _cell(week)
+            insertions, detachments = _to_int(insertions), _to_int(detachments)
+            week_totals = totals[(team, week)]
+            week_totals[0] += insertions
+            week_totals[1] += detachments
+            if insertions or detachments:
+                active[week].add(names.id(team))
+
+    def add_component_rows(self, rows: Iterable[list]):
+        """Rows of actions_by_component.csv: component_name, component_set_name, week, insertions, detachments"""
+        totals, names, active = self._component['totals'], self._component['names'], self._component['active']
+        for name, component_set, week, insertions, detachments in rows:
+            week = _cell(week)
+            insertions, detachments = _to_int(insertions), _to_int(detachments)
+            week_totals = totals[week]
+            week_totals[0] += insertions
+            week_totals[1] += detachments
+            if insertions or detachments:
+                active[week].add(names.id((_cell(name), _cell(component_set))))
+
+    def add_csv(self, filepath: str):
+        """Feed an actions CSV already on disk, replacing whatever was fed for it before"""
+        filename = os.path.basename(filepath)
+        self.reset(filename)
+        if not os.path.exists(filepath):
+            return
+        columns = ACTIONS_COLUMNS[filename]
+        with open(filepath, 'r', newline='', encoding='utf-8') as f:
+            self.on_rows(filename)([row.get(column) for column in columns] for row in csv.DictReader(f))
+
+    def team_rows(self) -> List[list]:
+        """[team_name, week, insertions, detachments], newest week first"""
+        return [
+            [team, week, totals[0], totals[1]]
+            for (team, week), totals in sorted(sorted(self._team['totals'].items()), key=lambda item: item[0][1], reverse=True)
+        ]
+
+    def library_rows(self) -> List[list]:
+        """[week, insertions, detachments, active_components, active_teams], newest week first"""
+        component_totals, component_active = self._component['totals'], self._component['active']
+        team_active = self._team['active']
+        # Every week with component rows, plus weeks where only the team rows show activity
+        weeks = set(component_totals) | set(team_active)
+        rows = []
+        for week in sorted(weeks, reverse=True):
+            totals = component_totals.get(week, [0, 0])
+            rows.append([week, totals[0], totals[1], len(component_active.get(week, ())), len(team_active.get(week, ()))])
+        return rows
+
+
+def write_weekly_totals(output_dir: str, weekly_totals: WeeklyTotals, reread: Iterable[str] = ()):
+    """Write the per-team and per-library weekly totals fed to `weekly_totals`.
+
+    Actions CSVs named in `reread` (those whose generation failed, so the rows fed
+    while writing never reached the file) are read back from disk instead.
+    """
+    for filename in reread:
+        if filename in ACTIONS_COLUMNS:
+            weekly_totals.add_csv(os.path.join(output_dir, filename))
+
+    # Newest week first, matching the API's ordering of the raw CSVs
+    team_rows = weekly_totals.team_rows()
+    with atomic_write(os.path.join(output_dir, TEAM_WEEKLY_TOTALS_FILE), artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['team_name', 'week', 'insertions', 'detachments'])
+        writer.writerows(team_rows)
+    print(f"✅ Generated: {TEAM_WEEKLY_TOTALS_FILE} ({len(team_rows)} rows)")
+
+    library_rows = weekly_totals.library_rows()
+    with atomic_write(os.path.join(output_dir, LIBRARY_WEEKLY_TOTALS_FILE), artifact=True) as f:
+        writer = csv.writer(f)
+        writer.writerow(['week', 'insertions', 'detachments', 'active_components', 'active_teams'])
+        writer.writerows(library_rows)
+    print(f"✅ Generated: {LIBRARY_WEEKLY_TOTALS_FILE} ({len(library_rows)} rows)")
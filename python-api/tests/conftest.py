@@ -0,0 +1,72 @@
+"""
+Shared fixtures: the python-api modules on sys.path, an in-process mock Figma API
+and a way to make single endpoints fail.
+"""
+
+import os
+import sys
+import threading
+from urllib.parse import urlencode
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import component_index  # noqa: E402
+import date_shards  # noqa: E402
+import figma_client  # noqa: E402
+import main  # noqa: E402
+import mock_figma_api  # noqa: E402
+import pagination_checkpoint  # noqa: E402
+import run_manifest  # noqa: E402
+import version_history  # noqa: E402
+from response_cache import CachedResponse  # noqa: E402
+
+# Modules that build URLs from FIGMA_API_BASE or call figma_get directly
+API_MODULES = (main, version_history, component_index, run_manifest)
+
+FILE_KEY = 'TESTKEY'
+TOKEN = 'test-token'
+
+
+@pytest.fixture
+def figma_api(monkeypatch, request):
+    """A small synthetic library served on a free port; yields the server.
+
+    Parametrize indirectly with a list of extra mock_figma_api.py flags, e.g. ['--newest-first'].
+    """
+    args = mock_figma_api.build_parser().parse_args(
+        ['--port', '0', '--scale', '0.02', '--weeks', '6', '--end-week', '2026-10-04', '--versions', '40',
+         '--page-size', '50'] + list(getattr(request, 'param', [])))
+    server = mock_figma_api.create_server(args)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    for module in API_MODULES:
+        monkeypatch.setattr(module, 'FIGMA_API_BASE', f"{server.base_url}/v1")
+    monkeypatch.setattr(figma_client, '_rate_limiter', None)
+    monkeypatch.setattr(figma_client, '_response_cache', None)
+    monkeypatch.setattr(pagination_checkpoint, '_checkpoints', None)
+    monkeypatch.setattr(component_index, '_index_store', None)
+    monkeypatch.setattr(date_shards, '_sharding', None)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def fail_requests(monkeypatch):
+    """fail_requests(fragment, status) answers every figma_get whose URL (with its query) contains `fragment` with `status`"""
+    failing = {}
+    real_get = main.figma_get
+
+    def figma_get(url, token, params=None, **kwargs):
+        target = f"{url}?{urlencode(params)}" if params else url
+        for fragment, status in failing.items():
+            if fragment in target:
+                return CachedResponse({'status': status, 'body': '{"error": true}'})
+        return real_get(url, token, params=params, **kwargs)
+
+    for module in API_MODULES:
+        monkeypatch.setattr(module, 'figma_get', figma_get)
+    return failing.__setitem__
+
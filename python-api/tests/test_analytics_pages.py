@@ -0,0 +1,52 @@
+import os
+
+import pytest
+
+import main
+from conftest import FILE_KEY, TOKEN
+from figma_client import FigmaAPIError
+from response_cache import CachedResponse
+
+
+def fetch_pages(endpoint='component/actions', group_by='component'):
+    return list(main.iter_analytics_pages(TOKEN, FILE_KEY, endpoint, group_by, '2026-01-01', '2026-10-17'))
+
+
+def test_pages_cover_every_record(figma_api):
+    pages = fetch_pages()
+    assert len(pages) > 1
+    assert sum(len(page) for page in pages) == figma_api.library.row_counts()['component/actions:component']
+
+
+@pytest.mark.parametrize('status', [429, 500, 503])
+def test_first_page_error_raises(figma_api, fail_requests, status):
+    fail_requests('component/actions', status)
+    with pytest.raises(FigmaAPIError):
+        fetch_pages()
+
+
+def test_unreadable_first_page_raises(figma_api, monkeypatch):
+    monkeypatch.setattr(main, 'figma_get', lambda *args, **kwargs: CachedResponse({'status': 200, 'body': '<html>'}))
+    with pytest.raises(FigmaAPIError):
+        fetch_pages()
+
+
+@pytest.mark.parametrize('status', [403, 404])
+def test_unavailable_analytics_yield_no_pages(figma_api, fail_requests, status):
+    fail_requests('component/actions', status)
+    assert fetch_pages() == []
+
+
+def test_failed_endpoint_keeps_previous_csv(figma_api, fail_requests, tmp_path):
+    output_dir = str(tmp_path)
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    first = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY)
+    assert first['failed'] == []
+    with open(os.path.join(output_dir, 'actions_by_component.csv'), 'rb') as f:
+        before = f.read()
+
+    fail_requests('component/actions', 500)
+    second = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY)
+    assert second['failed'] == ['actions_by_component.csv', 'actions_by_team.csv']
+    with open(os.path.join(output_dir, 'actions_by_component.csv'), 'rb') as f:
+        assert f.read() == before
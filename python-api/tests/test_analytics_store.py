@@ -0,0 +1,89 @@
+import pytest
+
+import main
+from analytics_store import AnalyticsStore
+from conftest import FILE_KEY, TOKEN
+
+TEAM_WEEKS = [
+    {'team_name': 'Checkout', 'week': '2026-09-27', 'insertions': 4, 'detachments': 1},
+    {'team_name': 'Checkout', 'week': '2026-10-04', 'insertions': 6, 'detachments': 0},
+    {'team_name': 'Search', 'week': '2026-10-04', 'insertions': 2, 'detachments': 2},
+]
+
+USAGES = [
+    {'style_name': 'Primary', 'style_type': 'FILL', 'file_name': 'Checkout', 'instances': 12},
+    {'style_name': 'Body', 'style_type': 'TEXT', 'file_name': 'Search', 'instances': 3},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AnalyticsStore.for_output_dir(str(tmp_path), FILE_KEY)
+
+
+def ingest(store, filename, pages, replace_from_week=None):
+    build_row = store.row_builder(filename)
+    with store.ingest(filename, replace_from_week) as write_batch:
+        for page in pages:
+            write_batch([build_row(item) for item in page])
+
+
+def team_rows(store):
+    return store.query("SELECT team_name, week, insertions, detachments FROM team_actions ORDER BY team_name, week")
+
+
+def test_weekly_merge_is_idempotent(store):
+    ingest(store, 'actions_by_team.csv', [TEAM_WEEKS[:2], TEAM_WEEKS[2:]], '2026-01-01')
+    first = team_rows(store)
+    ingest(store, 'actions_by_team.csv', [TEAM_WEEKS], '2026-01-01')
+    assert team_rows(store) == first
+    assert len(first) == 3
+
+
+def test_weekly_merge_replaces_only_the_fetched_window(store):
+    ingest(store, 'actions_by_team.csv', [TEAM_WEEKS], '2026-01-01')
+    newer = [dict(TEAM_WEEKS[1], insertions=9)]
+    ingest(store, 'actions_by_team.csv', [newer], '2026-10-04')
+    assert team_rows(store) == [('Checkout', '2026-09-27', 4, 1), ('Checkout', '2026-10-04', 9, 0)]
+
+
+def test_failed_fetch_keeps_stored_rows(store):
+    ingest(store, 'actions_by_team.csv', [TEAM_WEEKS], '2026-01-01')
+    with pytest.raises(RuntimeError):
+        with store.ingest('actions_by_team.csv', '2026-01-01') as write_batch:
+            write_batch([store.row_builder('actions_by_team.csv')(TEAM_WEEKS[0])])
+            raise RuntimeError('page 2 failed')
+    assert len(team_rows(store)) == 3
+
+
+@pytest.mark.parametrize('filename, items, replace_from_week', [
+    ('actions_by_team.csv', TEAM_WEEKS, '2026-01-01'),
+    ('styles_usages_by_style.csv', USAGES, None),
+])
+def test_fetch_without_pages_keeps_stored_rows(store, filename, items, replace_from_week):
+    ingest(store, filename, [items], replace_from_week)
+    ingest(store, filename, [], replace_from_week)
+    table = 'team_actions' if filename == 'actions_by_team.csv' else 'style_usages'
+    assert store.query(f"SELECT COUNT(*) FROM {table}") == [(len(items),)]
+
+
+def test_empty_page_replaces_snapshot(store):
+    ingest(store, 'styles_usages_by_style.csv', [USAGES])
+    ingest(store, 'styles_usages_by_style.csv', [[]])
+    assert store.query("SELECT COUNT(*) FROM style_usages") == [(0,)]
+
+
+def test_failed_endpoints_keep_store_rows(figma_api, fail_requests, tmp_path):
+    output_dir = str(tmp_path)
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, use_store=True)
+    store = AnalyticsStore.for_output_dir(output_dir, FILE_KEY)
+    counts = {table: store.query(f"SELECT COUNT(*) FROM {table}")[0][0] for table in ('component_actions', 'file_usages')}
+    assert all(counts.values())
+
+    fail_requests('component/actions', 500)
+    fail_requests('component/usages', 503)
+    summary = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, use_store=True)
+    assert {'actions_by_component.csv', 'usages_by_file.csv'} <= set(summary['failed'])
+    for table, count in counts.items():
+        assert store.query(f"SELECT COUNT(*) FROM {table}") == [(count,)]
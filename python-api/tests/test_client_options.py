@@ -0,0 +1,46 @@
+import pytest
+
+import component_index
+import date_shards
+import figma_client
+import main
+import pagination_checkpoint
+import service
+from conftest import FILE_KEY, TOKEN
+
+CLIENT_GLOBALS = ((figma_client, '_response_cache'), (figma_client, '_rate_limiter'),
+                  (pagination_checkpoint, '_checkpoints'), (component_index, '_index_store'),
+                  (date_shards, '_sharding'))
+
+
+@pytest.fixture
+def client_globals(monkeypatch):
+    for module, name in CLIENT_GLOBALS:
+        monkeypatch.setattr(module, name, None)
+
+
+def test_configure_client_sets_up_every_shared_component(client_globals, tmp_path):
+    args = main.build_parser().parse_args([
+        '--token', TOKEN, '--file-key', FILE_KEY, '--output-dir', str(tmp_path),
+        '--cache-dir', str(tmp_path / 'cache'), '--checkpoint-dir', str(tmp_path / 'checkpoints'),
+        '--component-index-dir', str(tmp_path / 'index'), '--rate-limit', '60', '--shard', 'quarter',
+    ])
+    main.configure_client(args)
+    assert all(getattr(module, name) is not None for module, name in CLIENT_GLOBALS)
+    assert date_shards.get_sharding().spec == 'quarter'
+
+
+def test_configure_client_honours_the_opt_outs(client_globals, tmp_path):
+    args = main.client_options_parser().parse_args(
+        ['--no-cache', '--no-checkpoints', '--no-component-index', '--rate-limit', '0'])
+    main.configure_client(args)
+    assert all(getattr(module, name) is None for module, name in CLIENT_GLOBALS)
+
+
+def test_job_options_accept_every_output_option(tmp_path):
+    args = service.parse_job_options({
+        'token': TOKEN, 'file_key': FILE_KEY, 'output_dir': str(tmp_path), 'metadata_source': 'file',
+        'partition': 'month', 'rollup_cube': ['week', 'quarter'], 'incremental': True, 'store': True, 'force': True,
+    })
+    assert (args.metadata_source, args.partition, args.rollup_cube) == ('file', 'month', ['week', 'quarter'])
+    assert args.incremental and args.store and args.force
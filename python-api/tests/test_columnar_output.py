@@ -0,0 +1,55 @@
+import csv
+import os
+
+import pytest
+
+import main
+from columnar_output import COLUMNAR_FORMATS, CSV_SCHEMAS, read_csv_table
+from conftest import FILE_KEY, TOKEN
+
+pa = pytest.importorskip('pyarrow')
+
+
+def read_columnar(path, columnar_format):
+    if columnar_format == 'parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path)
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def csv_columns(path, schema):
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    return {name: [int(row[name]) if kind == 'int' else row[name] for row in rows] for name, kind in schema.items()}
+
+
+@pytest.mark.parametrize('columnar_format', sorted(COLUMNAR_FORMATS))
+def test_columnar_copies_match_the_csvs(figma_api, tmp_path, columnar_format):
+    output_dir = str(tmp_path)
+    summary = main.generate_csv_files(main.load_component_index(TOKEN, FILE_KEY), output_dir, TOKEN, FILE_KEY,
+                                      columnar=columnar_format)
+    assert summary['failed'] == []
+
+    for filename, schema in CSV_SCHEMAS.items():
+        table = read_columnar(os.path.join(output_dir, filename[:-len('.csv')] + COLUMNAR_FORMATS[columnar_format]),
+                              columnar_format)
+        assert table.column_names == list(schema)
+        for name, kind in schema.items():
+            field_type = table.schema.field(name).type
+            if kind == 'int':
+                assert field_type == pa.int32()
+            else:
+                assert pa.types.is_dictionary(field_type) and field_type.value_type == pa.string()
+        assert table.to_pydict() == csv_columns(os.path.join(output_dir, filename), schema), filename
+
+
+def test_blank_and_float_ints_are_read(tmp_path):
+    path = str(tmp_path / 'actions_by_team.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([['team_name', 'week', 'insertions', 'detachments'],
+                                 ['Checkout', '2026-10-04', '', '3.0'], ['Search', '2026-10-04', '2', '0']])
+    table = read_csv_table(path, CSV_SCHEMAS['actions_by_team.csv'])
+    assert table.column('insertions').to_pylist() == [None, 2]
+    assert table.column('detachments').to_pylist() == [3, 0]
+    assert table.column('week').type.index_type == pa.int8()
@@ -0,0 +1,77 @@
+import random
+from collections import defaultdict
+
+from compact_records import DISTINCT_IDS_MIN_LIMIT, ComponentUsageStats, DistinctIds, FileUsageStats, StringPool
+
+
+def usage_rows(count, seed=7):
+    """Shuffled usage rows, so no component or file arrives grouped"""
+    rng = random.Random(seed)
+    rows = [(f"Component {rng.randrange(20)}", f"Set {rng.randrange(4)}", f"File {rng.randrange(60)}",
+             f"Team {rng.randrange(8)}", f"key-{rng.randrange(40)}", rng.randrange(1, 50)) for _ in range(count)]
+    rng.shuffle(rows)
+    return rows
+
+
+def test_string_pool_ids_are_dense_in_first_seen_order():
+    pool = StringPool()
+    assert [pool.id(value) for value in ('b', 'a', 'b', ('a', 'b'))] == [0, 1, 0, 2]
+    assert pool[2] == ('a', 'b') and len(pool) == 3
+
+    reserved = StringPool(reserve_empty=True)
+    assert reserved.id('') == 0 and reserved.id('x') == 1 and reserved[0] == ''
+
+
+def test_distinct_ids_stay_under_twice_their_distinct_count():
+    ids = DistinctIds()
+    rng = random.Random(3)
+    for _ in range(20000):
+        ids.add(rng.randrange(100))
+        assert len(ids) < max(DISTINCT_IDS_MIN_LIMIT, 2 * 100)
+    assert ids.distinct() == 100
+
+
+def test_component_usage_matches_sets_for_ungrouped_rows():
+    rows = usage_rows(5000)
+    stats = ComponentUsageStats()
+    expected = defaultdict(lambda: {'set': '', 'instances': 0, 'files': set(), 'teams': set()})
+    for name, component_set, file_name, team, _, instances in rows:
+        stats.add(name, component_set, file_name, team, instances)
+        entry = expected[name]
+        entry['instances'] += instances
+        entry['files'].add(file_name)
+        entry['teams'].add(team)
+        entry['set'] = component_set
+
+    assert len(stats) == len(expected)
+    assert list(stats.summary_rows()) == [
+        [name, entry['set'], entry['instances'], len(entry['files']), len(entry['teams'])]
+        for name, entry in expected.items()
+    ]
+    # Bounded by the distinct files per component, not the 5000 rows
+    assert all(len(files) < 2 * 60 for files in stats.files)
+
+
+def test_file_usage_matches_sets_and_keeps_first_team():
+    rows = usage_rows(5000)
+    stats = FileUsageStats()
+    expected = defaultdict(lambda: {'instances': 0, 'keys': set()})
+    first_team = {}
+    for _, _, file_name, team, component_key, instances in rows:
+        stats.add(file_name, component_key, team, 'Workspace', instances)
+        expected[file_name]['instances'] += instances
+        expected[file_name]['keys'].add(component_key)
+        first_team.setdefault(file_name, team)
+
+    assert list(stats.rows()) == [
+        [file_name, len(entry['keys']), entry['instances']] for file_name, entry in expected.items()
+    ]
+    assert [stats.strings[team] for team in stats.teams] == list(first_team.values())
+    assert all(len(keys) < 2 * 40 for keys in stats.component_keys)
+
+
+def test_missing_instances_count_as_zero():
+    stats = ComponentUsageStats()
+    stats.add('Button', '', 'Checkout', 'Team', None)
+    stats.add('Button', 'Buttons', 'Checkout', 'Team', '3')
+    assert list(stats.summary_rows()) == [['Button', 'Buttons', 3, 1, 1]]
@@ -0,0 +1,69 @@
+import json
+import os
+
+import pytest
+
+import component_index
+import main
+from component_index import ComponentIndexStore
+from conftest import FILE_KEY, TOKEN
+
+
+@pytest.fixture
+def index_store(monkeypatch, tmp_path):
+    store = ComponentIndexStore(str(tmp_path / 'component_index'))
+    monkeypatch.setattr(component_index, '_index_store', store)
+    return store
+
+
+def load(server, source='published'):
+    """(index, requests the load sent)"""
+    requests = server.faults.stats['requests']
+    index = main.load_component_index(TOKEN, FILE_KEY, source)
+    return index, server.faults.stats['requests'] - requests
+
+
+def test_unchanged_version_reuses_the_saved_index(figma_api, index_store):
+    first, first_requests = load(figma_api)
+    assert len(first) > 0 and first_requests > 1
+    second, second_requests = load(figma_api)
+    # Only the depth=1 version check
+    assert second_requests == 1
+    assert second.metadata == first.metadata and second.name_to_key == first.name_to_key
+    assert second.version == {'version': figma_api.library.version_id, 'last_modified': figma_api.library.last_modified}
+
+
+def test_new_version_invalidates_the_index(figma_api, index_store):
+    first, _ = load(figma_api)
+    figma_api.library.counts['versions'] += 1
+    second, requests = load(figma_api)
+    assert requests > 1
+    assert second.version['version'] == figma_api.library.version_id != first.version['version']
+    with open(index_store._path(FILE_KEY, 'published'), 'r', encoding='utf-8') as f:
+        assert json.load(f)['version'] == figma_api.library.version_id
+
+
+def test_indexes_are_kept_per_metadata_source(figma_api, index_store):
+    load(figma_api, 'published')
+    _, requests = load(figma_api, 'file')
+    assert requests > 1
+    assert sorted(os.listdir(index_store.directory)) == [f"{FILE_KEY}-file.json", f"{FILE_KEY}-published.json"]
+
+
+def test_other_schema_versions_are_rebuilt(figma_api, index_store):
+    load(figma_api)
+    path = index_store._path(FILE_KEY, 'published')
+    with open(path, 'r', encoding='utf-8') as f:
+        saved = json.load(f)
+    saved['schema_version'] += 1
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(saved, f)
+    _, requests = load(figma_api)
+    assert requests > 1
+
+
+def test_failed_version_check_skips_the_index(figma_api, index_store, fail_requests):
+    fail_requests('depth=1', 500)
+    index, _ = load(figma_api)
+    assert len(index) > 0 and index.version is None
+    assert os.listdir(index_store.directory) == []
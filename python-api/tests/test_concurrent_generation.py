@@ -0,0 +1,35 @@
+import filecmp
+import os
+
+import main
+import run_manifest
+from conftest import FILE_KEY, TOKEN
+from output_files import ARTIFACT_MANIFEST_FILE, load_artifact_manifest
+
+# Written per run: timestamps and mtimes differ between otherwise identical runs
+RUN_FILES = {ARTIFACT_MANIFEST_FILE, run_manifest.RUN_MANIFEST_FILE}
+
+
+def generate(output_dir, workers):
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    summary = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, workers=workers)
+    assert summary['failed'] == []
+    return summary
+
+
+def test_concurrent_run_writes_the_same_files_as_a_sequential_one(figma_api, tmp_path):
+    sequential, concurrent = str(tmp_path / 'sequential'), str(tmp_path / 'concurrent')
+    first = generate(sequential, 1)
+    second = generate(concurrent, 4)
+    assert first == second
+
+    names = sorted(set(os.listdir(sequential)) - RUN_FILES)
+    assert sorted(set(os.listdir(concurrent)) - RUN_FILES) == names
+    assert 'actions_by_team.csv' in names and 'version_history.json' in names
+    _, mismatched, errors = filecmp.cmpfiles(sequential, concurrent, names, shallow=False)
+    assert mismatched == [] and errors == []
+
+    # Same content hashes, recorded by concurrent writers without losing entries
+    def hashes(output_dir):
+        return {name: entry['sha256'] for name, entry in load_artifact_manifest(output_dir)['files'].items()}
+    assert hashes(sequential) == hashes(concurrent)
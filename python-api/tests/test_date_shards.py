@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from date_shards import DateWindow, ShardPlan, parse_shard_spec, week_starts
+
+
+def next_day(date: str) -> str:
+    return (datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+
+
+def test_week_starts_are_sundays_in_range():
+    # 2026-01-01 is a Thursday, 2026-01-25 a Sunday
+    assert week_starts('2026-01-01', '2026-01-25') == ['2026-01-04', '2026-01-11', '2026-01-18', '2026-01-25']
+    assert week_starts('2026-01-04', '2026-01-10') == ['2026-01-04']
+    assert week_starts('2026-01-05', '2026-01-10') == []
+
+
+def test_window_ends_on_the_saturday_after_its_last_week():
+    window = DateWindow(['2026-01-04', '2026-01-11'], '2026-10-17')
+    assert (window.first_week, window.last_week) == ('2026-01-04', '2026-01-11')
+    assert (window.start_date, window.end_date) == ('2026-01-04', '2026-01-17')
+
+
+def test_window_end_is_clamped_to_the_requested_range():
+    window = DateWindow(['2026-10-04', '2026-10-11'], '2026-10-14')
+    assert window.end_date == '2026-10-14'
+
+
+@pytest.mark.parametrize('week, inside', [
+    ('2026-01-04', True),
+    ('2026-01-11', True),
+    ('2026-01-11T00:00:00Z', True),
+    ('2025-12-28', False),
+    ('2026-01-18', False),
+    # Not placeable in a window; WeekFilter decides
+    ('week 3', True),
+    (None, True),
+])
+def test_window_contains_its_weeks_inclusive(week, inside):
+    assert DateWindow(['2026-01-04', '2026-01-11'], '2026-10-17').contains(week) is inside
+
+
+def test_month_windows():
+    windows = ShardPlan('month').windows('2026-01-01', '2026-03-31')
+    assert [(w.first_week, w.last_week, w.end_date) for w in windows] == [
+        ('2026-01-04', '2026-01-25', '2026-01-31'),
+        ('2026-02-01', '2026-02-22', '2026-02-28'),
+        ('2026-03-01', '2026-03-29', '2026-03-31'),
+    ]
+
+
+def test_quarter_windows():
+    windows = ShardPlan('quarter').windows('2026-01-01', '2026-10-17')
+    assert [repr(w) for w in windows] == [
+        '2026-01-04..2026-03-29', '2026-04-05..2026-06-28', '2026-07-05..2026-09-27', '2026-10-04..2026-10-11',
+    ]
+    assert windows[-1].end_date == '2026-10-17'
+
+
+def test_numbered_windows_split_weeks_evenly():
+    windows = ShardPlan('3').windows('2026-01-01', '2026-03-31')
+    assert [len(week_starts(w.start_date, w.end_date)) for w in windows] == [5, 4, 4]
+    assert len(ShardPlan('50').windows('2026-01-01', '2026-01-31')) == 4
+
+
+@pytest.mark.parametrize('spec', ['month', 'quarter', '1', '7'])
+def test_windows_cover_every_week_once(spec):
+    weeks = week_starts('2025-01-01', '2026-10-17')
+    windows = ShardPlan(spec).windows('2025-01-01', '2026-10-17')
+    assert [sum(w.contains(week) for w in windows) for week in weeks] == [1] * len(weeks)
+    for previous, window in zip(windows, windows[1:]):
+        assert window.start_date == next_day(previous.end_date)
+
+
+def test_range_without_a_sunday_has_no_windows():
+    assert ShardPlan('month').windows('2026-01-05', '2026-01-09') == []
+
+
+@pytest.mark.parametrize('value, spec', [('Month ', 'month'), ('quarter', 'quarter'), ('12', '12')])
+def test_parse_shard_spec(value, spec):
+    assert parse_shard_spec(value) == spec
+
+
+@pytest.mark.parametrize('value', ['0', 'year', '-2', ''])
+def test_parse_shard_spec_rejects(value):
+    with pytest.raises(ValueError):
+        parse_shard_spec(value)
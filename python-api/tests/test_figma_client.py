@@ -0,0 +1,86 @@
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import figma_client
+from conftest import FILE_KEY, TOKEN
+from figma_client import FigmaAPIError, figma_get, retry_after_seconds
+from rate_limiter import RateLimiter
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Seconds figma_get slept between attempts, without sleeping"""
+    slept = []
+    monkeypatch.setattr(figma_client, 'time', SimpleNamespace(sleep=slept.append))
+    monkeypatch.setattr(figma_client, 'backoff_delay', lambda attempt: 0.25 * (attempt + 1))
+    return slept
+
+
+def script_faults(server, statuses):
+    """Answer the next requests with `statuses` (None lets a request through), then serve normally"""
+    pending = list(statuses)
+    server.faults.decide = lambda: (0.0, pending.pop(0) if pending else None)
+
+
+def file_url(server):
+    return f"{server.base_url}/v1/files/{FILE_KEY}/versions"
+
+
+def test_transient_errors_are_retried_with_backoff(figma_api, sleeps):
+    script_faults(figma_api, [503, 502])
+    response = figma_get(file_url(figma_api), TOKEN)
+    assert response.status_code == 200
+    assert sleeps == [0.25, 0.5]
+
+
+def test_429_waits_for_retry_after_and_slows_the_limiter(figma_api, sleeps, monkeypatch):
+    limiter = RateLimiter(6000)
+    monkeypatch.setattr(figma_client, '_rate_limiter', limiter)
+    figma_api.faults.retry_after = 0.3
+    script_faults(figma_api, [429])
+    response = figma_get(file_url(figma_api), TOKEN)
+    assert response.status_code == 200
+    assert sleeps == [0.3]
+    # The retry itself also waited on the limiter, which every other caller shares
+    assert limiter.throttled == 1 and limiter.rpm < limiter.max_rpm and limiter.waited >= 0.2
+
+
+def test_last_response_is_returned_once_retries_run_out(figma_api, sleeps):
+    script_faults(figma_api, [500] * 10)
+    response = figma_get(file_url(figma_api), TOKEN, max_retries=2)
+    assert response.status_code == 500
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(figma_api, sleeps):
+    response = figma_get(file_url(figma_api), '')
+    assert response.status_code == 403
+    assert sleeps == []
+
+
+def test_unreachable_host_raises_after_retries(sleeps):
+    with pytest.raises(FigmaAPIError):
+        figma_get('http://127.0.0.1:9/v1/files/TESTKEY', TOKEN, max_retries=1, timeout=1)
+    assert sleeps == [0.25]
+
+
+def test_compressed_responses_are_decoded(figma_api):
+    response = figma_get(f"{figma_api.base_url}/v1/analytics/libraries/{FILE_KEY}/component/actions", TOKEN,
+                         params={'group_by': 'component'})
+    assert response.status_code == 200
+    assert response.headers.get('Content-Encoding') == 'gzip'
+    assert response.json()['rows']
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    def headers(value):
+        return SimpleNamespace(headers={'Retry-After': value} if value is not None else {})
+    assert retry_after_seconds(headers('3')) == 3.0
+    assert retry_after_seconds(headers('-1')) == 0.0
+    assert retry_after_seconds(headers(None)) is None
+    assert retry_after_seconds(headers('soon')) is None
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < retry_after_seconds(headers(later)) <= 30
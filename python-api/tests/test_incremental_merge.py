@@ -0,0 +1,46 @@
+import csv
+
+import main
+
+HEADER = ['team_name', 'week', 'insertions', 'detachments']
+
+
+def write_csv(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return str(path)
+
+
+def read_rows(path):
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def test_merge_writes_newest_week_first(tmp_path):
+    existing = write_csv(tmp_path / 'actions_by_team.csv', [
+        ['Checkout', '2026-09-27', '5', '0'],
+        ['Checkout', '2026-09-20', '4', '1'],
+        ['Search', '2026-09-20', '2', '0'],
+        ['Checkout', '2026-09-13', '3', '0'],
+    ])
+    # Oldest week first, and re-fetching a week that is older than the fetch window
+    new = write_csv(tmp_path / 'new.csv', [
+        ['Search', '2026-09-20', '9', '9'],
+        ['Checkout', '2026-09-27', '6', '0'],
+        ['Search', '2026-10-04', '1', '0'],
+        ['Checkout', '2026-10-04', '2', '0'],
+    ])
+
+    new_count, total = main.merge_incremental_csv(existing, new, ['team_name'], '2026-09-27')
+
+    assert (new_count, total) == (4, 6)
+    assert read_rows(existing) == [
+        ['Search', '2026-10-04', '1', '0'],
+        ['Checkout', '2026-10-04', '2', '0'],
+        ['Checkout', '2026-09-27', '6', '0'],
+        ['Search', '2026-09-20', '9', '9'],
+        ['Checkout', '2026-09-20', '4', '1'],
+        ['Checkout', '2026-09-13', '3', '0'],
+    ]
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from json_stream import extract_top_level_values
+
+WANTED = ('components', 'componentSets')
+
+DOCUMENTS = {
+    'figma_file': {
+        'name': 'components',
+        'document': {'id': '0:0', 'children': [{'components': {'nested': True}, 'name': 'componentSets'}]},
+        'components': {
+            '1:2': {'key': 'a"b', 'name': 'Button \\ Primary "large"', 'componentSetId': '1:1'},
+            '1:3': {'key': 'c\\', 'name': 'Ünïcødé ✓ 😀  ', 'description': '{[not structure]}'},
+        },
+        'componentSets': {'1:1': {'key': 's', 'name': 'Button', 'tags': ['x', [], {}]}},
+        'schemaVersion': 0,
+    },
+    'escaped_keys': '{"\\u0063omponents": {"k": "\\"}\\\\"}, "component\\"Sets": [1], "componentSets": []}',
+    'string_values_named_like_keys': '{"a": "components", "b": ["componentSets", {"components": 1}], '
+                                     '"components": [{"\\\\": "\\\\\\""}]}',
+    'scalar_values': '{"components": null, "componentSets": "none", "other": {"components": {}}}',
+    'duplicate_keys': '{"components": {"old": 1}, "components": {"new": 2}}',
+}
+
+
+def encode(document):
+    text = document if isinstance(document, str) else json.dumps(document, ensure_ascii=False, indent=1)
+    return text.encode('utf-8')
+
+
+def expected(data: bytes):
+    loaded = json.loads(data)
+    return {key: value for key, value in loaded.items() if key in WANTED and isinstance(value, (dict, list))}
+
+
+@pytest.mark.parametrize('name', DOCUMENTS)
+def test_split_at_every_byte_matches_json_loads(name):
+    data = encode(DOCUMENTS[name])
+    want = expected(data)
+    for offset in range(len(data) + 1):
+        assert extract_top_level_values([data[:offset], data[offset:]], WANTED) == want, offset
+
+
+@pytest.mark.parametrize('name', DOCUMENTS)
+def test_byte_at_a_time_matches_json_loads(name):
+    data = encode(DOCUMENTS[name])
+    assert extract_top_level_values([data[i:i + 1] for i in range(len(data))], WANTED) == expected(data)
+
+
+@pytest.mark.parametrize('name', DOCUMENTS)
+def test_truncated_input_raises(name):
+    data = encode(DOCUMENTS[name])
+    for length in range(len(data.rstrip())):
+        with pytest.raises(ValueError):
+            json.loads(data[:length])
+        with pytest.raises(ValueError):
+            extract_top_level_values([data[:length]], WANTED)
@@ -0,0 +1,85 @@
+import threading
+from types import SimpleNamespace
+
+import figma_client
+import main
+import metrics
+import progress
+from conftest import FILE_KEY, TOKEN
+from output_files import artifact_rows
+
+
+def collected_run(output_dir, **options):
+    """Generate into `output_dir` while collecting metrics and progress events"""
+    run, events = metrics.RunMetrics({'library': 'Test'}), []
+    with metrics.collecting(run), progress.listening(events.append):
+        data = main.load_component_index(TOKEN, FILE_KEY)
+        summary = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, **options)
+    return run, events, summary
+
+
+def test_stages_count_their_own_pages_requests_and_rows(figma_api, tmp_path):
+    run, events, summary = collected_run(str(tmp_path), workers=4)
+    assert summary['failed'] == []
+    row_counts = figma_api.library.row_counts()
+
+    team = run.stage_summary('actions_by_team.csv')
+    assert team['status'] == 'ok'
+    assert team['records'] == row_counts['component/actions:team']
+    assert team['pages'] == team['requests'] == team['statuses']['200']
+    usages = run.stage_summary('usages_by_file.csv')
+    assert usages['records'] == row_counts['component/usages:file']
+    assert usages['rows'] == artifact_rows(str(tmp_path), 'usages_by_file.csv') > 0
+
+    # Every request is attributed to exactly one stage
+    assert sum(run.stage_summary(name)['requests'] for name in run.stages) == figma_api.faults.stats['requests']
+
+    done = {event['stage'] for event in events if event['event'] == 'stage_done'}
+    assert {'metadata', 'actions_by_team.csv', 'version_history.json', 'summaries'} <= done
+    files = {event['name']: event['rows'] for event in events if event['event'] == 'file'}
+    assert files['actions_by_team.csv'] == team['rows']
+
+
+def test_retries_and_failed_stages_are_recorded(figma_api, tmp_path, fail_requests, monkeypatch):
+    monkeypatch.setattr(figma_client, 'time', SimpleNamespace(sleep=lambda seconds: None))
+    pending = [503]
+    figma_api.faults.decide = lambda: (0.0, pending.pop(0) if pending else None)
+    fail_requests('component/actions?group_by=team', 500)
+
+    run, _, summary = collected_run(str(tmp_path))
+    assert 'actions_by_team.csv' in summary['failed']
+    assert run.stage_summary('actions_by_team.csv')['status'] == 'failed'
+    assert run.stage_summary('metadata')['retries'] == {'503': 1}
+    assert 'figma_refresh_stage_failed{library="Test",stage="actions_by_team.csv"} 1' in metrics.prometheus_text([run])
+
+
+def test_concurrent_runs_only_count_their_own_requests(figma_api, tmp_path):
+    runs = {}
+
+    def refresh(name):
+        runs[name] = collected_run(str(tmp_path / name))[0]
+
+    threads = [threading.Thread(target=refresh, args=(name,)) for name in ('a', 'b')]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    totals = [sum(run.stage_summary(name)['requests'] for name in run.stages) for run in runs.values()]
+    assert totals[0] == totals[1] and sum(totals) == figma_api.faults.stats['requests']
+
+
+def test_prometheus_textfile_escapes_labels(tmp_path):
+    run = metrics.RunMetrics({'library': 'Say "hi"\\now'})
+    with metrics.collecting(run), metrics.stage('fetch'):
+        metrics.record_request(200, 10)
+        metrics.record_page(4)
+    run.finish(True)
+    path = str(tmp_path / 'figma.prom')
+    metrics.write_prometheus_textfile(path, [run])
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    assert '# TYPE figma_refresh_pages gauge' in text
+    assert 'figma_refresh_pages{library="Say \\"hi\\"\\\\now",stage="fetch"} 1' in text
+    assert 'figma_refresh_http_responses{library="Say \\"hi\\"\\\\now",stage="fetch",code="200"} 1' in text
+    assert 'figma_refresh_success{library="Say \\"hi\\"\\\\now"} 1' in text
@@ -0,0 +1,64 @@
+import gzip
+import os
+
+import output_files
+from output_files import atomic_write, artifact_rows, describes_file, load_artifact_manifest
+
+
+def write_csv(path, rows):
+    with atomic_write(str(path), artifact=True) as f:
+        f.write('name,count\n')
+        for name, count in rows:
+            f.write(f'{name},{count}\n')
+
+
+def test_artifact_entry_describes_all_copies(tmp_path):
+    path = tmp_path / 'teams.csv'
+    write_csv(path, [('a', 1), ('b', 2)])
+    entry = load_artifact_manifest(str(tmp_path))['files']['teams.csv']
+    assert describes_file(entry, str(path))
+    assert entry['rows'] == 2
+    assert entry['gz_bytes'] == os.path.getsize(f'{path}.gz')
+    assert gzip.decompress((tmp_path / 'teams.csv.gz').read_bytes()) == path.read_bytes()
+    assert not any(name.endswith('.tmp') for name in os.listdir(tmp_path))
+
+
+def test_plain_file_is_replaced_first_and_entry_recorded_last(tmp_path, monkeypatch):
+    path = tmp_path / 'teams.csv'
+    write_csv(path, [('a', 1)])
+    old_entry = load_artifact_manifest(str(tmp_path))['files']['teams.csv']
+    steps = []
+    real_replace, real_record = os.replace, output_files.record_artifact
+
+    def replace(src, dst):
+        real_replace(src, dst)
+        # Once the plain file changed, the old entry must stop vouching for it
+        steps.append((os.path.basename(dst), describes_file(old_entry, str(path))))
+
+    def record(filepath, entry):
+        steps.append(('manifest', all(os.path.getsize(f'{path}{suffix}') == entry.get(key)
+                                      for suffix, key in (('', 'bytes'), ('.gz', 'gz_bytes')))))
+        real_record(filepath, entry)
+
+    monkeypatch.setattr(output_files.os, 'replace', replace)
+    monkeypatch.setattr(output_files, 'record_artifact', record)
+    write_csv(path, [('a', 1), ('b', 22)])
+
+    # Recording the entry rewrites manifest.json, which is replaced last of all
+    names = [name for name, _ in steps]
+    assert steps[0] == ('teams.csv', False)
+    assert set(names[1:names.index('manifest')]) == {'teams.csv.gz'} | ({'teams.csv.br'} if output_files.brotli else set())
+    assert steps[names.index('manifest')] == ('manifest', True)
+    assert names[names.index('manifest') + 1:] == ['manifest.json']
+    assert artifact_rows(str(tmp_path), 'teams.csv') == 2
+
+
+def test_rewritten_file_is_not_described_by_its_old_entry(tmp_path):
+    path = tmp_path / 'teams.csv'
+    write_csv(path, [('a', 1)])
+    entry = load_artifact_manifest(str(tmp_path))['files']['teams.csv']
+    # Same size, different bytes and mtime
+    path.write_text('name,count\nb,2\n', encoding='utf-8')
+    os.utime(path, ns=(0, int(entry['mtime_ns']) + 1_000_000))
+    assert not describes_file(entry, str(path))
+    assert artifact_rows(str(tmp_path), 'teams.csv') is None
@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+import main
+import pagination_checkpoint
+from conftest import FILE_KEY, TOKEN
+from figma_client import FigmaAPIError
+from pagination_checkpoint import MAX_RESUME_FAILURES, STATE_FILE, CheckpointStore
+from response_cache import CachedResponse
+
+# Seven pages of component actions
+pytestmark = pytest.mark.parametrize('figma_api', [['--page-size', '10']], indirect=True)
+
+
+@pytest.fixture
+def checkpoints(monkeypatch, tmp_path):
+    store = CheckpointStore(str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(pagination_checkpoint, '_checkpoints', store)
+    return store
+
+
+@pytest.fixture
+def failing_cursors(monkeypatch):
+    """Cursors whose page request answers 500; empty the set to let them through again"""
+    failing = set()
+    real_get = main.figma_get
+
+    def figma_get(url, token, params=None, **kwargs):
+        if params and params.get('cursor') in failing:
+            return CachedResponse({'status': 500, 'body': '{"error": true}'})
+        return real_get(url, token, params=params, **kwargs)
+
+    monkeypatch.setattr(main, 'figma_get', figma_get)
+    return failing
+
+
+def fetch(pages, token=TOKEN):
+    """Consume a fetch into `pages`, so pages yielded before a failure are kept"""
+    for page in main.iter_analytics_pages(token, FILE_KEY, 'component/actions', 'component', '2026-01-01', '2026-10-17'):
+        pages.append(page)
+    return pages
+
+
+def interrupted_fetch(failing_cursors, cursor='30'):
+    failing_cursors.add(cursor)
+    pages = []
+    with pytest.raises(FigmaAPIError):
+        fetch(pages)
+    failing_cursors.discard(cursor)
+    return pages
+
+
+def checkpoint_dirs(store):
+    return os.listdir(store.directory)
+
+
+def test_interrupted_fetch_resumes_from_the_saved_cursor(figma_api, checkpoints, failing_cursors):
+    expected = fetch([])
+    assert checkpoint_dirs(checkpoints) == []
+
+    before = interrupted_fetch(failing_cursors)
+    assert len(before) == 3 and len(checkpoint_dirs(checkpoints)) == 1
+
+    requests = figma_api.faults.stats['requests']
+    resumed = fetch([])
+    assert resumed == expected
+    # Only the four pages after the checkpoint were requested again
+    assert figma_api.faults.stats['requests'] - requests == 4
+    assert checkpoint_dirs(checkpoints) == []
+
+
+def test_expired_checkpoint_is_refetched_from_the_start(figma_api, checkpoints, failing_cursors):
+    interrupted_fetch(failing_cursors)
+    state_path = os.path.join(checkpoints.directory, checkpoint_dirs(checkpoints)[0], STATE_FILE)
+    with open(state_path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    state['updated_at'] -= checkpoints.max_age + 1
+    with open(state_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+
+    requests = figma_api.faults.stats['requests']
+    assert sum(len(page) for page in fetch([])) == figma_api.library.row_counts()['component/actions:component']
+    assert figma_api.faults.stats['requests'] - requests == 7
+
+
+def test_checkpoint_is_dropped_after_repeated_failed_resumes(figma_api, checkpoints, failing_cursors):
+    interrupted_fetch(failing_cursors)
+    for _ in range(MAX_RESUME_FAILURES - 1):
+        interrupted_fetch(failing_cursors)
+
+    requests = figma_api.faults.stats['requests']
+    fetch([])
+    assert figma_api.faults.stats['requests'] - requests == 7
+
+
+def test_other_tokens_do_not_resume(figma_api, checkpoints, failing_cursors):
+    interrupted_fetch(failing_cursors)
+    requests = figma_api.faults.stats['requests']
+    fetch([], token='other-token')
+    assert figma_api.faults.stats['requests'] - requests == 7
+    assert len(checkpoint_dirs(checkpoints)) == 1
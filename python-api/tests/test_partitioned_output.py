@@ -0,0 +1,89 @@
+import csv
+import hashlib
+import os
+
+import pytest
+
+import main
+from conftest import FILE_KEY, TOKEN
+from partitioned_output import (PARTITION_DIR, PARTITIONED_OUTPUTS, UNDATED_PARTITION, load_partition_index,
+                                partition_key, write_partitioned_outputs)
+
+
+def generate(output_dir, **options):
+    summary = main.generate_csv_files(main.load_component_index(TOKEN, FILE_KEY), output_dir, TOKEN, FILE_KEY, **options)
+    assert summary['failed'] == []
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))
+
+
+def partition_mtimes(output_dir):
+    folder = os.path.join(output_dir, PARTITION_DIR)
+    return {os.path.join(root, name): os.stat(os.path.join(root, name)).st_mtime_ns
+            for root, _, names in os.walk(folder) for name in names if name.endswith('.csv')}
+
+
+def test_partition_keys():
+    assert partition_key('2026-10-04', 'week') == '2026-10-04'
+    assert partition_key('2026-10-04T00:00:00Z', 'month') == '2026-10'
+    assert partition_key('', 'month') == partition_key('last week', 'week') == UNDATED_PARTITION
+
+
+@pytest.mark.parametrize('granularity', ['week', 'month'])
+def test_partitions_split_each_weekly_csv_exactly(figma_api, tmp_path, granularity):
+    output_dir = str(tmp_path)
+    generate(output_dir, partition=granularity)
+    index = load_partition_index(output_dir)
+    assert index['granularity'] == granularity
+    assert sorted(index['outputs']) == sorted(PARTITIONED_OUTPUTS)
+
+    for filename, output in index['outputs'].items():
+        header, *rows = read_rows(os.path.join(output_dir, filename))
+        week_column = header.index('week')
+        partitioned = []
+        for entry in output['partitions']:
+            path = os.path.join(output_dir, PARTITION_DIR, entry['path'])
+            with open(path, 'rb') as f:
+                assert hashlib.sha256(f.read()).hexdigest() == entry['sha256']
+            partition_header, *partition_rows = read_rows(path)
+            assert partition_header == header and len(partition_rows) == entry['rows']
+            weeks = [row[week_column] for row in partition_rows]
+            assert {partition_key(week, granularity) for week in weeks} == {entry['key']}
+            assert (min(weeks), max(weeks)) == (entry['first_week'], entry['last_week'])
+            partitioned.extend(partition_rows)
+        assert sorted(partitioned) == sorted(rows) and output['rows'] == len(rows)
+        keys = [entry['key'] for entry in output['partitions']]
+        assert keys == sorted(keys, reverse=True)
+
+
+def test_unchanged_partitions_are_not_rewritten(figma_api, tmp_path):
+    output_dir = str(tmp_path)
+    generate(output_dir, partition='week')
+    before = partition_mtimes(output_dir)
+    generate(output_dir, partition='week')
+    assert partition_mtimes(output_dir) == before
+
+
+def test_partitions_without_rows_are_removed(figma_api, tmp_path):
+    output_dir = str(tmp_path)
+    generate(output_dir, partition='week')
+    path = os.path.join(output_dir, 'actions_by_team.csv')
+    header, *rows = read_rows(path)
+    oldest = min(row[header.index('week')] for row in rows)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([header] + [row for row in rows if row[header.index('week')] != oldest])
+
+    index = write_partitioned_outputs(output_dir, 'week')
+    keys = [entry['key'] for entry in index['outputs']['actions_by_team.csv']['partitions']]
+    assert oldest not in keys
+    assert not os.path.exists(os.path.join(output_dir, PARTITION_DIR, 'actions_by_team', f"{oldest}.csv"))
+
+
+def test_unpartitioned_run_removes_partitions(figma_api, tmp_path):
+    output_dir = str(tmp_path)
+    generate(output_dir, partition='month')
+    generate(output_dir)
+    assert not os.path.exists(os.path.join(output_dir, PARTITION_DIR))
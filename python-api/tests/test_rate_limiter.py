@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+import figma_client
+import rate_limiter
+from conftest import FILE_KEY, TOKEN
+from rate_limiter import DECREASE_COOLDOWN, RECOVERY_STEP, RateLimiter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A fake monotonic clock that sleep() advances"""
+    now = [1000.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(rate_limiter, 'time', SimpleNamespace(monotonic=lambda: now[0], sleep=sleep))
+    return now
+
+
+def test_burst_then_refill_at_the_configured_rate(clock):
+    limiter = RateLimiter(60, burst=3)
+    assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire() == pytest.approx(1.0)
+
+
+def test_429_halves_the_rate_once_per_cooldown_and_blocks_callers(clock):
+    limiter = RateLimiter(120)
+    limiter.on_rate_limited(5)
+    limiter.on_rate_limited(5)
+    assert limiter.rpm == 60 and limiter.throttled == 2
+    assert limiter.acquire() >= 5.0
+
+    clock[0] += DECREASE_COOLDOWN
+    limiter.on_rate_limited()
+    assert limiter.rpm == 30
+
+
+def test_rate_never_drops_below_the_floor(clock):
+    limiter = RateLimiter(120, min_rpm=20)
+    for _ in range(5):
+        limiter.on_rate_limited()
+        clock[0] += DECREASE_COOLDOWN
+    assert limiter.rpm == 20
+
+
+def test_successes_recover_additively_up_to_the_budget(clock):
+    limiter = RateLimiter(100)
+    limiter.on_rate_limited()
+    limiter.on_success()
+    assert limiter.rpm == pytest.approx(50 + 100 * RECOVERY_STEP)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rpm == 100
+
+
+@pytest.mark.parametrize('figma_api', [['--rpm', '120', '--retry-after', '0.3']], indirect=True)
+def test_limiter_backs_off_when_the_api_throttles(figma_api, monkeypatch):
+    limiter = RateLimiter(1200)
+    monkeypatch.setattr(figma_client, '_rate_limiter', limiter)
+    url = f"{figma_api.base_url}/v1/files/{FILE_KEY}/versions"
+
+    statuses = [figma_client.figma_get(url, TOKEN).status_code for _ in range(24)]
+
+    assert statuses == [200] * 24
+    assert figma_api.faults.stats['throttled'] == limiter.throttled > 0
+    assert limiter.rpm < limiter.max_rpm
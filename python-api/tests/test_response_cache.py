@@ -0,0 +1,71 @@
+import pytest
+
+import figma_client
+from conftest import FILE_KEY, TOKEN
+from figma_client import figma_get
+from response_cache import ResponseCache
+
+pytestmark = pytest.mark.parametrize('figma_api', [['--etags']], indirect=True)
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    cache = ResponseCache(str(tmp_path / 'responses'), ttl=60)
+    monkeypatch.setattr(figma_client, '_response_cache', cache)
+    return cache
+
+
+def page_url(server):
+    return f"{server.base_url}/v1/analytics/libraries/{FILE_KEY}/component/actions"
+
+
+def get_page(server):
+    return figma_get(page_url(server), TOKEN, params={'group_by': 'team'}, cacheable=True)
+
+
+def expire(cache, server):
+    """Age the cached page past its TTL"""
+    key = cache.key(page_url(server), {'group_by': 'team'}, TOKEN)
+    entry = cache.get(key)
+    entry['stored_at'] -= cache.ttl + 1
+    cache._write(key, entry)
+
+
+def test_fresh_entries_are_served_without_a_request(figma_api, cache):
+    first = get_page(figma_api)
+    requests = figma_api.faults.stats['requests']
+    second = get_page(figma_api)
+    assert second.from_cache and second.json() == first.json()
+    assert figma_api.faults.stats['requests'] == requests
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_stale_entries_are_revalidated_with_their_etag(figma_api, cache):
+    first = get_page(figma_api)
+    expire(cache, figma_api)
+    second = get_page(figma_api)
+    assert figma_api.responses['not_modified'] == 1
+    assert second.from_cache and second.json() == first.json()
+    assert cache.revalidated == 1
+
+    # Revalidation made the entry fresh again
+    get_page(figma_api)
+    assert cache.hits == 1 and figma_api.responses['not_modified'] == 1
+
+
+def test_changed_responses_replace_the_stale_entry(figma_api, cache):
+    get_page(figma_api)
+    expire(cache, figma_api)
+    figma_api.page_size = 5
+    changed = get_page(figma_api)
+    assert not getattr(changed, 'from_cache', False)
+    assert len(changed.json()['rows']) == 5
+    assert figma_api.responses['not_modified'] == 0 and cache.misses == 2
+    assert len(get_page(figma_api).json()['rows']) == 5
+
+
+def test_other_tokens_never_share_entries(figma_api, cache):
+    get_page(figma_api)
+    other = figma_get(page_url(figma_api), 'other-token', params={'group_by': 'team'}, cacheable=True)
+    assert not getattr(other, 'from_cache', False)
+    assert cache.misses == 2
@@ -0,0 +1,85 @@
+import base64
+import csv
+from array import array
+
+import pytest
+
+from rollup_cube import build_rollup_cube, parse_rollup_levels, period_key
+
+ROWS = [
+    # Newest week first, like the API and the generated CSVs
+    ('Checkout', '2026-04-05', 1, 0),
+    ('Search', '2026-03-29', 7, 2),
+    ('Checkout', '2026-03-29', 3, 1),
+    ('Checkout', '2026-03-01', 5, 0),
+    ('Checkout', '2026-03-01', 2, 2),
+    ('Search', '2026-01-04', 4, 0),
+    ('Search', 'not-a-week', 100, 100),
+]
+
+
+@pytest.fixture
+def team_csv(tmp_path):
+    path = tmp_path / 'actions_by_team.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['team_name', 'week', 'insertions', 'detachments'])
+        writer.writerows(ROWS)
+    return str(path)
+
+
+def decode(encoded, dtype):
+    values = array('i' if dtype == 'int32' else 'd')
+    values.frombytes(base64.b64decode(encoded))
+    return list(values)
+
+
+def expected_total(team, metric, keep):
+    column = 2 if metric == 'insertions' else 3
+    return sum(row[column] for row in ROWS if row[0] == team and row[1][:4].isdigit() and keep(row[1]))
+
+
+@pytest.mark.parametrize('value, levels', [
+    ('week', ['week']),
+    ('quarter, WEEK', ['week', 'quarter']),
+    ('month,month', ['month']),
+])
+def test_parse_rollup_levels(value, levels):
+    assert parse_rollup_levels(value) == levels
+
+
+@pytest.mark.parametrize('value', ['', ' , ', 'week,year'])
+def test_parse_rollup_levels_rejects_unknown(value):
+    with pytest.raises(ValueError):
+        parse_rollup_levels(value)
+
+
+@pytest.mark.parametrize('week, level, key', [
+    ('2026-03-29', 'week', '2026-03-29'),
+    ('2026-03-29', 'month', '2026-03'),
+    ('2026-03-29', 'quarter', '2026-Q1'),
+    ('2026-04-05', 'quarter', '2026-Q2'),
+    ('2026-12-27', 'quarter', '2026-Q4'),
+])
+def test_period_key(week, level, key):
+    assert period_key(week, level) == key
+
+
+@pytest.mark.parametrize('level', ['week', 'month', 'quarter'])
+def test_cube_prefix_sums_match_csv_totals(team_csv, level):
+    cube = build_rollup_cube(team_csv, ['team_name'], [level])
+    keys = cube['levels'][level]['keys']
+    assert keys == sorted({period_key(row[1], level) for row in ROWS if row[1][:4].isdigit()})
+    assert cube['dtype'] == 'int32'
+    stride = len(keys) + 1
+
+    for metric in cube['metrics']:
+        cumulative = decode(cube['levels'][level]['cumulative'][metric], cube['dtype'])
+        assert len(cumulative) == len(cube['entities']) * stride
+        for entity, (team,) in enumerate(cube['entities']):
+            row = cumulative[entity * stride:(entity + 1) * stride]
+            assert row[0] == 0
+            for lo in range(len(keys)):
+                for hi in range(lo, len(keys)):
+                    in_range = lambda week: keys[lo] <= period_key(week, level) <= keys[hi]
+                    assert row[hi + 1] - row[lo] == expected_total(team, metric, in_range)
@@ -0,0 +1,92 @@
+import json
+import os
+import time
+
+import pytest
+
+import main
+import run_manifest
+from conftest import FILE_KEY, TOKEN
+
+OPTIONS = run_manifest.manifest_options(None, False)
+
+
+@pytest.fixture
+def generated(figma_api, tmp_path):
+    """Output folder after one successful run against the mock"""
+    output_dir = str(tmp_path)
+    summary = main.generate_csv_files(main.load_component_index(TOKEN, FILE_KEY), output_dir, TOKEN, FILE_KEY)
+    assert summary['failed'] == []
+    return output_dir
+
+
+def rewrite_manifest(output_dir, **changes):
+    path = os.path.join(output_dir, run_manifest.RUN_MANIFEST_FILE)
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest.update(changes)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+
+def freshness(output_dir, options=OPTIONS, fresh_for=run_manifest.DEFAULT_FRESH_FOR):
+    fresh, reason, _ = run_manifest.check_freshness(output_dir, TOKEN, FILE_KEY, options, fresh_for)
+    return fresh, reason
+
+
+def test_no_manifest_is_stale(tmp_path):
+    assert freshness(str(tmp_path)) == (False, 'no previous successful run')
+
+
+def test_successful_run_is_fresh(generated, figma_api):
+    manifest = run_manifest.load_run_manifest(generated)
+    assert manifest['latest_version_id'] == figma_api.library.version_id
+    result = run_manifest.fresh_run_result(generated, TOKEN, FILE_KEY, OPTIONS)
+    assert result['status'] == 'fresh'
+    assert result['total_rows'] == manifest['total_rows'] > 0
+
+
+def test_other_file_key_is_stale(generated):
+    rewrite_manifest(generated, file_key='OTHER')
+    assert freshness(generated) == (False, 'last run was for another file')
+
+
+def test_changed_options_are_stale(generated):
+    assert freshness(generated, run_manifest.manifest_options(None, False, 'month')) == (False, 'output options changed')
+
+
+def test_old_run_is_stale(generated):
+    rewrite_manifest(generated, finished_at=time.time() - 7200)
+    assert freshness(generated, fresh_for=3600)[0] is False
+
+
+def test_new_analytics_week_is_stale(generated):
+    rewrite_manifest(generated, analytics_week='2020-01-05')
+    assert freshness(generated) == (False, 'a new analytics week started')
+
+
+def test_missing_output_is_stale(generated):
+    os.remove(os.path.join(generated, 'actions_by_team.csv'))
+    assert freshness(generated) == (False, '1 output(s) missing')
+
+
+def test_new_version_is_stale(generated, monkeypatch):
+    monkeypatch.setattr(run_manifest, 'fetch_latest_version_id', lambda token, file_key: 'newer')
+    assert freshness(generated) == (False, 'a new version was saved')
+
+
+def test_unchecked_version_is_stale(generated, fail_requests):
+    fail_requests('/versions', 500)
+    assert freshness(generated) == (False, 'could not check the latest version')
+
+
+@pytest.mark.parametrize('fragment, failed_output', [
+    ('component/actions', 'actions_by_component.csv'),
+    ('/versions', 'version_history.json'),
+])
+def test_failed_run_drops_manifest(generated, fail_requests, fragment, failed_output):
+    fail_requests(fragment, 500)
+    summary = main.generate_csv_files(main.load_component_index(TOKEN, FILE_KEY), generated, TOKEN, FILE_KEY)
+    assert failed_output in summary['failed']
+    assert run_manifest.load_run_manifest(generated) is None
+    assert freshness(generated) == (False, 'no previous successful run')
@@ -0,0 +1,51 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import service
+from conftest import FILE_KEY, TOKEN
+
+
+def test_metadata_is_cached_per_token(monkeypatch):
+    loads = []
+    monkeypatch.setattr(service, 'load_component_index', lambda token, file_key, source: loads.append(token) or token)
+    cache = service.MetadataCache()
+    assert cache.load(TOKEN, FILE_KEY, 'published') == TOKEN
+    assert cache.load(TOKEN, FILE_KEY, 'published') == TOKEN
+    assert cache.load('other-token', FILE_KEY, 'published') == 'other-token'
+    assert loads == [TOKEN, 'other-token']
+
+
+def test_jobs_with_other_tokens_are_not_merged(monkeypatch, tmp_path):
+    queue = service.JobQueue(max_jobs=1)
+    monkeypatch.setattr(queue, '_run', lambda job: None)
+    options = {'file_key': FILE_KEY, 'output_dir': str(tmp_path)}
+    first, _ = queue.submit(service.parse_job_options({**options, 'token': TOKEN}))
+    same, deduplicated = queue.submit(service.parse_job_options({**options, 'token': TOKEN}))
+    other, other_deduplicated = queue.submit(service.parse_job_options({**options, 'token': 'other-token'}))
+    assert deduplicated and same is first
+    assert not other_deduplicated and other is not first
+
+
+@pytest.fixture
+def service_url(monkeypatch, tmp_path):
+    queue = service.JobQueue(max_jobs=1)
+    monkeypatch.setattr(queue, '_run', lambda job: None)
+    monkeypatch.setattr(service.ServiceHandler, 'queue', queue)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), service.ServiceHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    job, _ = queue.submit(service.parse_job_options({'token': TOKEN, 'file_key': FILE_KEY, 'output_dir': str(tmp_path)}))
+    yield f"http://127.0.0.1:{server.server_address[1]}/jobs/{job.id}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_non_numeric_event_index_is_rejected(service_url):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(f"{service_url}/events?from=abc", timeout=5)
+    assert error.value.code == 400
+    assert 'from' in json.loads(error.value.read())['error']
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import date_shards
+import main
+from conftest import FILE_KEY, TOKEN
+from date_shards import ShardPlan
+from figma_client import FigmaAPIError
+
+WEEKLY_OUTPUTS = ('actions_by_component.csv', 'actions_by_team.csv')
+
+
+def generate_weekly(output_dir, start_date, end_date):
+    os.makedirs(output_dir)
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    metadata, name_to_key = data.metadata, data.name_to_key
+    main.generate_actions_by_component_csv(output_dir, TOKEN, FILE_KEY, metadata, name_to_key, start_date, end_date)
+    main.generate_actions_by_team_csv(output_dir, TOKEN, FILE_KEY, start_date, end_date)
+    contents = {}
+    for filename in WEEKLY_OUTPUTS:
+        with open(os.path.join(output_dir, filename), 'rb') as f:
+            contents[filename] = f.read()
+    return contents
+
+
+def assert_sharded_matches_unsharded(monkeypatch, tmp_path, spec, start_date, end_date='2026-10-17', workers=3):
+    unsharded = generate_weekly(str(tmp_path / 'unsharded'), start_date, end_date)
+    monkeypatch.setattr(date_shards, '_sharding', ShardPlan(spec, workers))
+    assert len(ShardPlan(spec).windows(start_date, end_date)) > 1
+    sharded = generate_weekly(str(tmp_path / 'sharded'), start_date, end_date)
+    assert sharded == unsharded
+    assert all(content.count(b'\n') > 1 for content in sharded.values())
+
+
+# The mock serves weeks 2026-08-30 to 2026-10-04. By month from August, the newest
+# window has one week of data, so the order is only learned from September's window.
+
+def test_ascending_windows_match_unsharded(figma_api, monkeypatch, tmp_path):
+    assert_sharded_matches_unsharded(monkeypatch, tmp_path, 'month', '2026-08-01')
+
+
+@pytest.mark.parametrize('figma_api', [['--newest-first']], indirect=True)
+def test_descending_windows_match_unsharded(figma_api, monkeypatch, tmp_path):
+    assert_sharded_matches_unsharded(monkeypatch, tmp_path, 'month', '2026-08-01')
+
+
+@pytest.mark.parametrize('figma_api, spec', [
+    # One week per window: the order is never shown, and newest first is kept
+    (['--newest-first'], '41'),
+    # Empty months before the data, then a single-week, a multi-week and a single-week window
+    ([], 'month'),
+], indirect=['figma_api'])
+def test_single_week_and_empty_windows_match_unsharded(figma_api, monkeypatch, tmp_path, spec):
+    assert_sharded_matches_unsharded(monkeypatch, tmp_path, spec, '2026-01-01', workers=4)
+
+
+def test_forbidden_window_fails_after_others_yielded(figma_api, fail_requests):
+    fail_requests('start_date=2026-10-04', 403)
+    windows = ShardPlan('month').windows('2026-08-01', '2026-10-17')
+    pages = main.iter_sharded_analytics_pages(TOKEN, FILE_KEY, 'component/actions', 'team', windows, 2)
+    yielded = []
+    with pytest.raises(FigmaAPIError, match='2026-10-04'):
+        for page_records in pages:
+            yielded.append(page_records)
+    assert {item['week'] for page_records in yielded for item in page_records} == {
+        '2026-08-30', '2026-09-06', '2026-09-13', '2026-09-20', '2026-09-27'}
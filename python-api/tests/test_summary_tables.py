@@ -0,0 +1,79 @@
+import csv
+import os
+
+import pytest
+
+import main
+import summary_tables
+from conftest import FILE_KEY, TOKEN
+from summary_tables import LIBRARY_WEEKLY_TOTALS_FILE, TEAM_WEEKLY_TOTALS_FILE, WeeklyTotals
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.reader(f))[1:]
+
+
+def totals_from_csvs(output_dir):
+    """The weekly totals computed the slow way, by reading the actions CSVs back"""
+    totals = WeeklyTotals()
+    totals.add_csv(os.path.join(output_dir, 'actions_by_team.csv'))
+    totals.add_csv(os.path.join(output_dir, 'actions_by_component.csv'))
+    return ([[str(value) for value in row] for row in totals.team_rows()],
+            [[str(value) for value in row] for row in totals.library_rows()])
+
+
+def assert_totals_match_csvs(output_dir):
+    team_rows, library_rows = totals_from_csvs(output_dir)
+    assert team_rows and library_rows
+    assert read_rows(os.path.join(output_dir, TEAM_WEEKLY_TOTALS_FILE)) == team_rows
+    assert read_rows(os.path.join(output_dir, LIBRARY_WEEKLY_TOTALS_FILE)) == library_rows
+
+
+@pytest.mark.parametrize('options', [{}, {'use_store': True}, {'workers': 4}])
+def test_weekly_totals_are_fed_while_writing(figma_api, tmp_path, monkeypatch, options):
+    output_dir = str(tmp_path)
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    with monkeypatch.context() as patch:
+        patch.setattr(WeeklyTotals, 'add_csv', lambda self, filepath: pytest.fail(f"re-read {filepath}"))
+        summary = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, **options)
+    assert not summary['failed']
+    assert_totals_match_csvs(output_dir)
+
+
+@pytest.mark.parametrize('use_store', [False, True])
+def test_incremental_totals_cover_the_merged_rows(figma_api, tmp_path, use_store):
+    output_dir = str(tmp_path)
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, incremental=True, use_store=use_store)
+    main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY, incremental=True, use_store=use_store)
+    assert_totals_match_csvs(output_dir)
+
+
+def test_failed_output_totals_come_from_its_previous_csv(figma_api, fail_requests, tmp_path):
+    output_dir = str(tmp_path)
+    data = main.load_component_index(TOKEN, FILE_KEY)
+    main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY)
+    previous = read_rows(os.path.join(output_dir, TEAM_WEEKLY_TOTALS_FILE))
+
+    fail_requests('component/actions?group_by=team', 500)
+    summary = main.generate_csv_files(data, output_dir, TOKEN, FILE_KEY)
+    assert 'actions_by_team.csv' in summary['failed']
+    assert read_rows(os.path.join(output_dir, TEAM_WEEKLY_TOTALS_FILE)) == previous
+    assert_totals_match_csvs(output_dir)
+
+
+def test_weeks_with_only_idle_teams_are_left_out_of_library_totals():
+    totals = WeeklyTotals()
+    totals.add_team_rows([['Checkout', '2026-10-04', 3, 0], ['Search', '2026-09-27', 0, 0]])
+    totals.add_component_rows([['Button', 'Buttons', '2026-10-04', '3', '0']])
+    assert totals.library_rows() == [['2026-10-04', 3, 0, 1, 1]]
+    assert totals.team_rows() == [['Checkout', '2026-10-04', 3, 0], ['Search', '2026-09-27', 0, 0]]
+
+
+def test_summary_module_writes_both_tables(tmp_path):
+    totals = WeeklyTotals()
+    totals.add_team_rows([['Checkout', '2026-10-04', 1, 2]])
+    summary_tables.write_weekly_totals(str(tmp_path), totals)
+    assert read_rows(os.path.join(str(tmp_path), TEAM_WEEKLY_TOTALS_FILE)) == [['Checkout', '2026-10-04', '1', '2']]
+    assert read_rows(os.path.join(str(tmp_path), LIBRARY_WEEKLY_TOTALS_FILE)) == [['2026-10-04', '0', '0', '0', '1']]
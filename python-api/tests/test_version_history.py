@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+import figma_client
+import version_history
+from conftest import FILE_KEY, TOKEN
+from response_cache import ResponseCache
+
+
+def test_new_version_bypasses_response_cache(figma_api, monkeypatch, tmp_path):
+    monkeypatch.setattr(figma_client, '_response_cache', ResponseCache(str(tmp_path)))
+    versions, _ = version_history.fetch_version_history(TOKEN, FILE_KEY)
+    assert versions[0]['id'] == figma_api.library.version_id
+
+    figma_api.library.counts['versions'] += 1
+    newer, reached_known = version_history.fetch_version_history(TOKEN, FILE_KEY, {versions[0]['id']})
+    assert reached_known
+    assert [version['id'] for version in newer] == [figma_api.library.version_id]
+
+
+def history_requests(server, filepath, **options):
+    """(versions, new count, requests sent) for one update_version_history call"""
+    requests = server.faults.stats['requests']
+    versions, new_count = version_history.update_version_history(TOKEN, FILE_KEY, filepath, **options)
+    return versions, new_count, server.faults.stats['requests'] - requests
+
+
+def version_ids(versions):
+    return [version['id'] for version in versions]
+
+
+@pytest.mark.parametrize('figma_api', [['--versions', '120']], indirect=True)
+def test_update_fetches_only_new_versions(figma_api, tmp_path):
+    filepath = str(tmp_path / version_history.VERSION_HISTORY_FILE)
+    first, first_count, first_requests = history_requests(figma_api, filepath)
+    assert first_count == len(first) == 120 and first_requests == 4
+
+    figma_api.library.counts['versions'] += 3
+    updated, new_count, requests = history_requests(figma_api, filepath)
+    assert new_count == 3 and requests == 1
+    assert version_ids(updated) == version_ids(version_history.fetch_version_history(TOKEN, FILE_KEY)[0])
+    assert version_ids(version_history.load_versions(filepath)) == version_ids(updated)
+    index = version_history.load_activity_index(version_history.activity_index_path(filepath))
+    assert index['total'] == 123 and index['latest'][0]['id'] == figma_api.library.version_id
+
+
+def test_unchanged_history_is_not_rewritten(figma_api, tmp_path):
+    filepath = str(tmp_path / version_history.VERSION_HISTORY_FILE)
+    history_requests(figma_api, filepath)
+    before = os.stat(filepath).st_mtime_ns
+    versions, new_count, requests = history_requests(figma_api, filepath)
+    assert new_count == 0 and requests == 1 and len(versions) == 40
+    assert os.stat(filepath).st_mtime_ns == before
+
+
+@pytest.mark.parametrize('options', [{}, {'incremental': False}])
+def test_unknown_or_ignored_history_is_replaced(figma_api, tmp_path, options):
+    filepath = str(tmp_path / version_history.VERSION_HISTORY_FILE)
+    version_history.save_version_history([{'id': 'other-file', 'created_at': '2020-01-01T00:00:00Z'}], filepath)
+    versions, new_count, _ = history_requests(figma_api, filepath, **options)
+    assert new_count == len(versions) == 40
+    assert 'other-file' not in version_ids(version_history.load_versions(filepath))
+
+
+def test_activity_weeks_start_on_sunday():
+    versions = [
+        {'id': '3', 'created_at': '2026-10-11T09:00:00Z', 'user': {'id': 'a', 'handle': 'Ana'}},
+        {'id': '2', 'created_at': '2026-10-10T23:00:00Z', 'user': {'id': 'b', 'handle': 'Bo'}},
+        {'id': '1', 'created_at': '2026-10-04T08:00:00Z', 'user': {'id': 'a', 'handle': 'Ana'}},
+    ]
+    index = version_history.build_activity_index(versions, latest=2)
+    assert index['weeks'] == {'2026-10-04': 2, '2026-10-11': 1}
+    assert index['months'] == {'2026-10': 3}
+    assert [(a['handle'], a['count'], a['last_published']) for a in index['authors']] == [
+        ('Ana', 2, '2026-10-11T09:00:00Z'), ('Bo', 1, '2026-10-10T23:00:00Z')]
+    assert version_ids(index['latest']) == ['3', '2']
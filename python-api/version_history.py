@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Version history
+Fetches a file's version history from /files/{key}/versions, shared by main.py
+and fetch_versions.py. Incremental fetches stop paginating at the first version
+already stored and prepend only the new ones; the history is written as compact
+JSON through a temp file so readers never see a partial file.
+
+Next to the history, version_activity.json holds precomputed publication counts
+per day, week, month and author plus the latest versions, so the dashboard and
+the CLI summary don't have to re-scan the whole history.
+"""
+
+import json
+import os
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Any, Optional, Set
+
+import metrics
+import progress
+from figma_client import FIGMA_API_BASE, figma_get
+from output_files import atomic_write
+
+VERSION_HISTORY_FILE = 'version_history.json'
+ACTIVITY_INDEX_FILE = 'version_activity.json'
+ACTIVITY_SCHEMA_VERSION = 1
+
+# Versions kept in full in the activity index
+DEFAULT_LATEST_VERSIONS = 20
+
+
+def load_versions(filepath: str) -> List[Dict[str, Any]]:
+    """Previously saved versions, newest first; empty if the file is missing or unreadable"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            versions = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return versions if isinstance(versions, list) else []
+
+
+def save_versions(versions: List[Dict[str, Any]], filepath: str):
+    """Write versions as compact JSON, replacing `filepath` atomically"""
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    with atomic_write(filepath, artifact=True, rows=len(versions)) as f:
+        json.dump(versions, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def _version_summary(version: Dict[str, Any]) -> Dict[str, Any]:
+    user = version.get('user') or {}
+    return {
+        'id': str(version.get('id', '')),
+        'created_at': version.get('created_at'),
+        'label': version.get('label'),
+        'description': version.get('description'),
+        'user': {'id': user.get('id'), 'handle': user.get('handle')},
+    }
+
+
+def build_activity_index(versions: List[Dict[str, Any]], latest: int = DEFAULT_LATEST_VERSIONS) -> Dict[str, Any]:
+    """Publication counts per UTC day, week (starting Sunday), month, year and author.
+
+    Dates are taken from the ISO created_at prefix, so each distinct day is
+    parsed once no matter how many versions were published on it.
+    """
+    days = Counter()
+    authors: Dict[str, Dict[str, Any]] = {}
+    year_authors: Dict[str, Counter] = {}
+    for version in versions:
+        created_at = version.get('created_at') if isinstance(version, dict) else None
+        if not created_at or len(created_at) < 10:
+            continue
+        day = created_at[:10]
+        days[day] += 1
+        user = version.get('user') or {}
+        author_id = str(user.get('id') or user.get('handle') or 'unknown')
+        author = authors.get(author_id)
+        if author is None:
+            # Versions are newest first, so the first one seen is the author's latest
+            author = authors[author_id] = {'id': author_id, 'handle': user.get('handle') or 'Unknown',
+                                           'count': 0, 'last_published': created_at}
+        author['count'] += 1
+        year_authors.setdefault(day[:4], Counter())[author_id] += 1
+
+    weeks = Counter()
+    months = Counter()
+    years = Counter()
+    for day, count in days.items():
+        try:
+            parsed = date.fromisoformat(day)
+        except ValueError:
+            continue
+        weeks[(parsed - timedelta(days=(parsed.weekday() + 1) % 7)).isoformat()] += count
+        months[day[:7]] += count
+        years[day[:4]] += count
+
+    dated = sorted(days)
+    return {
+        'schema_version': ACTIVITY_SCHEMA_VERSION,
+        'total': len(versions),
+        'first_published': dated[0] if dated else None,
+        'last_published': dated[-1] if dated else None,
+        'latest': [_version_summary(v) for v in versions[:latest] if isinstance(v, dict)],
+        'days': dict(sorted(days.items())),
+        'weeks': dict(sorted(weeks.items())),
+        'months': dict(sorted(months.items())),
+        'authors': sorted(authors.values(), key=lambda a: (-a['count'], a['handle'])),
+        'years': {
+            year: {
+                'total': years[year],
+                'authors': [{'id': author_id, 'handle': authors[author_id]['handle'], 'count': count}
+                            for author_id, count in year_authors[year].most_common()],
+            }
+            for year in sorted(years)
+        },
+    }
+
+
+def activity_index_path(history_path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(history_path)), ACTIVITY_INDEX_FILE)
+
+
+def load_activity_index(filepath: str) -> Optional[Dict[str, Any]]:
+    """The saved activity index, or None if missing, unreadable or from another schema"""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if isinstance(index, dict) and index.get('schema_version') == ACTIVITY_SCHEMA_VERSION else None
+
+
+def save_version_history(versions: List[Dict[str, Any]], filepath: str) -> Dict[str, Any]:
+    """Write the history and its activity index next to it; returns the index"""
+    save_versions(versions, filepath)
+    index = build_activity_index(versions)
+    with atomic_write(activity_index_path(filepath), artifact=True) as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    return index
+
+
+def fetch_version_history(token: str, file_key: str, known_ids: Optional[Set[str]] = None) -> tuple:
+    """Fetch versions newest first, stopping at the first id in `known_ids`.
+
+    Returns (new versions, reached_known); reached_known is False when every page
+    was walked, in which case the new versions are the complete history.
+    """
+    url = f"{FIGMA_API_BASE}/files/{file_key}/versions"
+    known_ids = known_ids or set()
+
+    print(f"\n📚 Fetching version history from Figma API for file: {file_key}"
+          f"{' (new versions only)' if known_ids else ''}")
+
+    all_versions = []
+    page = 1
+    reached_known = False
+
+    while True:
+        # The first page is where new versions appear, so it always goes to the API;
+        # later pages are addressed by version id and never change
+        response = figma_get(url, token, cacheable=page > 1)
+
+        if response.status_code != 200:
+            raise Exception(f"Figma API error: {response.status_code} - {response.text}")
+
+        data = response.json()
+        versions = data.get("versions", [])
+
+        if not versions:
+            break
+
+        for version in versions:
+            if str(version.get("id", "")) in known_ids:
+                reached_known = True
+                break
+            all_versions.append(version)
+        print(f"  Page {page}: Found {len(versions)} versions (new so far: {len(all_versions)})")
+        progress.emit('page', endpoint='versions', page=page, records=len(all_versions))
+        metrics.record_page(len(versions))
+
+        # Check for pagination - Figma uses 'pagination' field
+        next_page = data.get("pagination", {}).get("next_page")
+
+        if reached_known or not next_page:
+            break
+
+        # Update URL for next page
+        url = next_page
+        page += 1
+
+    if reached_known:
+        print(f"✅ Found {len(all_versions)} new versions across {page} page(s), stopped at the newest stored version")
+    else:
+        print(f"✅ Found {len(all_versions)} total versions across {page} page(s)")
+    return all_versions, reached_known
+
+
+def update_version_history(token: str, file_key: str, filepath: str, incremental: bool = True) -> tuple:
+    """Bring the history saved at `filepath` up to date; returns (all versions, new version count).
+
+    If no stored version is reached (first run, another file, or a full refresh),
+    the fetched history replaces the stored one. Nothing is rewritten when there is
+    nothing new and the activity index already exists.
+    """
+    stored = load_versions(filepath) if incremental else []
+    known_ids = {str(v.get('id', '')) for v in stored if isinstance(v, dict)}
+    new_versions, reached_known = fetch_version_history(token, file_key, known_ids)
+    versions = new_versions + stored if reached_known else (new_versions or stored)
+    if new_versions or not os.path.exists(filepath) or not os.path.exists(activity_index_path(filepath)):
+        save_version_history(versions, filepath)
+    return versions, len(new_versions)
@@ -4,6 +4,7 @@ import fs from 'fs'
 import path from 'path'
 import { fileURLToPath } from 'url'
 import cors from 'cors'
+import { precompressedArtifacts } from './precompressed.js'
 
 const __filename = fileURLToPath(import.meta.url)
 const __dirname = path.dirname(__filename)
@@ -11,17 +12,30 @@ const __dirname = path.dirname(__filename)
 const app = express()
 const PORT = process.env.PORT || 3001
 
+// When set (e.g. http://127.0.0.1:8787), CSV generation runs on the long-lived
+// Python service (python-api/service.py) instead of spawning main.py per request
+const PYTHON_SERVICE_URL = process.env.PYTHON_SERVICE_URL?.replace(/\/$/, '')
+
+// 'week' or 'month' also writes partitioned copies of the weekly CSVs, so the
+// dashboard downloads only the partitions in the selected date range
+const CSV_PARTITION = ['week', 'month'].includes(process.env.CSV_PARTITION) ? process.env.CSV_PARTITION : null
+
+// Levels such as 'week,month' also write per-component and per-team cumulative
+// sums, which the teams chart reads instead of summing the weekly rows
+const CSV_ROLLUP_CUBE = process.env.CSV_ROLLUP_CUBE || null
+
 app.use(cors())
 app.use(express.json())
 
-// Serve static files from public directory
+// Serve static files from public directory; generated CSV/JSON files from their .br/.gz copies
+app.use(precompressedArtifacts(path.join(__dirname, '../public')))
 app.use(express.static(path.join(__dirname, '../public')))
 
 /**
  * Generate CSV files using Python API
  */
 app.post('/api/generate-csv', async (req, res) => {
-  const { token, libraryUrl, libraryName, libraryId } = req.body
+  const { token, libraryUrl, libraryName, libraryId, force } = req.body
 
   console.log('Received CSV generation request:', { 
     hasToken: !!token, 
@@ -124,27 +138,83 @@ app.post('/api/generate-csv', async (req, res) => {
   console.log(`Using Python script: ${pythonScript}`)
   console.log(`Output directory: ${outputDir}`)
 
+  const generation = PYTHON_SERVICE_URL
+    ? runServiceJob({
+        token,
+        file_key: fileKey,
+        output_dir: outputDir,
+        library_name: libraryName || libraryFolderName,
+        force: Boolean(force),
+        ...(CSV_PARTITION ? { partition: CSV_PARTITION } : {}),
+        ...(CSV_ROLLUP_CUBE ? { rollup_cube: CSV_ROLLUP_CUBE } : {})
+      })
+    : runPythonProcess(pythonScript, pythonApiPath, [
+        '--token', token,
+        '--file-key', fileKey,
+        '--output-dir', outputDir,
+        '--library-name', libraryName || libraryFolderName,
+        ...(force ? ['--force'] : []),
+        ...(CSV_PARTITION ? ['--partition', CSV_PARTITION] : []),
+        ...(CSV_ROLLUP_CUBE ? ['--rollup-cube', CSV_ROLLUP_CUBE] : [])
+      ], {
+        FIGMA_ACCESS_TOKEN: token,
+        LIBRARY_NAME: libraryName || '',
+        LIBRARY_ID: libraryId || ''
+      })
+
+  return generation
+    .then(({ stdout, stderr, jobId, metrics, fresh }) => ({
+      // A fresh pre-flight already knows the row counts, so the CSVs aren't re-read
+      ...(fresh ? freshResults(fresh) : collectCsvResults(outputDir, stdout, stderr)),
+      ...(jobId ? { jobId } : {}),
+      ...(metrics ? { metrics } : {})
+    }))
+    .then(result => {
+      console.log('CSV generation successful:', result)
+      res.json(result)
+    })
+    .catch(error => {
+      console.error('CSV generation error:', error)
+      console.error('Error stack:', error.stack)
+      res.status(500).json({ 
+        error: error.message || 'Failed to generate CSV files',
+        details: process.env.NODE_ENV === 'development' ? error.stack : undefined
+      })
+    })
+})
+
+/**
+ * Run main.py as a one-off Python process.
+ * Structured progress events arrive as JSON lines on a separate pipe (fd 3),
+ * so the log on stdout stays human-readable; the final 'metrics' event is returned.
+ */
+function runPythonProcess(pythonScript, pythonApiPath, args, env) {
   return new Promise((resolve, reject) => {
     // Spawn Python process
     // Pass library name to Python script for folder organization
-    const pythonProcess = spawn('python3', [
-      pythonScript,
-      '--token', token,
-      '--file-key', fileKey,
-      '--output-dir', outputDir,
-      '--library-name', libraryName || libraryFolderName
-    ], {
+    const pythonProcess = spawn('python3', [pythonScript, ...args, '--progress-fd', '3'], {
       cwd: pythonApiPath,
       env: {
         ...process.env,
-        FIGMA_ACCESS_TOKEN: token,
-        LIBRARY_NAME: libraryName || '',
-        LIBRARY_ID: libraryId || ''
-      }
+        ...env
+      },
+      stdio: ['ignore', 'pipe', 'pipe', 'pipe']
     })
 
     let stdout = ''
     let stderr = ''
+    let metrics = null
+    let fresh = null
+
+    readJsonLines(pythonProcess.stdio[3], (event) => {
+      if (event.event === 'metrics') {
+        metrics = event
+      } else if (event.event === 'fresh') {
+        fresh = event
+      } else if (event.event === 'stage_done') {
+        console.log(`Python stage ${event.stage}: ${event.seconds}s, ${event.pages} pages, ${event.requests} requests`)
+      }
+    })
 
     pythonProcess.stdout.on('data', (data) => {
       stdout += data.toString()
@@ -164,89 +234,199 @@ app.post('/api/generate-csv', async (req, res) => {
         console.error('Stderr:', stderr)
         return reject(new Error(`Python process exited with code ${code}. ${stderr || stdout || 'No error message'}`))
       }
+      resolve({ stdout, stderr, metrics, fresh })
+    })
 
-      // Check if CSV files were generated and have data
-      const csvFiles = [
-        'actions_by_component.csv',
-        'actions_by_team.csv',
-        'usages_by_component.csv',
-        'usages_by_file.csv',
-        'variable_actions_by_team.csv',
-        'variable_actions_by_variable.csv',
-        'styles_actions_by_style.csv',
-        'styles_usages_by_style.csv'
-      ]
-
-      console.log(`Checking for CSV files in: ${outputDir}`)
-      console.log(`Output directory exists: ${fs.existsSync(outputDir)}`)
-      
-      // List all files in output directory for debugging
-      if (fs.existsSync(outputDir)) {
-        const filesInDir = fs.readdirSync(outputDir)
-        console.log(`Files found in output directory: ${filesInDir.join(', ')}`)
+    pythonProcess.on('error', (error) => {
+      reject(new Error(`Failed to start Python process: ${error.message}`))
+    })
+  })
+}
+
+/**
+ * Run a generation job on the long-lived Python service (python-api/service.py).
+ * Identical in-flight jobs are merged by the service; its JSON-lines progress
+ * stream is followed until the job's final 'done' event.
+ */
+async function runServiceJob(job) {
+  const response = await fetch(`${PYTHON_SERVICE_URL}/jobs`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(job)
+  })
+  const queued = await response.json()
+  if (!response.ok) {
+    throw new Error(queued.error || `Python service returned ${response.status}`)
+  }
+  console.log(`Python service job ${queued.id}${queued.deduplicated ? ' (joined in-flight job)' : ''}`)
+
+  const stream = await fetch(`${PYTHON_SERVICE_URL}/jobs/${queued.id}/events`)
+  let stdout = ''
+  let done = null
+  let metrics = null
+
+  await readJsonLines(stream.body, (event) => {
+    if (event.event === 'log') {
+      stdout += `${event.message}\n`
+      console.log(`Python service: ${event.message}`)
+    } else if (event.event === 'metrics') {
+      metrics = event
+    } else if (event.event === 'done') {
+      done = event
+    }
+  })
+
+  if (!done) {
+    throw new Error(`Python service job ${queued.id} ended without a result`)
+  }
+  if (done.status !== 'succeeded') {
+    throw new Error(`Python service job ${queued.id} failed. ${done.error || stdout || 'No error message'}`)
+  }
+  const fresh = done.result && done.result.status === 'fresh' ? done.result : null
+  return { stdout, stderr: '', jobId: queued.id, metrics, fresh }
+}
+
+/**
+ * Call onEvent for every JSON line of a Node stream or web ReadableStream
+ */
+async function readJsonLines(stream, onEvent) {
+  const decoder = new TextDecoder()
+  let buffered = ''
+
+  for await (const chunk of stream) {
+    buffered += typeof chunk === 'string' ? chunk : decoder.decode(chunk, { stream: true })
+    let newline
+    while ((newline = buffered.indexOf('\n')) >= 0) {
+      const line = buffered.slice(0, newline)
+      buffered = buffered.slice(newline + 1)
+      if (!line.trim()) continue
+      try {
+        onEvent(JSON.parse(line))
+      } catch (error) {
+        console.error(`Ignoring malformed progress event: ${line}`)
       }
+    }
+  }
+}
 
-      const generatedFiles = []
-      const filesWithData = []
-      let totalRows = 0
-
-      for (const file of csvFiles) {
-        const filePath = path.join(outputDir, file)
-        if (fs.existsSync(filePath)) {
-          generatedFiles.push(file)
-          // Check if file has data (more than just header)
-          try {
-            const content = fs.readFileSync(filePath, 'utf-8')
-            const lines = content.trim().split('\n')
-            const rowCount = lines.length - 1 // Subtract header
-            if (rowCount > 0) {
-              filesWithData.push(file)
-              totalRows += rowCount
-            }
-          } catch (err) {
-            console.error(`Error reading ${file}:`, err)
-          }
-        } else {
-          console.log(`File not found: ${filePath}`)
+/**
+ * Response for a run skipped by the freshness pre-flight, from the last run's manifest
+ */
+function freshResults(fresh) {
+  return {
+    success: true,
+    status: 'fresh',
+    files: fresh.files,
+    filesWithData: fresh.files_with_data,
+    totalRows: fresh.total_rows,
+    lastRunAt: new Date(fresh.last_run_at * 1000).toISOString(),
+    message: `CSV files are already up to date (${fresh.reason})`,
+    warning: null
+  }
+}
+
+/**
+ * Check which CSV files were generated and how many data rows they hold
+ */
+function collectCsvResults(outputDir, stdout, stderr) {
+  const csvFiles = [
+    'actions_by_component.csv',
+    'actions_by_team.csv',
+    'usages_by_component.csv',
+    'usages_by_file.csv',
+    'variable_actions_by_team.csv',
+    'variable_actions_by_variable.csv',
+    'styles_actions_by_style.csv',
+    'styles_usages_by_style.csv'
+  ]
+
+  console.log(`Checking for CSV files in: ${outputDir}`)
+  console.log(`Output directory exists: ${fs.existsSync(outputDir)}`)
+  
+  // List all files in output directory for debugging
+  if (fs.existsSync(outputDir)) {
+    const filesInDir = fs.readdirSync(outputDir)
+    console.log(`Files found in output directory: ${filesInDir.join(', ')}`)
+  }
+
+  // Row counts recorded by the generator while writing, so the CSVs needn't be re-read
+  let artifacts = {}
+  try {
+    artifacts = JSON.parse(fs.readFileSync(path.join(outputDir, 'manifest.json'), 'utf-8')).files || {}
+  } catch {
+    console.log('No artifact manifest, counting CSV rows')
+  }
+
+  const generatedFiles = []
+  const filesWithData = []
+  let totalRows = 0
+
+  for (const file of csvFiles) {
+    const filePath = path.join(outputDir, file)
+    if (fs.existsSync(filePath)) {
+      generatedFiles.push(file)
+      // Check if file has data (more than just header)
+      try {
+        const entry = artifacts[file]
+        const rowCount = entry && entry.bytes === fs.statSync(filePath).size
+          ? entry.rows
+          : fs.readFileSync(filePath, 'utf-8').trim().split('\n').length - 1 // Subtract header
+        if (rowCount > 0) {
+          filesWithData.push(file)
+          totalRows += rowCount
         }
+      } catch (err) {
+        console.error(`Error reading ${file}:`, err)
       }
+    } else {
+      console.log(`File not found: ${filePath}`)
+    }
+  }
 
-      if (generatedFiles.length === 0) {
-        console.error(`Python stdout: ${stdout}`)
-        console.error(`Python stderr: ${stderr}`)
-        return reject(new Error(`No CSV files were generated in ${outputDir}. Check Python script output above.`))
-      }
+  if (generatedFiles.length === 0) {
+    console.error(`Python stdout: ${stdout}`)
+    console.error(`Python stderr: ${stderr}`)
+    throw new Error(`No CSV files were generated in ${outputDir}. Check Python script output above.`)
+  }
 
-      const message = filesWithData.length === 0
-        ? `Generated ${generatedFiles.length} CSV files, but all are empty (headers only). Library Analytics API may not be available. Check Python output for details.`
-        : `Generated ${generatedFiles.length} CSV files with ${totalRows} total data rows`
-
-      resolve({
-        success: true,
-        files: generatedFiles,
-        filesWithData: filesWithData.length,
-        totalRows: totalRows,
-        message: message,
-        warning: filesWithData.length === 0 ? 'All CSV files are empty. Library Analytics API may require Enterprise plan.' : null
-      })
-    })
+  const message = filesWithData.length === 0
+    ? `Generated ${generatedFiles.length} CSV files, but all are empty (headers only). Library Analytics API may not be available. Check Python output for details.`
+    : `Generated ${generatedFiles.length} CSV files with ${totalRows} total data rows`
 
-    pythonProcess.on('error', (error) => {
-      reject(new Error(`Failed to start Python process: ${error.message}`))
-    })
-  })
-    .then(result => {
-      console.log('CSV generation successful:', result)
-      res.json(result)
-    })
-    .catch(error => {
-      console.error('CSV generation error:', error)
-      console.error('Error stack:', error.stack)
-      res.status(500).json({ 
-        error: error.message || 'Failed to generate CSV files',
-        details: process.env.NODE_ENV === 'development' ? error.stack : undefined
-      })
-    })
+  return {
+    success: true,
+    files: generatedFiles,
+    filesWithData: filesWithData.length,
+    totalRows: totalRows,
+    message: message,
+    warning: filesWithData.length === 0 ? 'All CSV files are empty. Library Analytics API may require Enterprise plan.' : null
+  }
+}
+
+/**
+ * Proxy the Python service's JSON-lines progress stream for a generation job
+ */
+app.get('/api/jobs/:jobId/events', async (req, res) => {
+  if (!PYTHON_SERVICE_URL) {
+    return res.status(404).json({ error: 'Progress streaming requires PYTHON_SERVICE_URL' })
+  }
+  try {
+    const upstream = await fetch(`${PYTHON_SERVICE_URL}/jobs/${encodeURIComponent(req.params.jobId)}/events`)
+    res.status(upstream.status)
+    res.setHeader('Content-Type', upstream.headers.get('content-type') || 'application/x-ndjson')
+    res.setHeader('Cache-Control', 'no-cache')
+    for await (const chunk of upstream.body) {
+      res.write(chunk)
+    }
+    res.end()
+  } catch (error) {
+    console.error('Progress stream error:', error)
+    if (!res.headersSent) {
+      res.status(502).json({ error: `Python service unavailable: ${error.message}` })
+    } else {
+      res.end()
+    }
+  }
 })
 
 /**
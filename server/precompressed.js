@@ -0,0 +1,89 @@
+import fs from 'fs'
+import path from 'path'
+
+// Variants written next to each CSV/JSON artifact by python-api/output_files.py, best first
+const ENCODINGS = [
+  { name: 'br', suffix: '.br' },
+  { name: 'gzip', suffix: '.gz' }
+]
+
+const CONTENT_TYPES = {
+  '.csv': 'text/csv; charset=utf-8',
+  '.json': 'application/json; charset=utf-8'
+}
+
+// Parsed manifest.json per folder, reloaded when the file changes
+const manifestCache = new Map()
+
+function readManifest(folder) {
+  const manifestPath = path.join(folder, 'manifest.json')
+  let stat
+  try {
+    stat = fs.statSync(manifestPath)
+  } catch {
+    return null
+  }
+  const cached = manifestCache.get(manifestPath)
+  if (cached && cached.mtimeMs === stat.mtimeMs) {
+    return cached.manifest
+  }
+  try {
+    const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf-8'))
+    manifestCache.set(manifestPath, { mtimeMs: stat.mtimeMs, manifest })
+    return manifest
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Connect/Express middleware serving generated CSV/JSON files under /csv from their
+ * precompressed .br/.gz copies, with the manifest's content hash (suffixed with the
+ * encoding for compressed copies) as a strong ETag.
+ * Requests it can't improve on fall through to the regular static handler.
+ */
+export function precompressedArtifacts(rootDir) {
+  return (req, res, next) => {
+    if (req.method !== 'GET' && req.method !== 'HEAD') return next()
+
+    const pathname = decodeURIComponent((req.url || '').split('?')[0])
+    const contentType = CONTENT_TYPES[path.extname(pathname)]
+    if (!pathname.startsWith('/csv/') || !contentType) return next()
+
+    const filePath = path.join(rootDir, pathname)
+    if (!filePath.startsWith(path.join(rootDir, 'csv') + path.sep)) return next()
+
+    const entry = readManifest(path.dirname(filePath))?.files?.[path.basename(filePath)]
+    let stat
+    try {
+      stat = fs.statSync(filePath, { bigint: true })
+    } catch {
+      return next()
+    }
+    // The manifest describes the file only if it hasn't been replaced since. The writer replaces
+    // the plain file first and records the entry last, so mid-write the copies aren't trusted either
+    if (!entry || typeof entry.bytes !== 'number' || BigInt(entry.bytes) !== stat.size) return next()
+    if (entry.mtime_ns !== undefined && entry.mtime_ns !== String(stat.mtimeNs)) return next()
+
+    const accepted = String(req.headers['accept-encoding'] || '')
+    const encoding = ENCODINGS.find(({ name, suffix }) =>
+      new RegExp(`\\b${name}\\b`).test(accepted) && fs.existsSync(filePath + suffix))
+    const servedPath = encoding ? filePath + encoding.suffix : filePath
+
+    // Strong validators identify the bytes sent, so each encoding gets its own ETag
+    const etag = encoding ? `"${entry.sha256}-${encoding.name}"` : `"${entry.sha256}"`
+    res.setHeader('ETag', etag)
+    res.setHeader('Vary', 'Accept-Encoding')
+    res.setHeader('Cache-Control', 'no-cache')
+    if ((req.headers['if-none-match'] || '').split(',').map(tag => tag.trim()).includes(etag)) {
+      res.statusCode = 304
+      return res.end()
+    }
+
+    res.setHeader('Content-Type', contentType)
+    if (encoding) res.setHeader('Content-Encoding', encoding.name)
+    res.setHeader('Content-Length', fs.statSync(servedPath).size)
+    if (req.method === 'HEAD') return res.end()
+    fs.createReadStream(servedPath).on('error', next).pipe(res)
+  }
+}
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useCallback, useMemo } from "react"
+import React, { useState, useEffect, useCallback, useMemo, useRef } from "react"
 import Papa from "papaparse"
 import { FileText, Component, Bolt, Smile, Type } from "lucide-react"
 import { Button } from "./ui/button"
@@ -28,6 +28,9 @@ import { useAdminMode } from "./AdminModeProvider"
 import { loadConfigSync } from "../lib/config"
 import { DateRangePicker } from "./DateRangePicker"
 import { getConfiguredPages, filterDataForPage, getLibraryForPage } from "../lib/dataFilter"
+import { loadVersionActivity } from "../lib/versionActivity"
+import { loadWeeklyCsv } from "../lib/partitions"
+import { loadRollupCube } from "../lib/rollupCube"
 
 export function Dashboard() {
   const { preferences, updatePreference, isEditMode } = useEditMode()
@@ -37,13 +40,18 @@ export function Dashboard() {
   const [fileUsageData, setFileUsageData] = useState(null)
   const [componentUsagesData, setComponentUsagesData] = useState(null)
   const [teamInsertionsData, setTeamInsertionsData] = useState(null)
+  // Per-team cumulative sums (null when the library was generated without --rollup-cube)
+  const [teamCube, setTeamCube] = useState(null)
   const [variableInsertionsData, setVariableInsertionsData] = useState(null)
   const [stylesData, setStylesData] = useState(null)
-  const [versionHistoryData, setVersionHistoryData] = useState(null)
+  const [versionActivity, setVersionActivity] = useState(null)
   const [fileName, setFileName] = useState("")
   const [selectedPageId, setSelectedPageId] = useState("")
   const [error, setError] = useState("")
   const [loading, setLoading] = useState(false)
+  // Whether the weekly data came from partitions covering only the selected range
+  const [partitionedData, setPartitionedData] = useState(false)
+  const loadedPageRef = useRef("")
   
   // Get configured pages from config, or use legacy defaults for backward compatibility
   const configuredPages = useMemo(() => {
@@ -80,6 +88,16 @@ export function Dashboard() {
     setDateRange({ startDate, endDate })
   }
 
+  // Weeks the page needs: the selected range, plus the last N days the charts and tables show
+  const weeklyDataRanges = (range) => {
+    const today = new Date()
+    today.setHours(23, 59, 59, 999)
+    const daysAgo = new Date(today)
+    daysAgo.setDate(today.getDate() - Math.ceil(Math.abs(range.endDate - range.startDate) / (1000 * 60 * 60 * 24)))
+    daysAgo.setHours(0, 0, 0, 0)
+    return [range, { startDate: daysAgo, endDate: today }]
+  }
+
   // Helper function to get CSV path with library folder
   const getCsvPath = useCallback((fileName, pageId) => {
     if (!pageId || !config) {
@@ -104,6 +122,9 @@ export function Dashboard() {
     return `/csv/${libraryFolder}/${fileName}`
   }, [config])
 
+  // Library folder holding the page's outputs, e.g. /csv/My_Library
+  const getCsvFolder = useCallback((pageId) => getCsvPath('', pageId).replace(/\/$/, ''), [getCsvPath])
+
   const handlePageSelect = useCallback(async (pageId) => {
     setLoading(true)
     setError("")
@@ -111,6 +132,7 @@ export function Dashboard() {
     setFileUsageData(null)
     setComponentUsagesData(null)
     setTeamInsertionsData(null)
+    setTeamCube(null)
     setVariableInsertionsData(null)
     setStylesData(null)
 
@@ -151,115 +173,118 @@ export function Dashboard() {
     }
 
     try {
-      const csvPath = getCsvPath(csvFileName, pageId)
-      const response = await fetch(csvPath)
-      if (!response.ok) {
-        throw new Error(`Failed to load file: ${response.statusText}`)
-      }
-
-      const text = await response.text()
-      
-      Papa.parse(text, {
-        header: true,
-        skipEmptyLines: true,
-        complete: async (results) => {
-          if (results.errors.length > 0) {
-            setError("Error parsing CSV: " + results.errors.map(e => e.message).join(", "))
-            setLoading(false)
-            return
-          }
-          
-          // Apply page-specific filters
-          const filteredData = filterDataForPage(results.data, config, pageId)
-          setData(filteredData)
-          
-          // Load additional data files for components pages
-          if (page.type === 'components') {
-            try {
-              // Load usages_by_component.csv
-              const usagesPath = getCsvPath('usages_by_component.csv', pageId)
-              const usagesResponse = await fetch(usagesPath)
-              if (usagesResponse.ok) {
-                const usagesText = await usagesResponse.text()
-                Papa.parse(usagesText, {
-                  header: true,
-                  skipEmptyLines: true,
-                  complete: async (usagesResults) => {
-                    if (usagesResults.errors.length === 0) {
-                      setComponentUsagesData(usagesResults.data)
-                      
-                      // Load usages_by_file.csv
-                      try {
-                        const filePath = getCsvPath('usages_by_file.csv', pageId)
-                        const fileResponse = await fetch(filePath)
-                        if (fileResponse.ok) {
-                          const fileText = await fileResponse.text()
-                          Papa.parse(fileText, {
-                            header: true,
-                            skipEmptyLines: true,
-                            complete: async (fileResults) => {
-                              if (fileResults.errors.length === 0) {
-                                setFileUsageData(fileResults.data)
-                              }
-                              
-                              // Load actions_by_team.csv
-                              try {
-                                const teamPath = getCsvPath('actions_by_team.csv', pageId)
-                                const teamResponse = await fetch(teamPath)
-                                if (teamResponse.ok) {
-                                  const teamText = await teamResponse.text()
-                                  Papa.parse(teamText, {
-                                    header: true,
-                                    skipEmptyLines: true,
-                                    complete: (teamResults) => {
-                                      if (teamResults.errors.length === 0) {
-                                        setTeamInsertionsData(teamResults.data)
-                                      }
-                                      setLoading(false)
-                                    },
-                                    error: () => setLoading(false)
-                                  })
-                                } else {
-                                  setLoading(false)
-                                }
-                              } catch {
-                                setLoading(false)
-                              }
-                            },
-                            error: () => setLoading(false)
-                          })
-                        } else {
+      const folderPath = getCsvFolder(pageId)
+      const { rows, partitioned } = await loadWeeklyCsv(folderPath, csvFileName, weeklyDataRanges(dateRange))
+      loadedPageRef.current = pageId
+      setPartitionedData(partitioned)
+
+      // Apply page-specific filters
+      const filteredData = filterDataForPage(rows, config, pageId)
+      setData(filteredData)
+
+      // Load additional data files for components pages
+      if (page.type === 'components') {
+        try {
+          // Load usages_by_component.csv
+          const usagesPath = getCsvPath('usages_by_component.csv', pageId)
+          const usagesResponse = await fetch(usagesPath)
+          if (usagesResponse.ok) {
+            const usagesText = await usagesResponse.text()
+            Papa.parse(usagesText, {
+              header: true,
+              skipEmptyLines: true,
+              complete: async (usagesResults) => {
+                if (usagesResults.errors.length === 0) {
+                  setComponentUsagesData(usagesResults.data)
+                  
+                  // Load usages_by_file.csv
+                  try {
+                    const filePath = getCsvPath('usages_by_file.csv', pageId)
+                    const fileResponse = await fetch(filePath)
+                    if (fileResponse.ok) {
+                      const fileText = await fileResponse.text()
+                      Papa.parse(fileText, {
+                        header: true,
+                        skipEmptyLines: true,
+                        complete: async (fileResults) => {
+                          if (fileResults.errors.length === 0) {
+                            setFileUsageData(fileResults.data)
+                          }
+                          
+                          // Load actions_by_team.csv (only the partitions in range when partitioned)
+                          try {
+                            const team = await loadWeeklyCsv(folderPath, 'actions_by_team.csv', weeklyDataRanges(dateRange))
+                            setTeamInsertionsData(team.rows)
+                            // Covers every week, so range changes don't reload it
+                            setTeamCube(await loadRollupCube(folderPath, 'actions_by_team.csv'))
+                          } catch {
+                            // Team breakdown is optional
+                          }
                           setLoading(false)
-                        }
-                      } catch {
-                        setLoading(false)
-                      }
+                        },
+                        error: () => setLoading(false)
+                      })
                     } else {
                       setLoading(false)
                     }
-                  },
-                  error: () => setLoading(false)
-                })
-              } else {
-                setLoading(false)
-              }
-            } catch {
-              setLoading(false)
-            }
+                  } catch {
+                    setLoading(false)
+                  }
+                } else {
+                  setLoading(false)
+                }
+              },
+              error: () => setLoading(false)
+            })
           } else {
             setLoading(false)
           }
-        },
-        error: (error) => {
-          setError("Error reading file: " + error.message)
+        } catch {
           setLoading(false)
         }
-      })
+      } else {
+        setLoading(false)
+      }
     } catch (error) {
       setError("Error loading file: " + error.message)
       setLoading(false)
     }
-  }, [configuredPages, config, getCsvPath])
+  }, [configuredPages, config, getCsvPath, getCsvFolder, dateRange])
+
+  // Partitioned outputs only hold the rows of the loaded date range, so a new range fetches its partitions
+  useEffect(() => {
+    if (!partitionedData || !selectedPageId || !fileName) {
+      return
+    }
+    const pageId = selectedPageId
+    const page = configuredPages.find(p => p.id === pageId)
+    const folderPath = getCsvFolder(pageId)
+    const ranges = weeklyDataRanges(dateRange)
+    let cancelled = false
+
+    Promise.all([
+      loadWeeklyCsv(folderPath, fileName, ranges),
+      page?.type === 'components' ? loadWeeklyCsv(folderPath, 'actions_by_team.csv', ranges).catch(() => null) : null
+    ])
+      .then(([main, team]) => {
+        if (cancelled || loadedPageRef.current !== pageId) {
+          return
+        }
+        setData(filterDataForPage(main.rows, config, pageId))
+        if (team) {
+          setTeamInsertionsData(team.rows)
+        }
+      })
+      .catch((error) => {
+        if (!cancelled) {
+          setError("Error loading file: " + error.message)
+        }
+      })
+
+    return () => {
+      cancelled = true
+    }
+  }, [dateRange]) // Only reload on range changes; page changes go through handlePageSelect
   // Load first page by default
   useEffect(() => {
     if (!selectedPageId && configuredPages.length > 0) {
@@ -267,17 +292,17 @@ export function Dashboard() {
     }
   }, [selectedPageId, configuredPages, handlePageSelect])
 
-  // Load version history data for the current library
+  // Load the publication activity index (or the full version history) for the current library
   useEffect(() => {
     const loadVersionHistory = async () => {
       if (!selectedPageId) {
-        setVersionHistoryData(null)
+        setVersionActivity(null)
         return
       }
       
       try {
         // Compute library-specific path inline to avoid dependency issues
-        let versionHistoryPath = '/csv/version_history.json'
+        let libraryPath = '/csv'
         
         if (selectedPageId && config) {
           const library = getLibraryForPage(config, selectedPageId)
@@ -291,27 +316,17 @@ export function Dashboard() {
             }
             
             const libraryFolder = sanitizeLibraryName(library.name)
-            versionHistoryPath = `/csv/${libraryFolder}/version_history.json`
+            libraryPath = `/csv/${libraryFolder}`
           }
         }
         
-        const response = await fetch(versionHistoryPath)
-        if (response.ok) {
-          const data = await response.json()
-          setVersionHistoryData(data)
-        } else {
-          // Fallback to root version_history.json if library-specific doesn't exist
-          const fallbackResponse = await fetch('/csv/version_history.json')
-          if (fallbackResponse.ok) {
-            const data = await fallbackResponse.json()
-            setVersionHistoryData(data)
-          } else {
-            setVersionHistoryData(null)
-          }
-        }
+        // Fallback to the root files if the library-specific ones don't exist
+        const activity = await loadVersionActivity(libraryPath)
+          || (libraryPath !== '/csv' ? await loadVersionActivity('/csv') : null)
+        setVersionActivity(activity)
       } catch (error) {
         console.error('Failed to load version history:', error)
-        setVersionHistoryData(null)
+        setVersionActivity(null)
       }
     }
     
@@ -642,7 +657,7 @@ export function Dashboard() {
                               />
                             </div>
                             <PublicationCalendar 
-                              versionData={versionHistoryData}
+                              activity={versionActivity}
                             />
                           </div>
 
@@ -768,7 +783,7 @@ export function Dashboard() {
                                           days={days}
                                         />
                                       ) : (
-                                        <TeamsPieChart data={teamInsertionsData} days={days} />
+                                        <TeamsPieChart data={teamInsertionsData} days={days} cube={teamCube} />
                                       )}
                                     </CardContent>
                                   </Card>
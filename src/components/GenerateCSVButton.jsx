@@ -66,6 +66,7 @@ export function GenerateCSVButton() {
             results.push({
               library: library.name,
               success: true,
+              fresh: data.status === 'fresh',
               files: data.files?.length || 0
             })
           } else {
@@ -97,9 +98,13 @@ export function GenerateCSVButton() {
           message: `Generated CSV files for ${successCount}/${totalCount} libraries. Failed: ${failedLibraries}. Check console for details.`
         })
       } else {
+        // Libraries whose last run was still current are skipped by the server
+        const freshCount = results.filter(r => r.fresh).length
         setResult({
           success: true,
-          message: `Successfully generated CSV files for all ${totalCount} libraries. Refresh the page to see updated data.`
+          message: freshCount === totalCount
+            ? `CSV files for all ${totalCount} libraries are already up to date.`
+            : `Successfully generated CSV files for all ${totalCount} libraries${freshCount ? ` (${freshCount} already up to date)` : ''}. Refresh the page to see updated data.`
         })
         // Clear result after 5 seconds
         setTimeout(() => setResult(null), 5000)
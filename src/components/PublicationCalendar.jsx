@@ -13,29 +13,32 @@ import {
 } from "recharts"
 import { ChartContainer as ShadcnChartContainer, ChartTooltipContent } from "./ui/chart-container"
 import { CHART_COLORS } from "../lib/chartColors"
+import { buildActivityIndex } from "../lib/versionActivity"
 
 /**
  * GitHub-style contribution calendar for Figma library publications
  * Shows publication activity over the last year
+ * Reads the precomputed activity index (version_activity.json); raw versionData
+ * is still accepted and indexed on the fly
  */
-export function PublicationCalendar({ versionData, title, description }) {
+export function PublicationCalendar({ activity, versionData, title, description }) {
   const { isDark } = useTheme()
   const [hoveredCell, setHoveredCell] = useState(null)
 
-  // Extract available years from version data
-  const availableYears = useMemo(() => {
-    if (!versionData || versionData.length === 0) return []
+  const activityIndex = useMemo(
+    () => activity || (versionData && versionData.length > 0 ? buildActivityIndex(versionData) : null),
+    [activity, versionData]
+  )
+  const hasActivity = Boolean(activityIndex && activityIndex.total > 0)
 
-    const years = new Set()
-    versionData.forEach((version) => {
-      if (version.created_at) {
-        const year = new Date(version.created_at).getFullYear()
-        years.add(year)
-      }
-    })
+  // Extract available years from the activity index
+  const availableYears = useMemo(() => {
+    if (!hasActivity) return []
 
-    return Array.from(years).sort((a, b) => b - a) // Sort descending (most recent first)
-  }, [versionData])
+    return Object.keys(activityIndex.years || {})
+      .map(Number)
+      .sort((a, b) => b - a) // Sort descending (most recent first)
+  }, [activityIndex, hasActivity])
 
   // Default to current year if it has data, otherwise use the most recent year with data
   const defaultYear = useMemo(() => {
@@ -55,25 +58,15 @@ export function PublicationCalendar({ versionData, title, description }) {
 
   // Process version data into daily counts
   const { dailyCounts, maxCount, weekData, monthLabels, totalPublications, topUsers, topMonths, topDays } = useMemo(() => {
-    if (!versionData || versionData.length === 0) {
+    if (!hasActivity) {
       return { dailyCounts: new Map(), maxCount: 0, weekData: [], monthLabels: [], topUsers: [], topMonths: [], topDays: [] }
     }
 
-    // Count publications per day for the selected year
-    const counts = new Map()
-    versionData.forEach((version) => {
-      if (!version.created_at) return
-
-      // Parse the timestamp and convert to YYYY-MM-DD
-      const date = new Date(version.created_at)
-      const year = date.getFullYear()
-
-      // Only count publications in the selected year
-      if (year === selectedYear) {
-        const dateKey = date.toISOString().split('T')[0]
-        counts.set(dateKey, (counts.get(dateKey) || 0) + 1)
-      }
-    })
+    // Publications per UTC day (YYYY-MM-DD) in the selected year
+    const yearPrefix = `${selectedYear}-`
+    const counts = new Map(
+      Object.entries(activityIndex.days || {}).filter(([dateKey]) => dateKey.startsWith(yearPrefix))
+    )
 
     // Find max count for color scaling
     const max = Math.max(...Array.from(counts.values()), 1)
@@ -184,53 +177,34 @@ export function PublicationCalendar({ versionData, title, description }) {
       }
     })
 
-    // Count total publications in the current year
-    const yearPublications = versionData.filter(version => {
-      if (!version.created_at) return false
-      const date = new Date(version.created_at)
-      return date >= jan1 && date <= dec31
-    }).length
-
-    // Count publications per user for the selected year
-    const userCounts = new Map()
-    versionData.forEach((version) => {
-      if (!version.created_at || !version.user) return
-
-      const date = new Date(version.created_at)
-      const year = date.getFullYear()
-
-      if (year === selectedYear) {
-        const userId = version.user.id || version.user.handle
-        const userName = version.user.handle || 'Unknown'
-        userCounts.set(userId, {
-          name: userName,
-          count: (userCounts.get(userId)?.count || 0) + 1
-        })
-      }
-    })
+    // Total publications and per-user counts for the selected year (already sorted by count)
+    const yearActivity = activityIndex.years?.[selectedYear] || { total: 0, authors: [] }
+    const yearPublications = yearActivity.total
 
     // Get top 6 users
-    const topUsers = Array.from(userCounts.values())
-      .sort((a, b) => b.count - a.count)
+    const topUsers = yearActivity.authors
       .slice(0, 6)
+      .map(author => ({ name: author.handle || 'Unknown', count: author.count }))
 
-    // Count publications per month for the selected year
+    // Count publications per month and per day of week from the daily counts
     const monthCounts = new Map()
-    versionData.forEach((version) => {
-      if (!version.created_at) return
-
-      const date = new Date(version.created_at)
-      const year = date.getFullYear()
-
-      if (year === selectedYear) {
-        const monthKey = date.getMonth() // 0-11
-        const monthName = date.toLocaleDateString('en-US', { month: 'short' })
-        monthCounts.set(monthKey, {
-          month: monthKey,
-          name: monthName,
-          count: (monthCounts.get(monthKey)?.count || 0) + 1
-        })
-      }
+    const dayCounts = new Map()
+    counts.forEach((count, dateKey) => {
+      const date = new Date(`${dateKey}T00:00:00Z`)
+
+      const monthKey = date.getUTCMonth() // 0-11
+      monthCounts.set(monthKey, {
+        month: monthKey,
+        name: date.toLocaleDateString('en-US', { month: 'short', timeZone: 'UTC' }),
+        count: (monthCounts.get(monthKey)?.count || 0) + count
+      })
+
+      const dayOfWeek = date.getUTCDay() // 0 = Sunday, 1 = Monday, ..., 6 = Saturday
+      dayCounts.set(dayOfWeek, {
+        dayOfWeek: dayOfWeek,
+        name: date.toLocaleDateString('en-US', { weekday: 'short', timeZone: 'UTC' }),
+        count: (dayCounts.get(dayOfWeek)?.count || 0) + count
+      })
     })
 
     // Get top 5 months
@@ -243,25 +217,6 @@ export function PublicationCalendar({ versionData, title, description }) {
         publications: month.count // For tooltip
       }))
 
-    // Count publications per day of week for the selected year
-    const dayCounts = new Map()
-    versionData.forEach((version) => {
-      if (!version.created_at) return
-
-      const date = new Date(version.created_at)
-      const year = date.getFullYear()
-
-      if (year === selectedYear) {
-        const dayOfWeek = date.getDay() // 0 = Sunday, 1 = Monday, ..., 6 = Saturday
-        const dayName = date.toLocaleDateString('en-US', { weekday: 'short' })
-        dayCounts.set(dayOfWeek, {
-          dayOfWeek: dayOfWeek,
-          name: dayName,
-          count: (dayCounts.get(dayOfWeek)?.count || 0) + 1
-        })
-      }
-    })
-
     // Get top 5 days
     const topDays = Array.from(dayCounts.values())
       .sort((a, b) => b.count - a.count)
@@ -282,7 +237,7 @@ export function PublicationCalendar({ versionData, title, description }) {
       topMonths: topMonths, // Top 5 months for the selected year
       topDays: topDays, // Top 5 days for the selected year
     }
-  }, [versionData, selectedYear])
+  }, [activityIndex, hasActivity, selectedYear])
 
   // Get color for a cell based on count
   const getCellColor = (count) => {
@@ -309,7 +264,7 @@ export function PublicationCalendar({ versionData, title, description }) {
 
   const dayLabels = ['Mon', 'Wed', 'Fri']
 
-  if (!versionData || versionData.length === 0) {
+  if (!hasActivity) {
     return (
       <Card>
         <CardHeader>
@@ -8,6 +8,7 @@ import {
 } from "recharts"
 import { ChartContainer as ShadcnChartContainer, ChartTooltipContent } from "./ui/chart-container"
 import { useTheme } from "../lib/useTheme"
+import { weekRangeTotals } from "../lib/rollupCube"
 
 const chartConfig = {
   instances: {
@@ -16,7 +17,7 @@ const chartConfig = {
   },
 }
 
-export function TeamsPieChart({ data, days = 90 }) {
+export function TeamsPieChart({ data, days = 90, cube = null }) {
   const { isDark } = useTheme()
 
   // Use chart-themed colors (10-1, darker to lighter) for top 10 teams, plus muted-foreground for "Other"
@@ -37,53 +38,67 @@ export function TeamsPieChart({ data, days = 90 }) {
   }, [])
 
   const chartData = useMemo(() => {
-    if (!data || data.length === 0) {
-      return []
-    }
-
     // Filter by days period if week column exists (for insertions data)
     const today = new Date()
     const daysAgo = new Date(today)
     daysAgo.setDate(today.getDate() - days)
 
+    // Team totals for the period straight from the rollup cube's cumulative sums, when the library has one
+    const cubeTotals = weekRangeTotals(cube, "insertions", daysAgo)
+
+    if (!cubeTotals && (!data || data.length === 0)) {
+      return []
+    }
+
     // Check if this is insertions data (has week and insertions columns) or instances data (has num_instances)
     const isInsertionsData = data[0]?.week !== undefined && data[0]?.insertions !== undefined
 
     // Aggregate by team_name, ignoring "<Drafts>"
     const teamMap = new Map()
 
-    data.forEach((row) => {
-      const teamName = (row.team_name || "").trim()
-      
-      // Ignore "<Drafts>" team
-      if (teamName === "<Drafts>" || teamName === "") {
-        return
-      }
-
-      // Filter by date if this is insertions data
-      if (isInsertionsData) {
-        if (row.week) {
-          const weekDate = new Date(row.week)
-          if (isNaN(weekDate.getTime()) || weekDate < daysAgo) {
-            return
-          }
+    if (cubeTotals) {
+      cube.entities.forEach(([rawTeamName], index) => {
+        const teamName = (rawTeamName || "").trim()
+        // Same exclusions as the row scan; teams without insertions in the period are left out
+        if (teamName === "<Drafts>" || teamName === "" || cubeTotals[index] === 0) {
+          return
         }
-        const insertions = parseInt(row.insertions) || 0
-        if (teamMap.has(teamName)) {
-          teamMap.set(teamName, teamMap.get(teamName) + insertions)
-        } else {
-          teamMap.set(teamName, insertions)
+        teamMap.set(teamName, (teamMap.get(teamName) || 0) + cubeTotals[index])
+      })
+    } else {
+      data.forEach((row) => {
+        const teamName = (row.team_name || "").trim()
+      
+        // Ignore "<Drafts>" team
+        if (teamName === "<Drafts>" || teamName === "") {
+          return
         }
-      } else {
-        // Legacy instances data
-        const numInstances = parseInt(row.num_instances) || 0
-        if (teamMap.has(teamName)) {
-          teamMap.set(teamName, teamMap.get(teamName) + numInstances)
+
+        // Filter by date if this is insertions data
+        if (isInsertionsData) {
+          if (row.week) {
+            const weekDate = new Date(row.week)
+            if (isNaN(weekDate.getTime()) || weekDate < daysAgo) {
+              return
+            }
+          }
+          const insertions = parseInt(row.insertions) || 0
+          if (teamMap.has(teamName)) {
+            teamMap.set(teamName, teamMap.get(teamName) + insertions)
+          } else {
+            teamMap.set(teamName, insertions)
+          }
         } else {
-          teamMap.set(teamName, numInstances)
+          // Legacy instances data
+          const numInstances = parseInt(row.num_instances) || 0
+          if (teamMap.has(teamName)) {
+            teamMap.set(teamName, teamMap.get(teamName) + numInstances)
+          } else {
+            teamMap.set(teamName, numInstances)
+          }
         }
-      }
-    })
+      })
+    }
 
     // Convert to array and sort by instances (descending)
     const teamsArray = Array.from(teamMap.entries())
@@ -123,7 +138,7 @@ export function TeamsPieChart({ data, days = 90 }) {
         ? `Other (${item.teamCount} team${item.teamCount !== 1 ? 's' : ''})`
         : item.name.replace(/^\d+_/, '') // Remove leading numbers and underscore
     }))
-  }, [data, days])
+  }, [data, days, cube])
 
   const chartContent = !chartData || chartData.length === 0 ? (
     <div className="h-[400px] w-full flex items-center justify-center text-muted-foreground">
@@ -0,0 +1,111 @@
+/**
+ * Partitioned weekly outputs
+ * Reads partitions/index.json, written by python-api/partitioned_output.py when
+ * generation runs with --partition, and loads only the week or month partitions
+ * overlapping the requested date ranges. Library folders without partitions
+ * fall back to the full CSV.
+ */
+import Papa from "papaparse"
+
+export const PARTITION_SCHEMA_VERSION = 1
+
+// Parsed partitions keyed by URL and content hash, so widening the range only fetches new partitions
+const partitionCache = new Map()
+
+function parseCsv(text) {
+  return new Promise((resolve, reject) => {
+    Papa.parse(text, {
+      header: true,
+      skipEmptyLines: true,
+      complete: (results) => {
+        if (results.errors.length > 0) {
+          reject(new Error("Error parsing CSV: " + results.errors.map(e => e.message).join(", ")))
+          return
+        }
+        resolve(results.data)
+      },
+      error: reject
+    })
+  })
+}
+
+/**
+ * Loads a library folder's partition index
+ * @param {string} folderPath - Folder holding the library's outputs (e.g. '/csv/My_Library')
+ * @returns {Promise<Object|null>} The index, or null when the folder isn't partitioned
+ */
+export async function loadPartitionIndex(folderPath) {
+  try {
+    const response = await fetch(`${folderPath}/partitions/index.json`)
+    if (!response.ok) {
+      return null
+    }
+    // The dev server answers missing files with index.html, so a parse failure means "no index"
+    const index = await response.json().catch(() => null)
+    return index?.schema_version === PARTITION_SCHEMA_VERSION ? index : null
+  } catch {
+    return null
+  }
+}
+
+/**
+ * Picks the partitions whose weeks overlap any of the date ranges
+ * @param {Object} entry - One output's entry in the partition index
+ * @param {Array} ranges - [{ startDate, endDate }] as Date objects
+ * @returns {Array} Partition entries, newest first
+ */
+export function partitionsForRanges(entry, ranges) {
+  return (entry?.partitions || []).filter((partition) => {
+    // Rows without a parseable week can't be placed, so they are always loaded
+    if (!partition.first_week || !partition.last_week) {
+      return true
+    }
+    // Same week parsing as the dashboard's own date filters
+    const firstWeek = new Date(partition.first_week)
+    const lastWeek = new Date(partition.last_week)
+    return ranges.some(({ startDate, endDate }) => lastWeek >= startDate && firstWeek <= endDate)
+  })
+}
+
+function loadPartition(folderPath, partition) {
+  const url = `${folderPath}/partitions/${partition.path}`
+  const cacheKey = `${url}#${partition.sha256}`
+  if (!partitionCache.has(cacheKey)) {
+    const rows = fetch(url)
+      .then((response) => {
+        if (!response.ok) {
+          throw new Error(`Failed to load file: ${response.statusText}`)
+        }
+        return response.text()
+      })
+      .then(parseCsv)
+      .catch((error) => {
+        partitionCache.delete(cacheKey)
+        throw error
+      })
+    partitionCache.set(cacheKey, rows)
+  }
+  return partitionCache.get(cacheKey)
+}
+
+/**
+ * Loads the rows of a weekly CSV, from only the overlapping partitions when the folder has them
+ * @param {string} folderPath - Folder holding the library's outputs
+ * @param {string} fileName - Weekly CSV, e.g. 'actions_by_component.csv'
+ * @param {Array} ranges - [{ startDate, endDate }] the rows are needed for
+ * @returns {Promise<{rows: Array, partitioned: boolean}>} Rows newest week first
+ */
+export async function loadWeeklyCsv(folderPath, fileName, ranges) {
+  const index = await loadPartitionIndex(folderPath)
+  const entry = index?.outputs?.[fileName]
+  if (entry) {
+    const partitions = await Promise.all(partitionsForRanges(entry, ranges).map(p => loadPartition(folderPath, p)))
+    return { rows: partitions.flat(), partitioned: true }
+  }
+
+  const response = await fetch(`${folderPath}/${fileName}`)
+  if (!response.ok) {
+    throw new Error(`Failed to load file: ${response.statusText}`)
+  }
+  return { rows: await parseCsv(await response.text()), partitioned: false }
+}
@@ -0,0 +1,109 @@
+/**
+ * Rollup cubes
+ * Reads the cumulative sums written by python-api/rollup_cube.py when generation
+ * runs with --rollup-cube. The total of a metric over a range of periods is
+ * cumulative[end] - cumulative[start] per entity, so date-range totals don't scan
+ * the weekly rows. Library folders without a cube return null
+ * and callers aggregate the CSV rows instead.
+ */
+
+export const CUBE_SCHEMA_VERSION = 1
+
+// Weekly CSV -> cube file written next to it
+const CUBE_FILES = {
+  "actions_by_component.csv": "actions_by_component_cube.json",
+  "actions_by_team.csv": "actions_by_team_cube.json",
+}
+
+// Base64 little-endian int32/float64 to a typed array (typed arrays are little-endian on every supported platform)
+function decodeArray(encoded, dtype) {
+  const binary = atob(encoded)
+  const bytes = new Uint8Array(binary.length)
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i)
+  }
+  return dtype === "int32" ? new Int32Array(bytes.buffer) : new Float64Array(bytes.buffer)
+}
+
+/**
+ * Loads the rollup cube of a weekly CSV
+ * @param {string} folderPath - Folder holding the library's outputs (e.g. '/csv/My_Library')
+ * @param {string} fileName - Weekly CSV the cube was built from, e.g. 'actions_by_team.csv'
+ * @returns {Promise<Object|null>} The cube, or null when the folder has none
+ */
+export async function loadRollupCube(folderPath, fileName) {
+  const cubeFile = CUBE_FILES[fileName]
+  if (!cubeFile) {
+    return null
+  }
+  try {
+    const response = await fetch(`${folderPath}/${cubeFile}`)
+    if (!response.ok) {
+      return null
+    }
+    // The dev server answers missing files with index.html, so a parse failure means "no cube"
+    const data = await response.json().catch(() => null)
+    if (data?.schema_version !== CUBE_SCHEMA_VERSION) {
+      return null
+    }
+    const levels = {}
+    Object.entries(data.levels).forEach(([level, { keys, cumulative }]) => {
+      levels[level] = {
+        keys,
+        // Week keys parsed once, the same way the dashboard's date filters parse row weeks
+        times: level === "week" ? keys.map(key => new Date(key).getTime()) : null,
+        cumulative: Object.fromEntries(
+          Object.entries(cumulative).map(([metric, encoded]) => [metric, decodeArray(encoded, data.dtype)])
+        ),
+      }
+    })
+    return { entities: data.entities, entityColumns: data.entity_columns, levels }
+  } catch {
+    return null
+  }
+}
+
+// First index whose value is >= target (or > target with strict)
+function lowerBound(values, target, strict = false) {
+  let lo = 0
+  let hi = values.length
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1
+    if (values[mid] < target || (strict && values[mid] === target)) {
+      lo = mid + 1
+    } else {
+      hi = mid
+    }
+  }
+  return lo
+}
+
+function totalsBetween(levelData, metric, lo, hi) {
+  const cumulative = levelData.cumulative[metric]
+  const stride = levelData.keys.length + 1
+  const totals = new Float64Array(cumulative.length / stride)
+  if (hi > lo) {
+    for (let entity = 0, row = 0; entity < totals.length; entity++, row += stride) {
+      totals[entity] = cumulative[row + hi] - cumulative[row + lo]
+    }
+  }
+  return totals
+}
+
+/**
+ * Totals of a metric per entity over the weeks between two dates, inclusive
+ * @param {Object} cube - Cube from loadRollupCube
+ * @param {string} metric - 'insertions' or 'detachments'
+ * @param {Date} startDate - Earliest week included
+ * @param {Date} [endDate] - Latest week included (default: all later weeks)
+ * @returns {Float64Array|null} Totals indexed like cube.entities, or null without a week level
+ */
+export function weekRangeTotals(cube, metric, startDate, endDate = null) {
+  const week = cube?.levels?.week
+  if (!week) {
+    return null
+  }
+  const lo = lowerBound(week.times, startDate.getTime())
+  const hi = endDate ? lowerBound(week.times, endDate.getTime(), true) : week.keys.length
+  return totalsBetween(week, metric, lo, hi)
+}
@@ -0,0 +1,84 @@
+/**
+ * Publication activity index
+ * Mirrors build_activity_index in python-api/version_history.py, which writes
+ * version_activity.json next to version_history.json. Only used as a fallback
+ * when a library folder has the history but not the precomputed index.
+ */
+
+export const ACTIVITY_SCHEMA_VERSION = 1
+
+/**
+ * Builds per-day, per-month, per-year and per-author publication counts (UTC)
+ * @param {Array} versions - Versions from version_history.json, newest first
+ * @returns {Object} Activity index in the version_activity.json shape
+ */
+export function buildActivityIndex(versions) {
+  const days = {}
+  const months = {}
+  const years = {}
+  const authors = new Map()
+
+  ;(Array.isArray(versions) ? versions : []).forEach((version) => {
+    const createdAt = version?.created_at
+    if (!createdAt || createdAt.length < 10) return
+
+    const day = createdAt.slice(0, 10)
+    const year = day.slice(0, 4)
+    days[day] = (days[day] || 0) + 1
+    months[day.slice(0, 7)] = (months[day.slice(0, 7)] || 0) + 1
+
+    const user = version.user || {}
+    const authorId = String(user.id || user.handle || 'unknown')
+    if (!authors.has(authorId)) {
+      authors.set(authorId, { id: authorId, handle: user.handle || 'Unknown', count: 0, last_published: createdAt })
+    }
+    authors.get(authorId).count += 1
+
+    const yearEntry = years[year] || (years[year] = { total: 0, authorCounts: new Map() })
+    yearEntry.total += 1
+    yearEntry.authorCounts.set(authorId, (yearEntry.authorCounts.get(authorId) || 0) + 1)
+  })
+
+  const byCount = (a, b) => b.count - a.count
+  return {
+    schema_version: ACTIVITY_SCHEMA_VERSION,
+    total: Array.isArray(versions) ? versions.length : 0,
+    latest: (Array.isArray(versions) ? versions : []).slice(0, 20),
+    days,
+    months,
+    authors: Array.from(authors.values()).sort(byCount),
+    years: Object.fromEntries(
+      Object.entries(years).map(([year, { total, authorCounts }]) => [
+        year,
+        {
+          total,
+          authors: Array.from(authorCounts.entries())
+            .map(([id, count]) => ({ id, handle: authors.get(id).handle, count }))
+            .sort(byCount),
+        },
+      ])
+    ),
+  }
+}
+
+/**
+ * Loads a library's activity index, falling back to building it from the full history
+ * @param {string} folderPath - Folder holding the library's outputs (e.g. '/csv/My_Library')
+ * @returns {Promise<Object|null>} Activity index, or null when neither file exists
+ */
+export async function loadVersionActivity(folderPath) {
+  const indexResponse = await fetch(`${folderPath}/version_activity.json`)
+  if (indexResponse.ok) {
+    // The dev server answers missing files with index.html, so a parse failure means "no index"
+    const index = await indexResponse.json().catch(() => null)
+    if (index?.schema_version === ACTIVITY_SCHEMA_VERSION) {
+      return index
+    }
+  }
+
+  const historyResponse = await fetch(`${folderPath}/version_history.json`)
+  if (historyResponse.ok) {
+    return buildActivityIndex(await historyResponse.json())
+  }
+  return null
+}
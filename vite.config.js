@@ -1,9 +1,22 @@
+import path from 'path'
 import { defineConfig } from 'vite'
 import react from '@vitejs/plugin-react'
+import { precompressedArtifacts } from './server/precompressed.js'
+
+// Serve generated CSV/JSON files from their .br/.gz copies, as the Express server does
+const precompressedCsv = () => ({
+  name: 'precompressed-csv',
+  configureServer(server) {
+    server.middlewares.use(precompressedArtifacts(path.resolve('public')))
+  },
+  configurePreviewServer(server) {
+    server.middlewares.use(precompressedArtifacts(path.resolve('dist')))
+  },
+})
 
 // https://vite.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompressedCsv()],
   server: {
     proxy: {
       '/api': {